@@ -0,0 +1,22 @@
+"""
+Eye power prediction package.
+
+The predictor classes are imported on first attribute access, so importing
+the package itself does not pull in NumPy, pandas or any model files.
+"""
+import importlib
+
+_EXPORTS = {
+    'CombinedEyePowerPredictor': 'combined_eye_power_predictor',
+    'DataProcessor': 'data_processor',
+    'DuochromePredictor': 'duochrome_predictor',
+    'EyePowerPredictor': 'eye_power_predictor',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
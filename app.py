@@ -1,24 +1,94 @@
 from flask import Flask, render_template, request, jsonify
+import hashlib
+import io
 import numpy as np
-import joblib  # Load your trained model
+import os
+from collections import namedtuple
+from model.eye_power_predictor import EyePowerPredictor
+from model.model_artifact import MODEL_DIR
+from model.model_registry import ModelWatcher, registry, reload_on_signal
+from model.micro_batcher import MicroBatcher
 
 app = Flask(__name__)
 
-# Load the pre-trained model
-model = joblib.load("eye_power_model.pkl")  # Ensure your model is in the correct path
+MODEL_PATH = "eye_power_model.pkl"  # Ensure your model is in the correct path
+
+# The loaded model with a content hash of the file it came from, so every
+# worker reports the same version for the same model
+ServedModel = namedtuple('ServedModel', ['model', 'version'])
+
+def load_model():
+    """Read MODEL_PATH once and return it as a ServedModel."""
+    import joblib  # only needed (and only paid for) once the model is first used
+
+    with open(MODEL_PATH, 'rb') as f:
+        data = f.read()
+    return ServedModel(joblib.load(io.BytesIO(data)), hashlib.sha256(data).hexdigest()[:12])
+
+def get_model():
+    """Return the pre-trained ServedModel, loaded once per process via the shared registry."""
+    return registry.get(MODEL_PATH, load_model)
+
+def preload_models():
+    """
+    Load every model before worker processes are forked (e.g. from a gunicorn
+    on_starting hook or with --preload) so workers share them copy-on-write.
+    """
+    EyePowerPredictor().load_models()
+    registry.preload({MODEL_PATH: load_model})
+
+def enable_hot_reload(interval=2.0):
+    """
+    Swap in new models without restarting workers, either on SIGHUP or when
+    files in the model directory change. Call once per worker.
+    """
+    reload_on_signal()
+    return ModelWatcher(MODEL_DIR, registry.reload_all, interval).start()
+
+def predict_rows(rows):
+    """
+    Run the model once over a list of [snellen_score, duochrome_result] rows.
+
+    Returns:
+    - One (eye_power, model_version) pair per row, all from the same model
+    """
+    served = get_model()
+    return [(power, served.version) for power in served.model.predict(np.array(rows))]
+
+# Longest a request waits for its batched prediction before failing
+PREDICT_TIMEOUT = float(os.getenv("PREDICT_TIMEOUT_S", 10))
+
+# Concurrent requests are coalesced into one model call per batching window
+batcher = MicroBatcher(
+    predict_rows,
+    max_batch_size=int(os.getenv("PREDICT_MAX_BATCH", 64)),
+    max_wait=float(os.getenv("PREDICT_MAX_WAIT_MS", 2)) / 1000
+)
 
 def calculate_eye_power(snellen_score, duochrome_result):
     """
     Function to predict eye power based on Snellen score and duochrome results.
     """
-    input_data = np.array([[snellen_score, duochrome_result]])
-    prediction = model.predict(input_data)
-    return prediction[0]
+    return calculate_eye_power_async(snellen_score, duochrome_result).result(timeout=PREDICT_TIMEOUT)[0]
+
+def calculate_eye_power_async(snellen_score, duochrome_result):
+    """Queue a prediction on the micro-batcher and return a Future of (eye_power, model_version)."""
+    return batcher.submit([snellen_score, duochrome_result])
 
 @app.route('/')
 def home():
     return render_template('index.html')
 
+@app.route('/models')
+def model_status():
+    """Report which models this worker has loaded and how long each took."""
+    return jsonify({str(key): round(seconds * 1000, 2) for key, seconds in registry.timings().items()})
+
+@app.route('/metrics')
+def batching_metrics():
+    """Report micro-batcher batch sizes and queue waits for this worker."""
+    return jsonify(batcher.metrics())
+
 @app.route('/predict', methods=['POST'])
 def predict():
     try:
@@ -27,13 +97,21 @@ def predict():
         left_eye = int(request.form.get('left_eye'))
         duochrome = int(request.form.get('duochrome'))
         
-        # Compute eye power for both eyes
-        right_eye_power = calculate_eye_power(right_eye, duochrome)
-        left_eye_power = calculate_eye_power(left_eye, duochrome)
+        # Compute eye power for both eyes (both rows normally go into the same batch)
+        right_future = calculate_eye_power_async(right_eye, duochrome)
+        left_future = calculate_eye_power_async(left_eye, duochrome)
+        right_eye_power, right_version = right_future.result(timeout=PREDICT_TIMEOUT)
+        left_eye_power, left_version = left_future.result(timeout=PREDICT_TIMEOUT)
+        if right_version != left_version:
+            # A reload landed between the two batches; predict both eyes with one model
+            (right_eye_power, right_version), (left_eye_power, _) = predict_rows(
+                [[right_eye, duochrome], [left_eye, duochrome]]
+            )
         
         result = {
             "right_eye_power": round(right_eye_power, 2),
-            "left_eye_power": round(left_eye_power, 2)
+            "left_eye_power": round(left_eye_power, 2),
+            "model_version": right_version
         }
         
         return render_template('results.html', result=result)
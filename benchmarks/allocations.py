@@ -0,0 +1,78 @@
+"""
+Measure per-prediction memory of CombinedEyePowerPredictor results with tracemalloc.
+
+Compares the compact PredictionResult returned by predict_result() with the
+nested dicts returned by predict(), which builds the result object and then
+converts it with to_dict(). Each case reports the memory held per result
+while many results are kept alive. (Transient allocations are not reported:
+CPython recycles small floats and dicts through free lists that tracemalloc
+does not see, so per-call peaks are not meaningful.)
+
+Exits non-zero if PredictionResult does not retain less memory than the dicts.
+
+Run from the directory containing the model package:
+    python -m model.benchmarks.allocations [results]
+"""
+import shutil
+import sys
+import tracemalloc
+from model.benchmarks.run import has_trained_models, synthetic_model_dir
+from model.combined_eye_power_predictor import CombinedEyePowerPredictor
+from model.eye_power_predictor import EyePowerPredictor
+from model.model_artifact import MODEL_DIR
+
+DEFAULT_RESULTS = 10_000
+
+
+def build_cases(combined, eye_data):
+    """Return a dict of case name -> zero-argument callable producing one result."""
+    return {
+        'predict_result': lambda: combined.predict_result(eye_data),
+        'predict': lambda: combined.predict(eye_data),
+        'predict_result().to_dict': lambda: combined.predict_result(eye_data).to_dict(),
+    }
+
+
+def measure(fn, results=DEFAULT_RESULTS):
+    """Return the traced bytes per result while `results` results of fn are kept alive."""
+    fn()  # warm up caches and interned objects
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [fn() for _ in range(results)]
+        retained = tracemalloc.get_traced_memory()[0] - before
+        del kept
+    finally:
+        tracemalloc.stop()
+    return retained / results
+
+
+def run(results=DEFAULT_RESULTS):
+    synthetic = not has_trained_models(MODEL_DIR)
+    model_dir = synthetic_model_dir() if synthetic else MODEL_DIR
+    try:
+        combined = CombinedEyePowerPredictor()
+        combined.snellen_predictor = EyePowerPredictor(model_dir=model_dir)
+        duochrome_re = {'red_clearer': True, 'green_clearer': False, 'equal_clarity': False,
+                        'intensity_level': 3, 'letters_correct': 0}
+        duochrome_le = {'red_clearer': False, 'green_clearer': True, 'equal_clarity': False,
+                        'intensity_level': 2, 'letters_correct': 1}
+        eye_data = CombinedEyePowerPredictor.prepare_input_data('6/12', '6/9', duochrome_re, duochrome_le)
+
+        measured = {name: measure(fn, results) for name, fn in build_cases(combined, eye_data).items()}
+    finally:
+        if synthetic:
+            shutil.rmtree(model_dir, ignore_errors=True)
+
+    print(f"{results:,} retained results ({'synthetic' if synthetic else 'trained'} models)")
+    for name, retained in measured.items():
+        print(f"  {name:<26} {retained:8.1f} B/result")
+
+    compact, dicts = measured['predict_result'], measured['predict']
+    assert compact < dicts, f"PredictionResult retains {compact:.0f} B, dicts {dicts:.0f} B"
+    print(f"  PredictionResult retains {dicts / compact:.1f}x less than predict() dicts")
+    return measured
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RESULTS)
@@ -0,0 +1,71 @@
+"""
+Benchmark DataProcessor.clean_data against the original per-cell .apply pipeline.
+
+Builds a synthetic vision_data frame with the value mix of the survey and
+checks that both pipelines produce the same cleaned frame.
+
+Run from the directory containing the model package:
+    python -m model.benchmarks.clean_data [rows]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from model.benchmarks.snellen_codec import legacy_snellen_to_decimal, synthetic_column
+from model.data_processor import DataProcessor
+from model.logmar import decimal_to_logmar_batch
+
+PRESCRIPTIONS = ['+1.00', '+0.50', '+0.75', '-0.50', '-1.25', '+2.00', 'Plano', None]
+PRESCRIPTION_WEIGHTS = [20, 15, 10, 10, 5, 5, 5, 30]
+
+
+def synthetic_vision_data(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    probabilities = np.array(PRESCRIPTION_WEIGHTS) / sum(PRESCRIPTION_WEIGHTS)
+
+    def prescriptions():
+        return pd.Series(np.array(PRESCRIPTIONS, dtype=object)[rng.choice(len(PRESCRIPTIONS), rows, p=probabilities)])
+
+    return pd.DataFrame({
+        'uncorrected_RE': pd.Series(np.where(rng.random(rows) < 0.8, 'Pass', 'Fail')),
+        'uncorrected_LE': pd.Series(np.where(rng.random(rows) < 0.8, 'Pass', 'Fail')),
+        'prescription_RE': prescriptions(),
+        'prescription_LE': prescriptions(),
+        'corrected_RE': synthetic_column(rows, seed + 1),
+        'corrected_LE': synthetic_column(rows, seed + 2)
+    })
+
+
+def legacy_clean_data(vision_data):
+    """The original DataProcessor.clean_data, kept as the baseline."""
+    vision_data['decimal_RE'] = vision_data['corrected_RE'].apply(legacy_snellen_to_decimal)
+    vision_data['decimal_LE'] = vision_data['corrected_LE'].apply(legacy_snellen_to_decimal)
+    vision_data['prescription_RE'] = pd.to_numeric(vision_data['prescription_RE'], errors='coerce')
+    vision_data['prescription_LE'] = pd.to_numeric(vision_data['prescription_LE'], errors='coerce')
+    vision_data.dropna(subset=['prescription_RE', 'prescription_LE', 'decimal_RE', 'decimal_LE'], inplace=True)
+    vision_data['logmar_RE'] = decimal_to_logmar_batch(vision_data['decimal_RE'].values)
+    vision_data['logmar_LE'] = decimal_to_logmar_batch(vision_data['decimal_LE'].values)
+    return vision_data
+
+
+def run(rows):
+    vision_data = synthetic_vision_data(rows)
+    print(f"{rows:,} rows")
+
+    start = time.perf_counter()
+    baseline = legacy_clean_data(vision_data.copy())
+    baseline_time = time.perf_counter() - start
+    print(f"  {'legacy .apply':<22} {baseline_time * 1000:9.1f} ms")
+
+    processor = DataProcessor()
+    processor.vision_data = vision_data.copy()
+    start = time.perf_counter()
+    result = processor.clean_data()
+    elapsed = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(result, baseline)
+    print(f"  {'vectorized':<22} {elapsed * 1000:9.1f} ms  {baseline_time / elapsed:6.1f}x  ({len(result):,} rows kept)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
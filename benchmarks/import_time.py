@@ -0,0 +1,74 @@
+"""
+Check the import-time budget of the serving modules with `python -X importtime`.
+
+Each module is imported in a fresh interpreter. The check fails if a module's
+cumulative import time is over budget or if it pulls in a dependency that
+must only be loaded lazily (pandas, scikit-learn, ...).
+
+Run from the directory containing the model package:
+    python -m model.benchmarks.import_time [--scale 2.0]
+"""
+import argparse
+import subprocess
+import sys
+
+PACKAGE = __package__.rpartition('.')[0] if __package__ else 'model'
+
+# Cumulative import budget per module, in milliseconds
+BUDGETS_MS = {
+    '': 5,
+    'duochrome_predictor': 250,
+    'eye_power_predictor': 300,
+    'combined_eye_power_predictor': 350,
+    'data_processor': 350,
+    # Flask alone takes most of this; the joblib model is only imported on first use
+    'app': 450,
+}
+
+# Dependencies no module above may import eagerly
+FORBIDDEN = ('pandas', 'sklearn', 'scipy', 'joblib', 'dotenv', 'psycopg2')
+
+
+def measure(module):
+    """Return (cumulative_ms, imported_module_names) for importing module in a fresh interpreter."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True
+    )
+    cumulative_ms = None
+    imported = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        imported.add(name)
+        if name == module:
+            cumulative_ms = int(cumulative) / 1000
+    return cumulative_ms, imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every budget (for slow machines)')
+    args = parser.parse_args(argv)
+
+    failures = []
+    for name, budget in BUDGETS_MS.items():
+        module = f'{PACKAGE}.{name}' if name else PACKAGE
+        elapsed, imported = measure(module)
+        budget *= args.scale
+        heavy = sorted(dep for dep in FORBIDDEN if dep in imported)
+        status = 'ok' if elapsed <= budget and not heavy else 'FAIL'
+        print(f"{status:4} {module:<40} {elapsed:8.1f} ms (budget {budget:.0f} ms)"
+              + (f"  eager imports: {', '.join(heavy)}" if heavy else ''))
+        if status != 'ok':
+            failures.append(module)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
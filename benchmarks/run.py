@@ -0,0 +1,200 @@
+"""
+Benchmark suite for the prediction hot paths.
+
+Covers the scalar APIs (EyePowerPredictor.predict, DuochromePredictor.predict_adjustment,
+CombinedEyePowerPredictor.predict and prepare_input_data) and their batch
+counterparts at 1, 1k and 1M rows. Results are written as JSON with latency
+percentiles and throughput, and can be compared against a stored baseline.
+
+Runs offline: when no trained models are published in MODEL_DIR,
+small synthetic linear models are generated in a temporary directory.
+
+Run from the directory containing the model package:
+    python -m model.benchmarks.run [--output results.json] [--baseline baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+from model.combined_eye_power_predictor import CombinedEyePowerPredictor
+from model.compiled_predictor import CompiledLinearModel
+from model.duochrome_predictor import DuochromePredictor, encode_duochrome_direction
+from model.eye_power_predictor import EyePowerPredictor
+from model.model_artifact import MODEL_DIR, current_version, save_linear_artifact
+from model.snellen_codec import decode_array
+
+BATCH_SIZES = (1, 1_000, 1_000_000)
+SNELLEN_LINES = np.array(['6/6', '6/9', '6/12', '6/18', '6/24', '6/36', '6/60'])
+# A case is a regression when its p50 is this much slower than the baseline
+REGRESSION_THRESHOLD = 0.2
+
+
+def synthetic_model_dir():
+    """Publish small synthetic linear models to a temporary directory and return it."""
+    model_dir = tempfile.mkdtemp(prefix='oculist-bench-')
+    models = {'RE': CompiledLinearModel([-3.5], 1.25), 'LE': CompiledLinearModel([-3.25], 1.0)}
+    schema = {
+        name: {'features': [f'decimal_{name}'], 'target': f'prescription_{name}', 'transform': 'decimal'}
+        for name in models
+    }
+    save_linear_artifact(model_dir, models, schema, {'source': 'synthetic'})
+    return model_dir
+
+
+def has_trained_models(model_dir):
+    return current_version(model_dir) is not None or (
+        os.path.exists(os.path.join(model_dir, 'model_RE.pkl'))
+        and os.path.exists(os.path.join(model_dir, 'model_LE.pkl'))
+    )
+
+
+def measure(fn, rows=1, repeats=20, min_sample_time=0.002):
+    """
+    Time fn repeatedly and summarize per-call latency.
+
+    Fast calls are looped so each sample lasts at least min_sample_time.
+    """
+    fn()  # warm up
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - start >= min_sample_time or loops >= 100_000:
+            break
+        loops *= 10
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops)
+
+    samples = np.array(samples)
+    p50 = float(np.percentile(samples, 50))
+    return {
+        'rows': rows,
+        'loops': loops,
+        'repeats': repeats,
+        'mean_us': float(samples.mean() * 1e6),
+        'p50_us': p50 * 1e6,
+        'p90_us': float(np.percentile(samples, 90) * 1e6),
+        'p99_us': float(np.percentile(samples, 99) * 1e6),
+        'ops_per_sec': 1 / p50,
+        'rows_per_sec': rows / p50
+    }
+
+
+def build_cases(model_dir, sizes):
+    """Return a dict of case name -> (callable, rows)."""
+    eye = EyePowerPredictor(model_dir=model_dir)
+    duochrome = DuochromePredictor()
+    combined = CombinedEyePowerPredictor()
+    combined.snellen_predictor = eye
+
+    duochrome_re = {'red_clearer': True, 'green_clearer': False, 'equal_clarity': False,
+                    'intensity_level': 3, 'letters_correct': 0}
+    duochrome_le = {'red_clearer': False, 'green_clearer': True, 'equal_clarity': False,
+                    'intensity_level': 2, 'letters_correct': 1}
+    eye_data = CombinedEyePowerPredictor.prepare_input_data('6/12', '6/9', duochrome_re, duochrome_le)
+
+    cases = {
+        'eye.predict': (lambda: eye.predict(0.5, 0.67), 1),
+        'duochrome.predict_adjustment': (
+            lambda: duochrome.predict_adjustment(6, 12, 0, True, False, False, 3), 1),
+        'combined.predict': (lambda: combined.predict(eye_data), 1),
+        'combined.prepare_input_data': (
+            lambda: CombinedEyePowerPredictor.prepare_input_data('6/12', '6/9', duochrome_re, duochrome_le), 1),
+    }
+
+    rng = np.random.default_rng(0)
+    for size in sizes:
+        snellen_re = SNELLEN_LINES[rng.integers(0, len(SNELLEN_LINES), size)]
+        snellen_le = SNELLEN_LINES[rng.integers(0, len(SNELLEN_LINES), size)]
+        va_re = decode_array(snellen_re)[0]
+        va_le = decode_array(snellen_le)[0]
+        flags = rng.integers(0, 2, (size, 3)).astype(bool)
+        direction = encode_duochrome_direction(flags[:, 0], flags[:, 1], flags[:, 2])
+        intensity = rng.integers(1, 6, size).astype(np.int8)
+
+        cases[f'eye.predict_batch[{size}]'] = (
+            lambda va_re=va_re, va_le=va_le: eye.predict_batch(va_re, va_le), size)
+        cases[f'duochrome.predict_adjustment_batch[{size}]'] = (
+            lambda va=va_re, d=direction, i=intensity: duochrome.predict_adjustment_batch(va, 1, 0, d, i), size)
+        cases[f'combined.predict_batch[{size}]'] = (
+            lambda va_re=va_re, va_le=va_le, d=direction, i=intensity:
+                combined.predict_batch(va_re, va_le, d, d, i, i), size)
+        cases[f'snellen.decode_array[{size}]'] = (
+            lambda snellen_re=snellen_re: decode_array(snellen_re), size)
+    return cases
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Return a list of (case, baseline_p50_us, current_p50_us) for cases slower than the baseline."""
+    regressions = []
+    for name, current in results['cases'].items():
+        previous = baseline.get('cases', {}).get(name)
+        if previous and current['p50_us'] > previous['p50_us'] * (1 + threshold):
+            regressions.append((name, previous['p50_us'], current['p50_us']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the prediction hot paths.')
+    parser.add_argument('--output', help='Write JSON results to this file (default: stdout)')
+    parser.add_argument('--baseline', help='Compare against this results file and fail on regressions')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='Allowed p50 slowdown before a case counts as a regression')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(BATCH_SIZES), help='Batch sizes')
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--filter', default='', help='Only run cases whose name contains this text')
+    parser.add_argument('--synthetic', action='store_true', help='Use synthetic models even if trained ones exist')
+    args = parser.parse_args(argv)
+
+    synthetic = args.synthetic or not has_trained_models(MODEL_DIR)
+    model_dir = synthetic_model_dir() if synthetic else MODEL_DIR
+
+    results = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'models': 'synthetic' if synthetic else os.path.abspath(model_dir),
+        'cases': {}
+    }
+    try:
+        for name, (fn, rows) in build_cases(model_dir, args.sizes).items():
+            if args.filter in name:
+                results['cases'][name] = measure(fn, rows, args.repeats)
+                print(f"{name:<45} p50 {results['cases'][name]['p50_us']:12.2f} us", file=sys.stderr)
+    finally:
+        if synthetic:
+            shutil.rmtree(model_dir, ignore_errors=True)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p50 {before:.2f} us -> {after:.2f} us", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
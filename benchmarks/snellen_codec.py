@@ -0,0 +1,64 @@
+"""
+Benchmark the Snellen codec against per-value .apply parsing.
+
+Run from the directory containing the model package:
+    python -m model.benchmarks.snellen_codec [rows]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from model.data_processor import DataProcessor
+from model.snellen_codec import SURVEY_NOTATIONS, decode_array
+
+# Value mix seen in the WE-ZACE corrected-vision columns
+VALUES = ['6/9', '6/12', '6/18', '6/6', '6/24', '6/36', '6/60', 'HM', 'CF 1m', 'PL', 'NPL', None]
+WEIGHTS = [29, 15, 10, 9, 5, 3, 3, 5, 3, 1, 1, 201]
+
+
+def legacy_snellen_to_decimal(snellen_str):
+    """The original DataProcessor.snellen_to_decimal, kept as the baseline."""
+    conversion_map = {'NPL': 0.0, 'PL': 0.05, 'CF': 0.1, 'HM': 0.2, 'Pass': 1.0, 'Fail': 0.5}
+    if pd.isna(snellen_str) or snellen_str == '':
+        return np.nan
+    if snellen_str in conversion_map:
+        return conversion_map[snellen_str]
+    if '/' in str(snellen_str):
+        try:
+            numerator, denominator = map(float, str(snellen_str).split('/'))
+            return numerator / denominator
+        except:
+            return np.nan
+    return np.nan
+
+
+def synthetic_column(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    probabilities = np.array(WEIGHTS) / sum(WEIGHTS)
+    return pd.Series(np.array(VALUES, dtype=object)[rng.choice(len(VALUES), rows, p=probabilities)])
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def run(rows):
+    column = synthetic_column(rows)
+    candidates = {
+        'legacy .apply': lambda: column.apply(legacy_snellen_to_decimal).to_numpy(dtype=np.float64),
+        'DataProcessor .apply': lambda: column.apply(DataProcessor.snellen_to_decimal).to_numpy(dtype=np.float64),
+        'decode_array': lambda: decode_array(column, SURVEY_NOTATIONS)[0],
+    }
+
+    baseline_time, baseline = timed(candidates['legacy .apply'])
+    print(f"{rows:,} rows")
+    for name, fn in candidates.items():
+        elapsed, result = timed(fn)
+        assert np.array_equal(result, baseline, equal_nan=True), f"{name} output differs from legacy"
+        print(f"  {name:<22} {elapsed * 1000:9.1f} ms  {baseline_time / elapsed:6.1f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import numpy as np
+from model.model_artifact import file_sha256
+
+CACHE_FORMAT_VERSION = 1
+# Modules whose code determines the cleaned output; editing any of them invalidates the cache
+CLEANING_MODULES = ('data_processor.py', 'snellen_codec.py', 'logmar.py')
+
+_META_KEY = '__meta__'
+_INDEX_KEY = '__index__'
+
+
+def cleaning_code_hash():
+    """Return a SHA-256 hash of the cleaning code (CLEANING_MODULES) and cache format."""
+    digest = hashlib.sha256(f'cleaned-data-v{CACHE_FORMAT_VERSION}'.encode())
+    base_dir = os.path.dirname(__file__)
+    for filename in CLEANING_MODULES:
+        with open(os.path.join(base_dir, filename), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def cache_path(cache_dir, source_path, variant=''):
+    """
+    Return the cache file for source_path under the current cleaning code.
+
+    variant distinguishes differently shaped frames cleaned from the same source
+    (e.g. with extra grouping columns).
+    """
+    code_hash = hashlib.sha256(f'{cleaning_code_hash()}{variant}'.encode()).hexdigest()
+    return os.path.join(cache_dir, f'cleaned-{file_sha256(source_path)[:16]}-{code_hash[:12]}.npz')
+
+
+def save_frame(path, frame):
+    """
+    Write a DataFrame to an uncompressed .npz file, one array per column.
+
+    Numeric columns are stored as-is. Text columns are stored as int32 codes
+    into a fixed-width unicode array of categories (-1 for missing), so the
+    file loads without pickle. The write is atomic.
+    """
+    arrays = {_INDEX_KEY: frame.index.to_numpy()}
+    columns = []
+    for name in frame.columns:
+        series = frame[name]
+        if series.dtype.kind in 'biuf':
+            arrays[name] = series.to_numpy()
+            columns.append({'name': name, 'kind': 'numeric'})
+        else:
+            codes, categories = series.factorize()
+            arrays[f'{name}.codes'] = codes.astype(np.int32)
+            arrays[f'{name}.categories'] = np.asarray(categories, dtype=str)
+            columns.append({'name': name, 'kind': 'text', 'dtype': str(series.dtype)})
+    arrays[_META_KEY] = np.array(json.dumps({'format_version': CACHE_FORMAT_VERSION, 'columns': columns}))
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.cleaned-', suffix='.npz', dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_frame(path):
+    """Read a DataFrame written by save_frame."""
+    import pandas as pd
+
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(data[_META_KEY].item())
+        if meta['format_version'] != CACHE_FORMAT_VERSION:
+            raise ValueError(f"❌ Unsupported cleaned-data cache format: {meta['format_version']}")
+
+        index = data[_INDEX_KEY]
+        columns = {}
+        for column in meta['columns']:
+            name = column['name']
+            if column['kind'] == 'numeric':
+                columns[name] = pd.Series(data[name], index=index)
+            else:
+                codes = data[f'{name}.codes']
+                categories = np.append(data[f'{name}.categories'].astype(object), None)
+                columns[name] = pd.Series(categories[codes], index=index, dtype=column['dtype'])
+    return pd.DataFrame(columns, index=index)
+
+
+def load_or_build(cache_dir, source_path, build, variant=''):
+    """
+    Return the cached frame for source_path, or build() it and cache the result.
+
+    A corrupt or unreadable cache file is rebuilt rather than raised.
+    """
+    path = cache_path(cache_dir, source_path, variant)
+    if os.path.exists(path):
+        try:
+            frame = load_frame(path)
+            logging.info(f"✅ Loaded cleaned data from cache {path}")
+            return frame
+        except Exception as e:
+            logging.warning(f"🚨 Ignoring unreadable cleaned-data cache {path}: {e}")
+
+    frame = build()
+    try:
+        save_frame(path, frame)
+    except OSError as e:
+        logging.warning(f"🚨 Could not write cleaned-data cache {path}: {e}")
+    return frame
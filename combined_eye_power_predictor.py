@@ -2,10 +2,24 @@ import numpy as np
 import os
 from model.eye_power_predictor import EyePowerPredictor
 from model.duochrome_predictor import DuochromePredictor
+from model.prescription_table import PrescriptionTable
+from model.prediction_cache import canonical_key
+from model.snellen_codec import split_fraction
+from model.prediction_result import CONFIDENCE_INVALID, RESULT_DTYPE, EyeResult, PredictionResult
 
 class CombinedEyePowerPredictor:
-    def __init__(self, snellen_weight=0.7, duochrome_weight=0.3):
-        """Initialize the combined eye power predictor with adjustable weights."""
+    def __init__(self, snellen_weight=0.7, duochrome_weight=0.3, table_path=None, cache=None):
+        """
+        Initialize the combined eye power predictor with adjustable weights.
+        
+        Parameters:
+        - table_path: Optional precomputed prescription table (.npz) built by
+          prescription_table.py; on-grid inputs are answered from it directly
+          as long as it matches the model version being served
+        - cache: Optional PredictionCache (may be shared between predictors and
+          threads, including predictors with different weights); entries are
+          dropped automatically when the model version changes
+        """
         self.snellen_predictor = EyePowerPredictor()
         self.duochrome_predictor = DuochromePredictor()
         
@@ -13,6 +27,13 @@ class CombinedEyePowerPredictor:
         total_weight = snellen_weight + duochrome_weight
         self.snellen_weight = snellen_weight / total_weight
         self.duochrome_weight = duochrome_weight / total_weight
+        
+        self.cache = cache
+        self.table = None
+        if table_path is not None:
+            self.table = PrescriptionTable.load(table_path)
+            if (self.table.snellen_weight, self.table.duochrome_weight) != (self.snellen_weight, self.duochrome_weight):
+                raise ValueError("❌ Prescription table was built with different model weights. Rebuild it.")
     
     def predict(self, eye_data):
         """
@@ -28,8 +49,38 @@ class CombinedEyePowerPredictor:
             - 'duochrome_le': Dict with duochrome test results for left eye
         
         Returns:
-        - Dictionary with predicted prescription and confidence levels
+        - Dictionary with predicted prescription and confidence levels, and the
+          version of the models that produced it
+        """
+        return self.predict_result(eye_data).to_dict()
+    
+    def predict_result(self, eye_data):
         """
+        Same as predict(), but returns a compact PredictionResult instead of nested dicts.
+        
+        With a cache configured the same result object may be returned to many
+        callers, so treat it as read-only.
+        """
+        if self.cache is None:
+            return self._predict_result(eye_data)
+        
+        # The weights are part of the key so predictors sharing a cache never see each other's results
+        key = (self.snellen_weight, self.duochrome_weight) + canonical_key(eye_data)
+        result = self.cache.get(key, self.snellen_predictor.version)
+        if result is None:
+            result = self._predict_result(eye_data)
+            self.cache.put(key, result.model_version, result)
+        return result
+    
+    def _predict_result(self, eye_data):
+        if self.table is not None and self.table.model_version == self.snellen_predictor.version:
+            right_eye = self.table.lookup('right_eye', eye_data['visual_acuity_re'],
+                                          eye_data['snellen_re'], eye_data['duochrome_re'])
+            left_eye = self.table.lookup('left_eye', eye_data['visual_acuity_le'],
+                                         eye_data['snellen_le'], eye_data['duochrome_le'])
+            if right_eye is not None and left_eye is not None:
+                return PredictionResult(right_eye, left_eye, self.table.model_version)
+        
         # Get base predictions from Snellen model
         snellen_predictions = self.snellen_predictor.predict(
             eye_data['visual_acuity_re'], 
@@ -65,20 +116,57 @@ class CombinedEyePowerPredictor:
         le_confidence = self._calculate_confidence(snellen_predictions['left_eye'], 
                                                   snellen_predictions['left_eye'] + le_adjustment)
         
-        return {
-            'right_eye': {
-                'prescription': re_combined,
-                'snellen_prediction': snellen_predictions['right_eye'],
-                'duochrome_adjustment': re_adjustment,
-                'confidence': re_confidence
-            },
-            'left_eye': {
-                'prescription': le_combined,
-                'snellen_prediction': snellen_predictions['left_eye'],
-                'duochrome_adjustment': le_adjustment,
-                'confidence': le_confidence
-            }
-        }
+        return PredictionResult(
+            EyeResult(re_combined, snellen_predictions['right_eye'], re_adjustment, re_confidence),
+            EyeResult(le_combined, snellen_predictions['left_eye'], le_adjustment, le_confidence),
+            snellen_predictions['model_version']
+        )
+    
+    def predict_batch(self, visual_acuity_re, visual_acuity_le, direction_re, direction_le,
+                      intensity_re=3, intensity_le=3, letters_correct_re=0, letters_correct_le=0):
+        """
+        Vectorized predict() for many patients.
+        
+        Parameters:
+        - visual_acuity_re, visual_acuity_le: Arrays of decimal VA
+        - direction_re, direction_le: int8 duochrome direction codes
+          (see duochrome_predictor.encode_duochrome_direction)
+        - intensity_re, intensity_le: Arrays (or scalars) of intensity levels 1-5
+        - letters_correct_re, letters_correct_le: Arrays (or scalars) of letters read
+        
+        Returns:
+        - (results, model_version) where results is a RESULT_DTYPE structured
+          array; rows with an invalid duochrome direction or a missing (NaN) or
+          infinite visual acuity have valid=False
+        """
+        visual_acuity_re = np.asarray(visual_acuity_re, dtype=np.float64)
+        visual_acuity_le = np.asarray(visual_acuity_le, dtype=np.float64)
+        snellen_predictions = self.snellen_predictor.predict_batch(visual_acuity_re, visual_acuity_le)
+        
+        results = np.empty(len(visual_acuity_re), dtype=RESULT_DTYPE)
+        results['valid'] = True
+        for suffix, eye, visual_acuity, direction, intensity, letters in (
+            ('re', 'right_eye', visual_acuity_re, direction_re, intensity_re, letters_correct_re),
+            ('le', 'left_eye', visual_acuity_le, direction_le, intensity_le, letters_correct_le)
+        ):
+            # The decimal VA is the Snellen fraction VA/1
+            adjustment, valid = self.duochrome_predictor.predict_adjustment_batch(
+                visual_acuity, 1, letters, direction, intensity
+            )
+            valid = valid & np.isfinite(visual_acuity)
+            snellen_prediction = snellen_predictions[eye]
+            duochrome_prediction = snellen_prediction + adjustment
+            combined = self.snellen_weight * snellen_prediction + self.duochrome_weight * duochrome_prediction
+            
+            results[f'prescription_{suffix}'] = np.round(combined * 4) / 4
+            results[f'snellen_prediction_{suffix}'] = snellen_prediction
+            results[f'duochrome_adjustment_{suffix}'] = adjustment
+            results[f'confidence_{suffix}'] = np.where(
+                valid, self._confidence_codes(snellen_prediction, duochrome_prediction), CONFIDENCE_INVALID
+            )
+            results['valid'] &= valid
+        
+        return results, snellen_predictions['model_version']
     
     def _get_duochrome_adjustment(self, snellen_data, duochrome_data):
         """Calculate adjustment based on duochrome test for a single eye."""
@@ -103,6 +191,13 @@ class CombinedEyePowerPredictor:
         else:
             return "Low"
     
+    @staticmethod
+    def _confidence_codes(snellen_prediction, duochrome_prediction):
+        """Vectorized _calculate_confidence returning int8 codes into CONFIDENCE_LABELS."""
+        with np.errstate(invalid='ignore'):  # infinite VA gives inf - inf; such rows are marked invalid
+            difference = np.abs(snellen_prediction - duochrome_prediction)
+        return np.select([difference < 0.5, difference < 1.0], [0, 1], 2).astype(np.int8)
+    
     @staticmethod
     def prepare_input_data(snellen_re, snellen_le, duochrome_re, duochrome_le):
         """
@@ -118,8 +213,8 @@ class CombinedEyePowerPredictor:
         - Dictionary with processed input data
         """
         try:
-            re_num, re_denom = map(int, snellen_re.split('/'))
-            le_num, le_denom = map(int, snellen_le.split('/'))
+            re_num, re_denom = split_fraction(snellen_re, integers=True)
+            le_num, le_denom = split_fraction(snellen_le, integers=True)
         except ValueError:
             raise ValueError("Invalid Snellen format! Use format like '6/12'.")
         
@@ -169,29 +264,3 @@ if __name__ == "__main__":
     
     result = predictor.predict(eye_data)
     print(result)
-
-predictor = CombinedEyePowerPredictor()
-
-eye_data = {
-    'visual_acuity_re': 0.5,  # 6/12
-    'visual_acuity_le': 0.67,  # 6/9
-    'snellen_re': {'numerator': 6, 'denominator': 12},
-    'snellen_le': {'numerator': 6, 'denominator': 9},
-    'duochrome_re': {
-        'red_clearer': True,
-        'green_clearer': False,
-        'equal_clarity': False,
-        'intensity_level': 3,
-        'letters_correct': 0
-    },
-    'duochrome_le': {
-        'red_clearer': False,
-        'green_clearer': True,
-        'equal_clarity': False,
-        'intensity_level': 2,
-        'letters_correct': 1
-    }
-}
-
-result = predictor.predict(eye_data)
-print(result)
\ No newline at end of file
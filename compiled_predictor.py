@@ -0,0 +1,36 @@
+class CompiledLinearModel:
+    """
+    Dependency-free stand-in for a fitted scikit-learn LinearRegression.
+
+    Only the coefficients and intercept are kept, so serving does not need
+    scikit-learn installed or any pickled estimator objects.
+    """
+    __slots__ = ('coef', 'intercept')
+
+    def __init__(self, coef, intercept):
+        self.coef = tuple(float(c) for c in coef)
+        self.intercept = float(intercept)
+
+    @classmethod
+    def from_estimator(cls, model):
+        """Build a compiled model from a fitted LinearRegression."""
+        return cls(model.coef_.ravel(), model.intercept_)
+
+    def predict_one(self, *features):
+        """Evaluate the model for a single row using plain floats."""
+        if len(features) != len(self.coef):
+            raise ValueError(f"❌ Expected {len(self.coef)} features, got {len(features)}.")
+        result = self.intercept
+        for c, x in zip(self.coef, features):
+            result += c * x
+        return result
+
+    def predict(self, X):
+        """Evaluate the model for a 2D array of rows (LinearRegression-compatible)."""
+        import numpy as np
+        X = np.asarray(X, dtype=np.float64)
+        return X @ np.asarray(self.coef, dtype=np.float64) + self.intercept
+
+    def to_dict(self):
+        return {'coef': list(self.coef), 'intercept': self.intercept}
+
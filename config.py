@@ -1,15 +1,24 @@
-from dotenv import load_dotenv
 import os
 
-load_dotenv()
+# Settings are read from the environment (and .env) on first access, not at import time
+SETTINGS = ("DB_NAME", "DB_USER", "DB_PASSWORD", "DB_HOST", "DB_PORT")
 
-DB_NAME = os.getenv("DB_NAME")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT")
+_loaded = False
 
-print("DB_NAME:", DB_NAME)
-print("DB_USER:", DB_USER)
-print("DB_HOST:", DB_HOST)
-print("DB_PORT:", DB_PORT)
\ No newline at end of file
+def __getattr__(name):
+    global _loaded
+    if name not in SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if not _loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _loaded = True
+    return os.getenv(name)
+
+if __name__ == "__main__":
+    import sys
+    config = sys.modules[__name__]
+    print("DB_NAME:", config.DB_NAME)
+    print("DB_USER:", config.DB_USER)
+    print("DB_HOST:", config.DB_HOST)
+    print("DB_PORT:", config.DB_PORT)
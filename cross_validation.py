@@ -0,0 +1,155 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from model import shared_matrix
+from model.duochrome_predictor import DIRECTION_EQUAL
+from model.eye_power_predictor import EyePowerPredictor, ModelBundle
+from model.incremental_trainer import EYES, FEATURES, SufficientStats
+from model.prediction_result import CONFIDENCE_LABELS
+
+DEFAULT_FOLDS = 5
+CANDIDATES = FEATURES
+# Prescription error thresholds (diopters) reported as "fraction within"
+TOLERANCES = (0.25, 0.5)
+
+# Columns of the shared evaluation matrix, built from the cleaned vision_data.
+# direction_*/intensity_* are optional duochrome columns; without them every
+# eye is treated as "equal clarity" (no duochrome adjustment).
+_COLUMNS = (
+    [f'{feature}_{eye}' for feature in CANDIDATES for eye in EYES]
+    + [f'prescription_{eye}' for eye in EYES]
+    + [f'direction_{eye}' for eye in EYES]
+    + [f'intensity_{eye}' for eye in EYES]
+)
+
+
+def kfold_test_rows(n_rows, folds=DEFAULT_FOLDS, seed=0):
+    """Split shuffled row positions into `folds` test sets."""
+    if folds < 2 or folds > n_rows:
+        raise ValueError(f"❌ Need 2 <= folds <= rows, got {folds} folds for {n_rows} rows.")
+    return np.array_split(np.random.default_rng(seed).permutation(n_rows), folds)
+
+
+def _evaluate_fold(candidate, fold, test_rows):
+    """Fit a candidate on all rows outside test_rows and predict test_rows. Runs in a worker."""
+    from model.combined_eye_power_predictor import CombinedEyePowerPredictor
+
+    start = time.perf_counter()
+    matrix = shared_matrix.shared()
+    column = {name: i for i, name in enumerate(_COLUMNS)}
+    train = np.ones(len(matrix), dtype=bool)
+    train[test_rows] = False
+
+    models = {
+        eye: SufficientStats.from_arrays(
+            matrix[train, column[f'{candidate}_{eye}']], matrix[train, column[f'prescription_{eye}']]
+        ).solve()
+        for eye in EYES
+    }
+
+    # Evaluate through the serving code path with the fold's models swapped in
+    snellen_predictor = EyePowerPredictor()
+    bundle = ModelBundle(models['RE'], models['LE'], f'cv-{candidate}-{fold}', candidate)
+    snellen_predictor.load_models = lambda: bundle
+    combined = CombinedEyePowerPredictor()
+    combined.snellen_predictor = snellen_predictor
+
+    test = matrix[test_rows]
+    results, _ = combined.predict_batch(
+        test[:, column['decimal_RE']], test[:, column['decimal_LE']],
+        test[:, column['direction_RE']].astype(np.int8), test[:, column['direction_LE']].astype(np.int8),
+        test[:, column['intensity_RE']].astype(np.int8), test[:, column['intensity_LE']].astype(np.int8)
+    )
+    errors = {
+        eye: np.abs(results[f'prescription_{suffix}'].astype(np.float64) - test[:, column[f'prescription_{eye}']])
+        for eye, suffix in zip(EYES, ('re', 'le'))
+    }
+    confidence = {eye: results[f'confidence_{suffix}'] for eye, suffix in zip(EYES, ('re', 'le'))}
+    return candidate, fold, errors, confidence, time.perf_counter() - start
+
+
+def _summarize(errors):
+    summary = {'count': int(len(errors)), 'mae': float(errors.mean()) if len(errors) else None}
+    for tolerance in TOLERANCES:
+        # Predictions sit on the 0.25 D grid, so compare with a little slack for float noise
+        summary[f'within_{tolerance}'] = float((errors <= tolerance + 1e-9).mean()) if len(errors) else None
+    return summary
+
+
+def cross_validate(vision_data, candidates=CANDIDATES, folds=DEFAULT_FOLDS, seed=0, workers=None):
+    """
+    K-fold cross-validate candidate models over a process pool.
+
+    The cleaned arrays are placed in shared memory once; each (candidate,
+    fold) task receives only its test row positions. Predictions go through
+    CombinedEyePowerPredictor.predict_batch, so the reported errors and
+    confidence labels are those the service would produce.
+
+    Parameters:
+    - vision_data: Cleaned frame (see DataProcessor.clean_data), optionally with
+      direction_RE/LE (duochrome_predictor direction codes) and intensity_RE/LE
+    - candidates: Model inputs to compare ('decimal', 'logmar')
+    - folds: Number of folds
+    - seed: Shuffle seed for the fold assignment
+    - workers: Number of worker processes (default: CPU count)
+
+    Returns:
+    - Dict per candidate with MAE (diopters), fraction within each tolerance,
+      per-eye results, calibration per confidence label and per-fold wall time
+    """
+    for candidate in candidates:
+        if candidate not in CANDIDATES:
+            raise ValueError(f"❌ Unknown candidate '{candidate}'. Use one of {CANDIDATES}.")
+
+    has_duochrome = all(f'direction_{eye}' in vision_data.columns for eye in EYES)
+    defaults = {f'direction_{eye}': DIRECTION_EQUAL for eye in EYES}
+    defaults.update({f'intensity_{eye}': 3 for eye in EYES})
+    matrix = np.column_stack([
+        vision_data[name].to_numpy(dtype=np.float64) if name in vision_data.columns
+        else np.full(len(vision_data), defaults[name], dtype=np.float64)
+        for name in _COLUMNS
+    ])
+    test_sets = kfold_test_rows(len(matrix), folds, seed)
+    tasks = [(candidate, fold, rows) for candidate in candidates for fold, rows in enumerate(test_sets)]
+
+    outcomes = {candidate: [] for candidate in candidates}
+    with shared_matrix.SharedMatrix(matrix) as shared:
+        with ProcessPoolExecutor(
+            max_workers=min(workers or os.cpu_count(), len(tasks)),
+            initializer=shared_matrix.attach, initargs=shared.initargs
+        ) as pool:
+            for future in as_completed([pool.submit(_evaluate_fold, *task) for task in tasks]):
+                candidate, fold, errors, confidence, seconds = future.result()
+                outcomes[candidate].append((fold, errors, confidence, seconds))
+                logging.info(f"✅ {candidate} fold {fold + 1}/{folds}: MAE "
+                             f"{np.concatenate(list(errors.values())).mean():.3f} D in {seconds * 1000:.1f} ms")
+
+    report = {}
+    for candidate, fold_outcomes in outcomes.items():
+        fold_outcomes.sort(key=lambda outcome: outcome[0])
+        errors = {eye: np.concatenate([o[1][eye] for o in fold_outcomes]) for eye in EYES}
+        confidence = {eye: np.concatenate([o[2][eye] for o in fold_outcomes]) for eye in EYES}
+        all_errors = np.concatenate(list(errors.values()))
+        all_confidence = np.concatenate(list(confidence.values()))
+
+        report[candidate] = {
+            **_summarize(all_errors),
+            'eyes': {eye: _summarize(errors[eye]) for eye in EYES},
+            'confidence_calibration': {
+                label: _summarize(all_errors[all_confidence == code]) for code, label in enumerate(CONFIDENCE_LABELS)
+            },
+            'duochrome_inputs': has_duochrome,
+            'fold_seconds': [o[3] for o in fold_outcomes]
+        }
+    return report
+
+
+if __name__ == "__main__":
+    import json
+    from model.data_processor import DataProcessor
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    print(json.dumps(cross_validate(DataProcessor().load_cleaned_data()), indent=2))
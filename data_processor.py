@@ -1,111 +1,357 @@
-import pandas as pd
 import numpy as np
 import os
-import pickle
 import logging
-from sklearn.linear_model import LinearRegression
+from model.cleaned_data_cache import cleaning_code_hash, load_or_build
+from model.data_profiler import DataProfiler, log_coercion_failures
+from model.eye_tests_source import DEFAULT_BATCH_SIZE as DEFAULT_EYE_TESTS_BATCH_SIZE, train_from_eye_tests
+from model.feature_store import DEFAULT_CHUNK_ROWS, FeatureStore
+from model.incremental_trainer import IncrementalTrainer, check_feature
+from model.model_artifact import MODEL_DIR, file_sha256, fingerprint_arrays, save_linear_artifact
+from model.snellen_codec import SURVEY_NOTATIONS, decode, decode_array
+from model.survey_ingest import ingest
+from model.survey_schema import TRAINING_SCHEMA
+
+# pandas and scikit-learn are imported inside the methods that need them,
+# so importing this module (e.g. from the serving path) stays cheap
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(__file__), 'Phase_1_WE_ZACE_prevalence_and_attiitudes.csv')
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), 'model', 'cache')
+
+# Survey columns the models need, in vision_data order, with their short names
+REQUIRED_COLUMNS = {
+    'Qn 1.3.1: Presenting distance vision at 6/12, RE': 'uncorrected_RE',
+    'Qn 1.3.2:  Presenting distance vision at 6/12, LE': 'uncorrected_LE',
+    'Qn 1.4.1: Prescription distance, RE': 'prescription_RE',
+    'Qn 1.4.2: Prescription distance, LE': 'prescription_LE',
+    'Qn 1.5.1:  Corrected vision (Right eye)': 'corrected_RE',
+    'Qn 1.5.2: Corrected vision (Left eye)': 'corrected_LE'
+}
+# Optional survey columns that models can be grouped by, with their short names
+GROUP_COLUMNS = {
+    'Qn 1.12: How old are you this year ?': 'age',
+    'Qn 1.13: Which type of craft are you engaged?': 'craft'
+}
+# Ingested survey columns (TRAINING_SCHEMA short names) that become the vision_data columns
+INGESTED_COLUMNS = {
+    'presenting_distance_RE': 'uncorrected_RE',
+    'presenting_distance_LE': 'uncorrected_LE',
+    'prescription_RE': 'prescription_RE',
+    'prescription_LE': 'prescription_LE',
+    'corrected_RE': 'corrected_RE',
+    'corrected_LE': 'corrected_LE'
+}
+# All are free text in the survey export ("Pass", "+1.00", "6/9", "CF 1m")
+COLUMN_DTYPES = {column: str for column in {**REQUIRED_COLUMNS, **GROUP_COLUMNS}}
+
+
+def _to_numeric(series):
+    """pd.to_numeric(series, errors='coerce'), parsing each distinct value once."""
+    import pandas as pd
+
+    codes, uniques = series.factorize()
+    values = pd.to_numeric(uniques, errors='coerce')
+    values = np.asarray(values)
+    if (codes < 0).any():
+        values = np.append(values, np.nan)  # code -1 (missing) picks the trailing NaN
+    return pd.Series(values[codes], index=series.index, name=series.name)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 class DataProcessor:
-    def __init__(self, data_path=None):
-        """Initialize the DataProcessor with dataset path."""
-        base_dir = os.path.dirname(__file__)  # Get script directory
-        self.data_path = "/Users/lokeshthangavel/Documents/loki_coding/Your Oculist/data/dataset1.csv"
-        self.df = None
+    def __init__(self, data_path=None, chunksize=DEFAULT_CHUNKSIZE, cache_dir=DEFAULT_CACHE_DIR, group_columns=()):
+        """
+        Initialize the DataProcessor.
+
+        Parameters:
+        - data_path: Path or open file-like object of the survey CSV (default: the bundled survey)
+        - chunksize: Rows parsed per chunk while loading
+        - cache_dir: Directory for the cleaned-data cache, or None to always re-clean
+        - group_columns: Short names from GROUP_COLUMNS (e.g. 'age', 'craft') to load after the vision columns
+        """
+        self.data_path = data_path if data_path is not None else DEFAULT_DATA_PATH
+        self.chunksize = chunksize
+        self.cache_dir = cache_dir
+        self.group_columns = tuple(group_columns)
+        unknown = set(self.group_columns) - set(GROUP_COLUMNS.values())
+        if unknown:
+            raise ValueError(f"❌ Unknown group columns {sorted(unknown)}. Use {list(GROUP_COLUMNS.values())}.")
+        self.columns = {
+            **REQUIRED_COLUMNS,
+            **{column: name for column, name in GROUP_COLUMNS.items() if name in self.group_columns}
+        }
         self.vision_data = None
+        self.profile_report = None
+        self.ingest_report = None
         self.model_RE = None
         self.model_LE = None
     
-    def load_data(self):
-        """Load dataset with appropriate encoding."""
-        if not os.path.exists(self.data_path):
+    def iter_chunks(self):
+        """
+        Stream the dataset as renamed vision_data chunks.
+
+        Only the required (and selected group) columns are parsed, so memory
+        is bounded by chunksize rows of a handful of columns however wide or
+        long the export is.
+        """
+        import pandas as pd
+        
+        if isinstance(self.data_path, (str, os.PathLike)) and not os.path.exists(self.data_path):
             raise FileNotFoundError(f"🚨 Dataset not found at {self.data_path}")
 
-        try:
-            self.df = pd.read_csv(self.data_path, encoding='ISO-8859-1', encoding_errors='replace')
-        except UnicodeDecodeError:
-            self.df = pd.read_csv(self.data_path, encoding='latin1', errors='replace')
-
-        # Extract relevant columns safely
-        required_columns = [
-            'Qn 1.3.1: Presenting distance vision at 6/12, RE', 
-            'Qn 1.3.2:  Presenting distance vision at 6/12, LE',
-            'Qn 1.4.1: Prescription distance, RE',
-            'Qn 1.4.2: Prescription distance, LE',
-            'Qn 1.5.1:  Corrected vision (Right eye)',
-            'Qn 1.5.2: Corrected vision (Left eye)'
-        ]
-
-        missing_cols = [col for col in required_columns if col not in self.df.columns]
-        if missing_cols:
-            logging.error(f"🚨 Missing columns in dataset: {missing_cols}")
-            raise KeyError(f"Dataset is missing required columns: {missing_cols}")
-
-        # Rename for easier access
-        self.vision_data = self.df[required_columns].copy()
-        self.vision_data.columns = [
-            'uncorrected_RE', 'uncorrected_LE',
-            'prescription_RE', 'prescription_LE',
-            'corrected_RE', 'corrected_LE'
-        ]
+        reader = pd.read_csv(
+            self.data_path,
+            usecols=lambda column: column in self.columns,
+            dtype=COLUMN_DTYPES,
+            encoding='ISO-8859-1',
+            encoding_errors='replace',
+            chunksize=self.chunksize
+        )
+        with reader:
+            for chunk in reader:
+                missing_cols = [col for col in self.columns if col not in chunk.columns]
+                if missing_cols:
+                    logging.error(f"🚨 Missing columns in dataset: {missing_cols}")
+                    raise KeyError(f"Dataset is missing required columns: {missing_cols}")
+
+                # Rename for easier access
+                chunk = chunk[list(self.columns)]
+                chunk.columns = list(self.columns.values())
+                yield chunk
+
+    def load_data(self):
+        """Load the required columns of the dataset, chunk by chunk."""
+        import pandas as pd
+        
+        chunks = list(self.iter_chunks())
+        if not chunks:
+            # Header-only file: an empty frame with the expected columns
+            chunks = [pd.DataFrame({name: pd.Series(dtype=str) for name in self.columns.values()})]
+        self.vision_data = pd.concat(chunks, ignore_index=True)
         
         return self.vision_data
     
-    def clean_data(self):
-        """Clean data and handle missing values."""
+    def load_ingested(self, source, workers=None):
+        """
+        Load and clean every survey export under source (see survey_ingest.ingest).
+        
+        Files are parsed in parallel and de-duplicated by study number, the
+        latest export winning. Values are read with TRAINING_SCHEMA, so each
+        row is kept or dropped exactly as clean_data would keep or drop it
+        (sphero-cylindrical prescriptions are dropped, not reduced to their
+        sphere). Rows are only rejected for a missing study number.
+        Unlike load_data, uncorrected_RE/LE are booleans (Pass -> True) and
+        age is a float.
+        
+        Parameters:
+        - source: Directory, glob pattern or single survey file; becomes data_path,
+          so train_model records it as the training source
+        - workers: Number of worker processes (default: CPU count)
+        
+        Returns:
+        - Cleaned vision_data; the ingestion report is kept in self.ingest_report
+        """
+        dataset, self.ingest_report = ingest(source, workers, strict=False, schema=TRAINING_SCHEMA)
+        columns = {**INGESTED_COLUMNS, **{name: name for name in self.group_columns}}
+        vision_data = dataset[list(columns)].rename(columns=columns)
+        if 'age' in vision_data.columns:
+            vision_data['age'] = vision_data['age'].astype(np.float64)
+        
+        self.data_path = source
+        self.vision_data = self.clean_frame(vision_data)
+        return self.vision_data
+    
+    def clean_data(self, profile=False):
+        """
+        Clean data and handle missing values.
+
+        Works on whole columns: each distinct vision string is decoded once
+        and rows are filtered with a single mask, so cost grows with the
+        number of distinct values rather than the number of rows.
+
+        Parameters:
+        - profile: Also profile the raw columns first (see DataProfiler); the report
+          is stored in self.profile_report and unparseable values are logged
+        """
         if self.vision_data is None:
             self.load_data()
         
-        # Convert vision values to decimal
-        self.vision_data['decimal_RE'] = self.vision_data['corrected_RE'].apply(self.snellen_to_decimal)
-        self.vision_data['decimal_LE'] = self.vision_data['corrected_LE'].apply(self.snellen_to_decimal)
+        if profile:
+            self.profile_report = DataProfiler().update(self.vision_data).report()
+            log_coercion_failures(self.profile_report)
+        
+        self.vision_data = self.clean_frame(self.vision_data)
+        return self.vision_data
+    
+    @staticmethod
+    def clean_frame(vision_data):
+        """Clean one loaded vision_data frame (or chunk of it); see clean_data."""
+        # Convert vision values to decimal (and LogMAR) with the Snellen codec
+        decimal_RE, logmar_RE = decode_array(vision_data['corrected_RE'], SURVEY_NOTATIONS)
+        decimal_LE, logmar_LE = decode_array(vision_data['corrected_LE'], SURVEY_NOTATIONS)
+        vision_data['decimal_RE'] = decimal_RE
+        vision_data['decimal_LE'] = decimal_LE
         
         # Convert prescription values to numeric
-        self.vision_data['prescription_RE'] = pd.to_numeric(self.vision_data['prescription_RE'], errors='coerce')
-        self.vision_data['prescription_LE'] = pd.to_numeric(self.vision_data['prescription_LE'], errors='coerce')
+        vision_data['prescription_RE'] = _to_numeric(vision_data['prescription_RE'])
+        vision_data['prescription_LE'] = _to_numeric(vision_data['prescription_LE'])
         
         # Drop rows with missing values
-        self.vision_data.dropna(subset=['prescription_RE', 'prescription_LE', 'decimal_RE', 'decimal_LE'], inplace=True)
+        keep = ~(
+            np.isnan(decimal_RE) | np.isnan(decimal_LE)
+            | vision_data['prescription_RE'].isna().to_numpy() | vision_data['prescription_LE'].isna().to_numpy()
+        )
+        if not keep.all():
+            vision_data = vision_data[keep].copy()
+        
+        # LogMAR feature derived from decimal acuity
+        vision_data['logmar_RE'] = logmar_RE[keep]
+        vision_data['logmar_LE'] = logmar_LE[keep]
+        
+        return vision_data
+    
+    def profile(self, **options):
+        """
+        Profile the raw dataset columns in one streaming pass.
+        
+        Chunks are read with iter_chunks and folded into bounded-memory
+        sketches, so files of any size can be profiled without loading them.
+        
+        Parameters:
+        - options: Sketch sizes passed to DataProfiler (top_k, max_tracked, distinct_k, sample_size, seed)
         
+        Returns:
+        - Report dict with per-column counts, distinct values, coercion failures,
+          histograms and approximate quantiles
+        """
+        profiler = DataProfiler(**options)
+        for chunk in self.iter_chunks():
+            profiler.update(chunk)
+        self.profile_report = profiler.report()
+        return self.profile_report
+    
+    def load_cleaned_data(self):
+        """
+        Return cleaned vision_data, from the on-disk cache when possible.
+
+        The cache is keyed by the SHA-256 of the source file and of the
+        cleaning code, so editing either one invalidates it. File-like
+        sources are always cleaned from scratch.
+        """
+        if self.cache_dir is None or not isinstance(self.data_path, (str, os.PathLike)):
+            return self.clean_data()
+        
+        self.vision_data = load_or_build(
+            self.cache_dir, self.data_path, self.clean_data, variant=','.join(self.group_columns)
+        )
         return self.vision_data
     
+    def update_from_eye_tests(self, connection, target_columns, feature='decimal', model_dir=MODEL_DIR,
+                              batch_size=DEFAULT_EYE_TESTS_BATCH_SIZE, allow_fresh=False):
+        """
+        Fold new eye_tests rows into the persisted training statistics and republish.
+        
+        Rows are streamed from the database in batches of batch_size through a
+        server-side cursor (see eye_tests_source), never loading the whole table.
+        
+        Parameters:
+        - connection: Open psycopg2 connection
+        - target_columns: (right eye, left eye) eye_tests columns holding measured
+          prescriptions; required, since eye_tests.result only holds predictions
+        - allow_fresh: Train on the eye_tests rows alone when model_dir has no training
+          statistics (see update_model); otherwise that raises
+        
+        Returns:
+        - The published artifact version, or None if there were no new rows
+        """
+        return train_from_eye_tests(IncrementalTrainer(model_dir, feature), connection, target_columns, batch_size,
+                                    allow_fresh)
+    
     @staticmethod
     def snellen_to_decimal(snellen_str):
-        """Convert Snellen fraction to decimal visual acuity."""
-        conversion_map = {
-            'NPL': 0.0,  # No Perception of Light
-            'PL': 0.05,  # Perception of Light
-            'CF': 0.1,   # Counting Fingers
-            'HM': 0.2,   # Hand Movement
-            'Pass': 1.0,
-            'Fail': 0.5
-        }
-
-        if pd.isna(snellen_str) or snellen_str == '':
-            return np.nan
+        """Convert Snellen fraction or clinical code (NPL/PL/CF/HM/Pass/Fail) to decimal visual acuity."""
+        return decode(snellen_str, SURVEY_NOTATIONS)[0]
+    
+    def source_name(self):
+        """The source file path as a string (recorded in model manifests), or None for file-like sources."""
+        return str(self.data_path) if isinstance(self.data_path, (str, os.PathLike)) else None
+    
+    def source_fingerprint(self):
+        """
+        Identify the cleaned features this processor produces: the SHA-256 of the
+        source file and of the cleaning code. None for file-like sources.
+        """
+        if not isinstance(self.data_path, (str, os.PathLike)):
+            return None
+        return {'source_sha256': file_sha256(self.data_path), 'cleaning_code': cleaning_code_hash()}
+    
+    def spill_features(self, store_dir, fingerprint=None):
+        """
+        Clean the dataset chunk by chunk into an on-disk float32 FeatureStore.
         
-        if snellen_str in conversion_map:
-            return conversion_map[snellen_str]
-
-        if '/' in str(snellen_str):
-            try:
-                numerator, denominator = map(float, str(snellen_str).split('/'))
-                return numerator / denominator
-            except:
-                return np.nan
+        Only one chunk of chunksize rows is in memory at a time.
+        
+        Parameters:
+        - fingerprint: Recorded with the store (default: source_fingerprint())
+        
+        Returns:
+        - The FeatureStore
+        """
+        store = FeatureStore(store_dir)
+        fingerprint = fingerprint or self.source_fingerprint()
+        rows = store.write((self.clean_frame(chunk) for chunk in self.iter_chunks()), fingerprint)
+        logging.info(f"✅ Spilled {rows} cleaned rows to {store_dir}")
+        return store
+    
+    def train_out_of_core(self, store_dir, feature='decimal', chunk_rows=DEFAULT_CHUNK_ROWS,
+                          model_dir=MODEL_DIR):
+        """
+        Train on datasets larger than memory.
         
-        return np.nan
+        The cleaned features are spilled to a memory-mapped FeatureStore
+        (reused only if store_dir already holds one built from the same source
+        file and cleaning code, see source_fingerprint), then folded into fresh
+        sufficient statistics chunk_rows rows at a time. Peak memory is set by
+        chunksize and chunk_rows, not by the size of the dataset. The features
+        are stored as float32, so coefficients can differ from an in-memory
+        float64 fit in the seventh significant digit.
+        
+        Returns:
+        - The published artifact version
+        """
+        fingerprint = self.source_fingerprint()
+        store = FeatureStore(store_dir)
+        if not store.matches(fingerprint):
+            if store.exists():
+                logging.info(f"✅ Feature store {store_dir} was built from other data or cleaning code; rebuilding")
+            store = self.spill_features(store_dir, fingerprint)
+        
+        trainer = store.fit(IncrementalTrainer(model_dir, feature), chunk_rows)
+        return trainer.publish({'source': self.source_name(), **(fingerprint or {}), 'feature_store': store_dir},
+                               replace_other_models=True)
     
-    def train_model(self):
-        """Train regression models to predict prescription power."""
-        if self.vision_data is None or 'decimal_RE' not in self.vision_data.columns:
+    def train_model(self, feature='decimal', model_dir=MODEL_DIR):
+        """
+        Train regression models to predict prescription power.
+        
+        Parameters:
+        - feature: Model input, either 'decimal' visual acuity or 'logmar'
+        - model_dir: Directory the models are published to (default: the served MODEL_DIR)
+        
+        Returns:
+        - (model_RE, model_LE); raises if the models cannot be published
+        """
+        from sklearn.linear_model import LinearRegression
+        
+        check_feature(feature)
+        
+        if self.vision_data is None:
+            self.load_cleaned_data()
+        elif f'{feature}_RE' not in self.vision_data.columns:
             self.clean_data()
         
-        X_RE = self.vision_data[['decimal_RE']].values
+        X_RE = self.vision_data[[f'{feature}_RE']].values
         y_RE = self.vision_data['prescription_RE'].values
-        X_LE = self.vision_data[['decimal_LE']].values
+        X_LE = self.vision_data[[f'{feature}_LE']].values
         y_LE = self.vision_data['prescription_LE'].values
         
         # Train models
@@ -113,22 +359,68 @@ class DataProcessor:
         self.model_LE = LinearRegression().fit(X_LE, y_LE)
         
         # Save models
-        model_dir = os.path.join(os.path.dirname(__file__), "model", "saved_models")
         os.makedirs(model_dir, exist_ok=True)
         
+        feature_schema = {
+            'RE': {'features': [f'{feature}_RE'], 'target': 'prescription_RE', 'transform': feature},
+            'LE': {'features': [f'{feature}_LE'], 'target': 'prescription_LE', 'transform': feature}
+        }
+        training_data = {
+            'source': self.source_name(),
+            'rows': int(len(self.vision_data)),
+            'fingerprint': fingerprint_arrays(X_RE, y_RE, X_LE, y_LE)
+        }
+        
         try:
-            with open(os.path.join(model_dir, 'model_RE.pkl'), 'wb') as f:
-                pickle.dump(self.model_RE, f)
-            with open(os.path.join(model_dir, 'model_LE.pkl'), 'wb') as f:
-                pickle.dump(self.model_LE, f)
-            logging.info("✅ Models trained and saved successfully!")
+            version = save_linear_artifact(
+                model_dir, {'RE': self.model_RE, 'LE': self.model_LE}, feature_schema, training_data
+            )
+            logging.info(f"✅ Models trained and saved successfully as version {version}!")
+
+            # Seed the sufficient statistics so update_model can fold in new rows later
+            trainer = IncrementalTrainer(model_dir, feature)
+            trainer.partial_fit_frame(self.vision_data)
+            trainer.save()
         except Exception as e:
             logging.error(f"🚨 Error saving models: {e}")
+            raise
 
         return self.model_RE, self.model_LE
+    
+    def update_model(self, new_data, feature='decimal', model_dir=MODEL_DIR, allow_fresh=False):
+        """
+        Fold new cleaned rows into the persisted training statistics and republish.
+
+        Costs O(new rows): the full history is never re-read. The published
+        coefficients equal a full refit on all rows seen so far.
+        
+        Parameters:
+        - new_data: Cleaned vision_data frame with {feature}_RE/LE and prescription_RE/LE
+        - feature: Model input, either 'decimal' visual acuity or 'logmar'
+        - model_dir: Directory holding the statistics and published models
+        - allow_fresh: Publish models fitted on new_data alone when model_dir has no
+          training statistics; otherwise that raises, so the published models are
+          never replaced by a fit on part of the data
+        
+        Returns:
+        - The published artifact version
+        """
+        trainer = IncrementalTrainer(model_dir, feature)
+        if not trainer.load():
+            if not allow_fresh:
+                raise FileNotFoundError(
+                    f"❌ No training statistics in {model_dir}! Run train_model first, "
+                    "or pass allow_fresh=True to publish models fitted on the new rows only."
+                )
+            logging.warning("🚨 No training statistics found; starting from the new rows only.")
+        trainer.partial_fit_frame(new_data)
+        return trainer.publish({'source': 'incremental'})
 
 
 # Run training if executed directly
 if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    
     processor = DataProcessor()
     processor.train_model()
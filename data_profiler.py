@@ -0,0 +1,301 @@
+import logging
+import numpy as np
+from model.snellen_codec import CLINICAL_CODES, SURVEY_NOTATIONS, decode_array
+
+# pandas is imported inside the functions that need it
+
+DEFAULT_TOP_K = 10
+DEFAULT_MAX_TRACKED = 1000
+DEFAULT_DISTINCT_K = 1024
+DEFAULT_SAMPLE_SIZE = 4096
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+# How each vision_data column is parsed when cleaned:
+# - 'acuity':   Snellen fractions and clinical codes (snellen_codec, SURVEY_NOTATIONS)
+# - 'diopters': plain numbers, as pd.to_numeric(errors='coerce') reads them
+# - 'number':   plain numbers
+# - 'text':     not parsed
+COLUMN_KINDS = {
+    'uncorrected_RE': 'acuity', 'uncorrected_LE': 'acuity',
+    'corrected_RE': 'acuity', 'corrected_LE': 'acuity',
+    'prescription_RE': 'diopters', 'prescription_LE': 'diopters',
+    'age': 'number', 'craft': 'text'
+}
+# Fixed histogram bins per kind as (low, high, bins); values outside count as below/above
+HISTOGRAM_BINS = {
+    'acuity': (0.0, 2.0, 20),        # decimal VA, 0.1 wide
+    'diopters': (-20.0, 20.0, 80),   # 0.5 D wide
+    'number': (0.0, 100.0, 20)
+}
+
+
+class HeavyHitters:
+    """
+    Approximate most frequent values in bounded memory (Misra-Gries).
+
+    At most max_tracked values are counted. While fewer distinct values have
+    been seen the counts are exact; after that each count is a lower bound
+    that is short by at most rows / (max_tracked + 1).
+    """
+
+    def __init__(self, max_tracked=DEFAULT_MAX_TRACKED):
+        self.max_tracked = max_tracked
+        self.counts = {}
+        self.exact = True
+
+    def update(self, values, counts):
+        """Add counts for values (parallel sequences, each value once)."""
+        for value, count in zip(values, counts):
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+        if len(self.counts) > self.max_tracked:
+            # Subtract the (max_tracked + 1)-th largest count from every counter and drop the non-positive ones
+            threshold = sorted(self.counts.values(), reverse=True)[self.max_tracked]
+            self.counts = {value: count - threshold for value, count in self.counts.items() if count > threshold}
+            self.exact = False
+
+    def top(self, k):
+        return sorted(self.counts.items(), key=lambda item: (-item[1], str(item[0])))[:k]
+
+
+class DistinctSketch:
+    """
+    Distinct value count in bounded memory (k minimum values).
+
+    Keeps the k smallest 64-bit hashes seen; exact while fewer than k
+    distinct values have been seen, otherwise within a few percent.
+    """
+
+    def __init__(self, k=DEFAULT_DISTINCT_K):
+        self.k = k
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def update(self, values):
+        """Add a sequence of values (each may appear more than once)."""
+        import pandas as pd
+
+        hashes = pd.util.hash_array(np.asarray(values, dtype=object))
+        self.hashes = np.unique(np.concatenate([self.hashes, hashes]))[:self.k]
+
+    @property
+    def exact(self):
+        return len(self.hashes) < self.k
+
+    def estimate(self):
+        if self.exact:
+            return len(self.hashes)
+        # The k-th smallest of n uniform hashes sits near k / n of the hash range
+        return int(round((self.k - 1) / ((float(self.hashes[-1]) + 1) / 2.0 ** 64)))
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles from a fixed-size uniform sample of the values.
+
+    Every value gets a random priority and the sample_size values with the
+    lowest priorities are kept (bottom-k sampling), which is a uniform sample
+    without replacement however many chunks are added. Exact while no more
+    than sample_size values have been seen; otherwise the rank error is
+    around 1 / sqrt(sample_size). The minimum and maximum are always exact.
+    """
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE, seed=0):
+        self.sample_size = sample_size
+        self.rng = np.random.default_rng(seed)
+        self.sample = np.empty(0, dtype=np.float64)
+        self.priorities = np.empty(0, dtype=np.float64)
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+        sample = np.concatenate([self.sample, values])
+        priorities = np.concatenate([self.priorities, self.rng.random(len(values))])
+        if len(sample) > self.sample_size:
+            keep = np.argpartition(priorities, self.sample_size)[:self.sample_size]
+            sample, priorities = sample[keep], priorities[keep]
+        self.sample, self.priorities = sample, priorities
+
+    @property
+    def exact(self):
+        return self.n <= self.sample_size
+
+    def quantiles(self, qs=QUANTILES):
+        if self.n == 0:
+            return {}
+        result = {'min': float(self.min)}
+        result.update({f'p{round(q * 100):02d}': float(v) for q, v in zip(qs, np.quantile(self.sample, qs))})
+        result['max'] = float(self.max)
+        return result
+
+
+class ColumnProfile:
+    """Streaming profile of one raw (unparsed) column."""
+
+    def __init__(self, name, kind='text', top_k=DEFAULT_TOP_K, max_tracked=DEFAULT_MAX_TRACKED,
+                 distinct_k=DEFAULT_DISTINCT_K, sample_size=DEFAULT_SAMPLE_SIZE, seed=0):
+        self.name = name
+        self.kind = kind
+        self.top_k = top_k
+        self.count = 0
+        self.missing = 0
+        self.values = HeavyHitters(max_tracked)
+        self.distinct = DistinctSketch(distinct_k)
+        if kind != 'text':
+            self.failures = HeavyHitters(max_tracked)
+            self.failed = 0
+            self.quantiles = QuantileSketch(sample_size, seed)
+            low, high, bins = HISTOGRAM_BINS[kind]
+            self.edges = np.linspace(low, high, bins + 1)
+            self.histogram = np.zeros(bins, dtype=np.int64)
+            self.below = 0
+            self.above = 0
+        if kind == 'acuity':
+            self.clinical_codes = dict.fromkeys(CLINICAL_CODES, 0)
+
+    def _parse(self, uniques):
+        """Parse distinct raw values the way DataProcessor.clean_frame does; NaN where it fails."""
+        import pandas as pd
+
+        if self.kind == 'acuity':
+            return decode_array(np.asarray(uniques, dtype=object), SURVEY_NOTATIONS)[0]
+        return np.asarray(pd.to_numeric(pd.Series(uniques, dtype=object), errors='coerce'), dtype=np.float64)
+
+    def update(self, series):
+        """Add one chunk of the column (a pandas Series)."""
+        codes, uniques = series.factorize()
+        uniques = list(uniques)
+        present = codes >= 0
+        counts = np.bincount(codes[present], minlength=len(uniques))
+
+        self.count += len(codes)
+        self.missing += int((~present).sum())
+        self.values.update(uniques, counts)
+        self.distinct.update(uniques)
+        if self.kind == 'text' or not uniques:
+            return
+
+        parsed = self._parse(uniques)
+        failed = np.isnan(parsed)
+        self.failed += int(counts[failed].sum())
+        self.failures.update([v for v, f in zip(uniques, failed) if f], counts[failed])
+
+        ok = ~failed
+        self.histogram += np.histogram(parsed[ok], self.edges, weights=counts[ok])[0].astype(np.int64)
+        self.below += int(counts[ok & (parsed < self.edges[0])].sum())
+        self.above += int(counts[ok & (parsed > self.edges[-1])].sum())
+        # Per-row values for the quantile sample, parsed once per distinct value
+        row_values = parsed[codes[present]]
+        self.quantiles.update(row_values[~np.isnan(row_values)])
+
+        if self.kind == 'acuity':
+            for value, count in zip(uniques, counts):
+                if value in self.clinical_codes:
+                    self.clinical_codes[value] += int(count)
+
+    def report(self):
+        report = {
+            'kind': self.kind,
+            'count': self.count,
+            'missing': self.missing,
+            'present': self.count - self.missing,
+            'distinct': self.distinct.estimate(),
+            'distinct_exact': self.distinct.exact,
+            'top_values': self.values.top(self.top_k),
+            'top_values_exact': self.values.exact
+        }
+        if self.kind == 'text':
+            return report
+
+        report.update({
+            'parsed': self.count - self.missing - self.failed,
+            'coercion_failures': self.failed,
+            'failed_values': self.failures.top(self.top_k),
+            'histogram': {
+                'edges': self.edges.tolist(),
+                'counts': self.histogram.tolist(),
+                'below': self.below,
+                'above': self.above
+            },
+            'quantiles': self.quantiles.quantiles(),
+            'quantiles_exact': self.quantiles.exact
+        })
+        if self.kind == 'acuity':
+            report['clinical_codes'] = {code: count for code, count in self.clinical_codes.items() if count}
+        return report
+
+
+class DataProfiler:
+    """
+    Single-pass data quality profile of raw survey columns.
+
+    Chunks are added with update() as they are read, and every statistic is
+    kept in a bounded-memory sketch, so a dataset of any length is profiled in
+    one pass with memory set by the sketch sizes and the chunk size. For each
+    column the report gives counts, distinct values, the most frequent values
+    and, for parsed columns, the values the cleaning step cannot coerce (and
+    so silently drops), a fixed-bin histogram and approximate quantiles.
+    """
+
+    def __init__(self, column_kinds=None, **sketch_options):
+        """
+        Parameters:
+        - column_kinds: Column name -> kind (default: COLUMN_KINDS; other columns are 'text')
+        - sketch_options: top_k, max_tracked, distinct_k, sample_size and seed for each ColumnProfile
+        """
+        self.column_kinds = COLUMN_KINDS if column_kinds is None else column_kinds
+        self.sketch_options = sketch_options
+        self.rows = 0
+        self.columns = {}
+
+    def update(self, chunk):
+        """Add one chunk (a DataFrame of raw column values)."""
+        self.rows += len(chunk)
+        for name in chunk.columns:
+            if name not in self.columns:
+                self.columns[name] = ColumnProfile(name, self.column_kinds.get(name, 'text'), **self.sketch_options)
+            self.columns[name].update(chunk[name])
+        return self
+
+    def report(self):
+        return {'rows': self.rows, 'columns': {name: column.report() for name, column in self.columns.items()}}
+
+
+def profile_frames(frames, **options):
+    """Profile an iterable of DataFrame chunks in one pass. Returns the report dict."""
+    profiler = DataProfiler(**options)
+    for frame in frames:
+        profiler.update(frame)
+    return profiler.report()
+
+
+def log_coercion_failures(report):
+    """Log a warning for each column holding values the cleaning step cannot parse."""
+    for name, column in report['columns'].items():
+        if column.get('coercion_failures'):
+            examples = ', '.join(repr(value) for value, _ in column['failed_values'][:5])
+            logging.warning(f"🚨 {name}: {column['coercion_failures']} values cannot be parsed as "
+                            f"{column['kind']} and are dropped when cleaning (e.g. {examples})")
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from model.data_processor import DataProcessor
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description='Profile the raw survey columns in one streaming pass.')
+    parser.add_argument('data_path', nargs='?', help='Survey CSV (default: the bundled survey)')
+    parser.add_argument('--group-columns', nargs='*', default=(), help="Also profile e.g. 'age' and 'craft'")
+    args = parser.parse_args()
+
+    report = DataProcessor(args.data_path, group_columns=args.group_columns).profile()
+    log_coercion_failures(report)
+    print(json.dumps(report, indent=2))
@@ -1,5 +1,47 @@
 import numpy as np
-import math
+from model.logmar import line_logmar
+
+# int8 codes for duochrome direction arrays (same values as interpret_duochrome_result)
+DIRECTION_RED = -1
+DIRECTION_EQUAL = 0
+DIRECTION_GREEN = 1
+DIRECTION_INVALID = -128
+
+# Intensity factor by level; index 0 and anything outside 1-5 use the 0.5 default
+_INTENSITY_FACTORS = np.array([0.5, 0.25, 0.5, 0.75, 1.0, 1.25])
+
+def encode_duochrome_direction(red_clearer, green_clearer, equal_clarity):
+    """
+    Vectorized interpret_duochrome_result: map boolean flag arrays to int8 direction codes.
+    
+    Rows with no flag set get DIRECTION_INVALID.
+    """
+    red_clearer = np.asarray(red_clearer, dtype=bool)
+    green_clearer = np.asarray(green_clearer, dtype=bool)
+    equal_clarity = np.asarray(equal_clarity, dtype=bool)
+    
+    # Same precedence as the scalar version: equal, then red, then green
+    return np.select(
+        [equal_clarity, red_clearer, green_clearer],
+        [DIRECTION_EQUAL, DIRECTION_RED, DIRECTION_GREEN],
+        DIRECTION_INVALID
+    ).astype(np.int8)
+
+# Stored duochrome answers (first word, case-insensitive) and their direction codes
+DIRECTION_WORDS = {'red': DIRECTION_RED, 'green': DIRECTION_GREEN, 'equal': DIRECTION_EQUAL, 'same': DIRECTION_EQUAL}
+
+def decode_duochrome_direction(values):
+    """
+    Map stored duochrome answers ("red", "Green clearer", "equal", ...) to int8 direction codes.
+    
+    Each distinct value is parsed once; missing or unrecognized answers get DIRECTION_INVALID.
+    """
+    array = np.asarray(values, dtype=object).ravel().astype(str)
+    uniques, codes = np.unique(array, return_inverse=True)
+    decoded = np.array([
+        DIRECTION_WORDS.get((value.split() or [''])[0].lower(), DIRECTION_INVALID) for value in uniques.tolist()
+    ], dtype=np.int8)
+    return decoded[codes.ravel()]
 
 class DuochromePredictor:
     def __init__(self):
@@ -8,8 +50,7 @@ class DuochromePredictor:
     
     def calculate_logmar(self, snellen_numerator, snellen_denominator, letters_correct=0):
         """Calculate LogMAR value from Snellen measurements and letter count."""
-        logmar = math.log10(snellen_denominator / snellen_numerator) - (letters_correct * 0.02)
-        return round(logmar, 2)
+        return line_logmar(snellen_numerator, snellen_denominator, letters_correct)
     
     def interpret_duochrome_result(self, red_clearer, green_clearer, equal_clarity):
         """
@@ -55,6 +96,38 @@ class DuochromePredictor:
         adjustment = duochrome_direction * intensity_factor * self.duochrome_interval_factor
         
         return round(adjustment * 4) / 4  # Round to nearest 0.25D
+    
+    def predict_adjustment_batch(self, snellen_numerator, snellen_denominator,
+                                 letters_correct, direction, intensity_level=3):
+        """
+        Vectorized predict_adjustment for many eyes at once.
+        
+        Parameters:
+        - snellen_numerator, snellen_denominator, letters_correct: Arrays (or scalars)
+          of the Snellen measurement for each eye
+        - direction: int8 array of DIRECTION_* codes (see encode_duochrome_direction)
+        - intensity_level: int8 array (or scalar) of intensity levels 1-5
+        
+        Returns:
+        - (adjustment, valid): float64 adjustments rounded to 0.25D, and a boolean
+          mask that is False where the direction code is invalid (adjustment is NaN there)
+        """
+        direction = np.asarray(direction, dtype=np.int8)
+        intensity_level = np.asarray(intensity_level)
+        snellen_numerator, snellen_denominator, letters_correct, direction, intensity_level = np.broadcast_arrays(
+            snellen_numerator, snellen_denominator, letters_correct, direction, intensity_level
+        )
+        
+        valid = (direction >= DIRECTION_RED) & (direction <= DIRECTION_GREEN)
+        
+        levels = intensity_level.astype(np.int64)
+        levels = np.where((levels >= 1) & (levels <= 5), levels, 0)
+        intensity_factor = _INTENSITY_FACTORS[levels]
+        
+        adjustment = direction * intensity_factor * self.duochrome_interval_factor
+        adjustment = np.round(adjustment * 4) / 4  # Round to nearest 0.25D
+        
+        return np.where(valid, adjustment, np.nan), valid
 
 # Run a test case
 if __name__ == "__main__":
@@ -1,36 +1,108 @@
+import hashlib
 import pickle
 import numpy as np
 import os
+from collections import namedtuple
+from model.logmar import decimal_to_logmar, decimal_to_logmar_batch
+from model.compiled_predictor import CompiledLinearModel
+from model.model_artifact import MODEL_DIR, current_version, load_linear_artifact
+from model.model_registry import registry
+from model.snellen_codec import split_fraction
+
+# One immutable snapshot of both eye models; version is a content hash of the files
+# and feature names the model input ('decimal' VA or 'logmar')
+ModelBundle = namedtuple('ModelBundle', ['model_RE', 'model_LE', 'version', 'feature'], defaults=['decimal'])
 
 class EyePowerPredictor:
-    def __init__(self):
-        """Initialize the eye power predictor model."""
-        self.model_RE = None
-        self.model_LE = None
-        self.load_models()
+    def __init__(self, model_dir=MODEL_DIR):
+        """
+        Initialize the eye power predictor model.
+        
+        Parameters:
+        - model_dir: Directory holding the trained models
+        """
+        self.model_dir = model_dir
+        self._key = ('eye_power', os.path.abspath(model_dir))
     
     def load_models(self):
-        """Load trained models from disk."""
-        model_dir = 'model/saved_models'
+        """
+        Return the current ModelBundle, reading it from disk on first use
+        (once per process, via the shared model registry).
+        """
+        return registry.get(self._key, lambda: self.read_models(self.model_dir), self.validate_models)
+    
+    def reload_models(self, background=True):
+        """
+        Re-read the models from disk and atomically swap them in once validated.
+        
+        Predictions already running finish on the version they started with.
+        """
+        return registry.reload(self._key, background)
+    
+    @property
+    def model_RE(self):
+        return self.load_models().model_RE
+    
+    @property
+    def model_LE(self):
+        return self.load_models().model_LE
+    
+    @property
+    def version(self):
+        """Version of the models currently being served."""
+        return self.load_models().version
+    
+    @staticmethod
+    def read_models(model_dir):
+        """
+        Read the right/left eye models from model_dir into a ModelBundle, bypassing the registry.
+        
+        The published versioned artifact is preferred; the pickles are only read
+        for model directories trained before it existed.
+        """
+        if current_version(model_dir) is not None:
+            models, manifest = load_linear_artifact(model_dir)
+            feature = manifest['models']['RE'].get('transform', 'decimal')
+            return ModelBundle(models['RE'], models['LE'], manifest['version'], feature)
         
         if not os.path.exists(f'{model_dir}/model_RE.pkl') or not os.path.exists(f'{model_dir}/model_LE.pkl'):
             raise FileNotFoundError("❌ Models not found! Train the models first.")
         
         try:
             with open(f'{model_dir}/model_RE.pkl', 'rb') as f:
-                self.model_RE = pickle.load(f)
+                data_RE = f.read()
             with open(f'{model_dir}/model_LE.pkl', 'rb') as f:
-                self.model_LE = pickle.load(f)
+                data_LE = f.read()
+            model_RE = pickle.loads(data_RE)
+            model_LE = pickle.loads(data_LE)
         except (pickle.UnpicklingError, EOFError) as e:
             raise RuntimeError("❌ Error loading models! They might be corrupted.") from e
+        
+        return ModelBundle(model_RE, model_LE, hashlib.sha256(data_RE + data_LE).hexdigest()[:12])
+    
+    @staticmethod
+    def validate_models(bundle):
+        """Raise if a freshly loaded bundle cannot produce finite predictions."""
+        probe = np.array([[0.1], [0.5], [1.0]])
+        for model in (bundle.model_RE, bundle.model_LE):
+            if not np.all(np.isfinite(model.predict(probe))):
+                raise RuntimeError("❌ Loaded model produces non-finite predictions.")
     
     def predict(self, visual_acuity_re, visual_acuity_le):
         """Predict eye power based on visual acuity."""
-        if self.model_RE is None or self.model_LE is None:
-            self.load_models()
+        # Take one snapshot so a concurrent reload cannot mix model versions
+        models = self.load_models()
+        
+        if models.feature == 'logmar':
+            visual_acuity_re = decimal_to_logmar(visual_acuity_re)
+            visual_acuity_le = decimal_to_logmar(visual_acuity_le)
         
-        prescription_re = float(self.model_RE.predict([[visual_acuity_re]])[0])
-        prescription_le = float(self.model_LE.predict([[visual_acuity_le]])[0])
+        if isinstance(models.model_RE, CompiledLinearModel):
+            prescription_re = models.model_RE.predict_one(visual_acuity_re)
+            prescription_le = models.model_LE.predict_one(visual_acuity_le)
+        else:
+            prescription_re = float(models.model_RE.predict([[visual_acuity_re]])[0])
+            prescription_le = float(models.model_LE.predict([[visual_acuity_le]])[0])
         
         # Round to nearest 0.25 diopter
         prescription_re = round(prescription_re * 4) / 4
@@ -38,16 +110,49 @@ class EyePowerPredictor:
         
         return {
             'right_eye': prescription_re,
-            'left_eye': prescription_le
+            'left_eye': prescription_le,
+            'model_version': models.version
+        }
+    
+    def predict_batch(self, visual_acuity_re, visual_acuity_le):
+        """
+        Predict eye power for many patients at once.
+        
+        Parameters:
+        - visual_acuity_re: Array-like of decimal VA values for right eyes
+        - visual_acuity_le: Array-like of decimal VA values for left eyes
+        
+        Returns:
+        - Dictionary with 'right_eye' and 'left_eye' NumPy arrays of
+          prescriptions rounded to the nearest 0.25 diopter, and 'model_version'
+        """
+        models = self.load_models()
+        
+        visual_acuity_re = np.asarray(visual_acuity_re, dtype=np.float64).reshape(-1, 1)
+        visual_acuity_le = np.asarray(visual_acuity_le, dtype=np.float64).reshape(-1, 1)
+        
+        if models.feature == 'logmar':
+            visual_acuity_re = decimal_to_logmar_batch(visual_acuity_re)
+            visual_acuity_le = decimal_to_logmar_batch(visual_acuity_le)
+        
+        # One model call per eye for the whole batch
+        prescription_re = np.asarray(models.model_RE.predict(visual_acuity_re), dtype=np.float64)
+        prescription_le = np.asarray(models.model_LE.predict(visual_acuity_le), dtype=np.float64)
+        
+        # Round to nearest 0.25 diopter (half-to-even, same as round())
+        return {
+            'right_eye': np.round(prescription_re * 4) / 4,
+            'left_eye': np.round(prescription_le * 4) / 4,
+            'model_version': models.version
         }
     
     @staticmethod
     def snellen_to_decimal(snellen_value):
         """Converts Snellen fraction (e.g., 6/6) to a decimal value (e.g., 1.0)."""
         try:
-            num, denom = map(int, snellen_value.split('/'))
+            num, denom = split_fraction(snellen_value, integers=True)
             return num / denom  # Example: 6/12 -> 0.5
-        except (ValueError, AttributeError):
+        except ValueError:
             return None  # Return None if invalid input
     
 # Run a test prediction
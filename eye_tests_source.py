@@ -0,0 +1,142 @@
+import logging
+import re
+import numpy as np
+from model.duochrome_predictor import decode_duochrome_direction
+from model.incremental_trainer import EYES
+from model.snellen_codec import decode_array
+
+DEFAULT_BATCH_SIZE = 10_000
+SOURCE_NAME = 'eye_tests'
+CURSOR_NAME = 'eye_tests_training'
+# Holds the app's own predictions; training on it would fit the model to its own output
+PREDICTION_COLUMN = 'result'
+
+QUERY = """
+SELECT id, right_eye_snellen, left_eye_snellen, right_eye_duochrome, left_eye_duochrome, {right}, {left}
+FROM eye_tests
+WHERE id > %s
+ORDER BY id;
+"""
+
+
+def build_query(target_columns):
+    """
+    Return the batch query reading the measured prescription from target_columns.
+
+    Parameters:
+    - target_columns: (right eye, left eye) names of eye_tests columns holding the
+      measured (e.g. subjective refraction) prescription in diopters
+    """
+    if target_columns is None or len(target_columns) != 2:
+        raise ValueError("❌ eye_tests has no measured prescription column. Pass target_columns=(right, left) "
+                         "naming the columns that hold measured refractions.")
+    for column in target_columns:
+        if not isinstance(column, str) or not re.fullmatch(r'[a-z_][a-z0-9_]*', column):
+            raise ValueError(f"❌ Invalid eye_tests column name {column!r}.")
+        if column == PREDICTION_COLUMN:
+            raise ValueError(f"❌ eye_tests.{PREDICTION_COLUMN} holds the app's predictions, not measured "
+                             f"prescriptions; training on it would feed the model its own output.")
+    return QUERY.format(right=target_columns[0], left=target_columns[1])
+
+
+def rows_to_frame(rows):
+    """
+    Convert fetched eye_tests rows to a vision_data-shaped frame.
+
+    Snellen and duochrome fields are decoded per distinct value with the
+    vectorized codecs and the measured prescriptions are read as numbers.
+    Rows whose acuity or prescription is missing or cannot be read are dropped.
+
+    Returns:
+    - (frame with id, decimal_*, logmar_*, direction_*, prescription_* columns, rows dropped)
+    """
+    import pandas as pd
+
+    ids, snellen_re, snellen_le, duochrome_re, duochrome_le, target_re, target_le = (
+        np.array(column, dtype=object) for column in zip(*rows)
+    )
+    decimal_re, logmar_re = decode_array(snellen_re)
+    decimal_le, logmar_le = decode_array(snellen_le)
+
+    frame = pd.DataFrame({
+        'id': ids.astype(np.int64),
+        'decimal_RE': decimal_re, 'decimal_LE': decimal_le,
+        'logmar_RE': logmar_re, 'logmar_LE': logmar_le,
+        'direction_RE': decode_duochrome_direction(duochrome_re),
+        'direction_LE': decode_duochrome_direction(duochrome_le),
+        'prescription_RE': pd.to_numeric(pd.Series(target_re), errors='coerce').to_numpy(dtype=np.float64),
+        'prescription_LE': pd.to_numeric(pd.Series(target_le), errors='coerce').to_numpy(dtype=np.float64)
+    })
+    numeric = frame[[f'{kind}_{eye}' for kind in ('decimal', 'prescription') for eye in EYES]].to_numpy()
+    keep = ~np.isnan(numeric).any(axis=1)
+    return frame[keep], int((~keep).sum())
+
+
+def iter_eye_test_batches(connection, target_columns, since_id=0, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream eye_tests rows with id > since_id as frames of at most batch_size rows.
+
+    Uses a named (server-side) cursor, so only one batch is held in Python
+    memory at a time however large the table is.
+
+    Parameters:
+    - target_columns: (right eye, left eye) measured prescription columns (see build_query)
+    """
+    query = build_query(target_columns)
+    with connection.cursor(name=CURSOR_NAME) as cursor:
+        cursor.itersize = batch_size
+        cursor.execute(query, (since_id,))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            frame, dropped = rows_to_frame(rows)
+            if dropped:
+                logging.warning(f"🚨 Skipped {dropped} eye_tests rows without a readable acuity or prescription")
+            yield frame, last_id
+
+
+def train_from_eye_tests(trainer, connection, target_columns, batch_size=DEFAULT_BATCH_SIZE, allow_fresh=False):
+    """
+    Fold every eye_tests row not yet seen into an IncrementalTrainer and publish.
+
+    The target is the measured prescription in target_columns; eye_tests.result
+    is refused because it holds the app's own predictions. The last folded id is
+    saved with the trainer's statistics, so repeated runs only read new rows
+    (a row whose measurement is recorded after it has been read is not revisited).
+
+    Parameters:
+    - trainer: IncrementalTrainer (its persisted statistics are loaded first)
+    - connection: Open psycopg2 connection; left open
+    - target_columns: (right eye, left eye) measured prescription columns
+    - allow_fresh: Start from empty statistics when the trainer has none saved;
+      otherwise that raises, so the published models are never replaced by a
+      fit on the eye_tests rows alone
+
+    Returns:
+    - The published artifact version, or None if there were no new rows
+    """
+    build_query(target_columns)  # refuse before touching the trainer or the database
+    if not trainer.load():
+        if not allow_fresh:
+            raise FileNotFoundError(
+                f"❌ No training statistics in {trainer.model_dir}! Run DataProcessor.train_model first, "
+                "or pass allow_fresh=True to train on the eye_tests rows only."
+            )
+        logging.warning("🚨 No training statistics found; starting from the eye_tests rows only.")
+    since_id = trainer.positions.get(SOURCE_NAME, 0)
+
+    folded = 0
+    for frame, last_id in iter_eye_test_batches(connection, target_columns, since_id, batch_size):
+        trainer.partial_fit_frame(frame)
+        trainer.positions[SOURCE_NAME] = int(last_id)
+        folded += len(frame)
+    connection.rollback()  # read-only; ends the transaction holding the named cursor
+
+    if trainer.positions.get(SOURCE_NAME, 0) == since_id:
+        logging.info(f"✅ No new eye_tests rows after id {since_id}")
+        return None
+    logging.info(f"✅ Folded {folded} eye_tests rows (ids {since_id + 1}-{trainer.positions[SOURCE_NAME]})")
+    return trainer.publish({'source': SOURCE_NAME, 'target_columns': list(target_columns),
+                            'last_id': trainer.positions[SOURCE_NAME]})
@@ -0,0 +1,115 @@
+import json
+import os
+import numpy as np
+from model.incremental_trainer import EYES, FEATURES
+
+# Column order of the spilled matrix
+FEATURE_COLUMNS = tuple(
+    f'{kind}_{eye}' for kind in FEATURES + ('prescription',) for eye in EYES
+)
+DEFAULT_CHUNK_ROWS = 1_000_000
+STORE_FORMAT_VERSION = 1
+
+DATA_FILENAME = 'features.f32'
+META_FILENAME = 'features.json'
+
+
+class FeatureStore:
+    """
+    Cleaned features and targets spilled to disk as one float32 matrix.
+
+    Rows are appended chunk by chunk to a raw little-endian float32 file, and a
+    small JSON file records the row count, column order and a fingerprint of
+    what the rows were built from. Readers memory-map the matrix, so neither
+    writing nor reading ever holds more than a chunk.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters:
+        - path: Directory holding features.f32 and features.json
+        """
+        self.path = path
+        self.data_path = os.path.join(path, DATA_FILENAME)
+        self.meta_path = os.path.join(path, META_FILENAME)
+
+    def _meta(self):
+        with open(self.meta_path) as f:
+            return json.load(f)
+
+    @property
+    def rows(self):
+        return self._meta()['rows']
+
+    def exists(self):
+        return os.path.exists(self.meta_path)
+
+    def matches(self, fingerprint):
+        """Return True if the store exists and was written from data with this fingerprint."""
+        if fingerprint is None or not self.exists():
+            return False
+        meta = self._meta()
+        return meta.get('format_version') == STORE_FORMAT_VERSION and meta.get('fingerprint') == fingerprint
+
+    def write(self, frames, fingerprint=None):
+        """
+        Replace the store with the rows of an iterable of cleaned frames.
+
+        The metadata is written last, so an interrupted write leaves no
+        readable store behind.
+
+        Parameters:
+        - frames: Iterable of cleaned vision_data frames
+        - fingerprint: JSON-serializable description of the source and cleaning
+          code the frames came from (see matches), or None if unknown
+
+        Returns:
+        - Number of rows written
+        """
+        os.makedirs(self.path, exist_ok=True)
+        if os.path.exists(self.meta_path):
+            os.remove(self.meta_path)
+
+        rows = 0
+        with open(self.data_path, 'wb') as f:
+            for frame in frames:
+                block = np.column_stack([frame[name].to_numpy(dtype='<f4') for name in FEATURE_COLUMNS])
+                f.write(np.ascontiguousarray(block, dtype='<f4').tobytes())
+                rows += len(block)
+
+        tmp_path = f'{self.meta_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'format_version': STORE_FORMAT_VERSION, 'rows': rows, 'columns': list(FEATURE_COLUMNS),
+                       'dtype': '<f4', 'fingerprint': fingerprint}, f)
+        os.replace(tmp_path, self.meta_path)
+        return rows
+
+    def open(self):
+        """Memory-map the matrix read-only as a (rows, columns) float32 array."""
+        meta = self._meta()
+        if tuple(meta['columns']) != FEATURE_COLUMNS:
+            raise ValueError(f"❌ Feature store {self.path} has columns {meta['columns']}, expected {FEATURE_COLUMNS}")
+        if meta['rows'] == 0:
+            return np.empty((0, len(FEATURE_COLUMNS)), dtype='<f4')
+        return np.memmap(self.data_path, dtype=meta['dtype'], mode='r', shape=(meta['rows'], len(FEATURE_COLUMNS)))
+
+    def iter_chunks(self, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """Yield consecutive row blocks of the memory-mapped matrix."""
+        matrix = self.open()
+        for start in range(0, len(matrix), chunk_rows):
+            yield matrix[start:start + chunk_rows]
+
+    def fit(self, trainer, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Fold every row into an IncrementalTrainer, one chunk at a time.
+
+        Each chunk is widened to float64 and reduced to sufficient statistics
+        (means and centered normal equations) before the next one is read, so
+        peak memory depends on chunk_rows, not on the number of rows stored.
+        """
+        column = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+        for chunk in self.iter_chunks(chunk_rows):
+            for eye in EYES:
+                trainer.partial_fit(eye, chunk[:, column[f'{trainer.feature}_{eye}']],
+                                    chunk[:, column[f'prescription_{eye}']])
+        return trainer
@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+import tempfile
+import numpy as np
+from model.compiled_predictor import CompiledLinearModel
+from model.model_artifact import current_manifest, save_linear_artifact
+
+STATS_FORMAT_VERSION = 1
+# Sufficient statistics live next to the published artifacts they produced
+STATS_FILENAME = 'training_stats.npz'
+EYES = ('RE', 'LE')
+# Model inputs: decimal visual acuity or its LogMAR transform
+FEATURES = ('decimal', 'logmar')
+
+
+def check_feature(feature):
+    """Raise ValueError unless feature is one of FEATURES."""
+    if feature not in FEATURES:
+        raise ValueError(f"❌ Unknown feature '{feature}'. Use {' or '.join(repr(f) for f in FEATURES)}.")
+
+
+class SufficientStats:
+    """
+    Sufficient statistics of an ordinary least squares fit with intercept.
+
+    Keeps the row count, feature and target means, and the centered
+    co-moments X'X and X'y. Batches are merged with the pairwise update of
+    Chan et al., which stays numerically stable without holding any rows.
+    """
+    __slots__ = ('n', 'mean_x', 'mean_y', 'sxx', 'sxy')
+
+    def __init__(self, n, mean_x, mean_y, sxx, sxy):
+        self.n = int(n)
+        self.mean_x = np.asarray(mean_x, dtype=np.float64)
+        self.mean_y = float(mean_y)
+        self.sxx = np.asarray(sxx, dtype=np.float64)
+        self.sxy = np.asarray(sxy, dtype=np.float64)
+
+    @classmethod
+    def empty(cls, n_features=1):
+        return cls(0, np.zeros(n_features), 0.0, np.zeros((n_features, n_features)), np.zeros(n_features))
+
+    @classmethod
+    def from_arrays(cls, X, y):
+        """Compute statistics for a batch of rows (X: 2D features, y: 1D target)."""
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if X.ndim == 1:
+            X = X[:, None]
+        if len(X) == 0:
+            return cls.empty(X.shape[1])
+
+        mean_x = X.mean(axis=0)
+        mean_y = y.mean()
+        Xc = X - mean_x
+        return cls(len(X), mean_x, mean_y, Xc.T @ Xc, Xc.T @ (y - mean_y))
+
+    def merge(self, other):
+        """Return the statistics of both batches combined."""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            return other
+
+        n = self.n + other.n
+        delta_x = other.mean_x - self.mean_x
+        delta_y = other.mean_y - self.mean_y
+        weight = self.n * other.n / n
+        return SufficientStats(
+            n,
+            self.mean_x + delta_x * (other.n / n),
+            self.mean_y + delta_y * (other.n / n),
+            self.sxx + other.sxx + weight * np.outer(delta_x, delta_x),
+            self.sxy + other.sxy + weight * delta_x * delta_y
+        )
+
+    def solve(self):
+        """Return the least squares model for the accumulated rows."""
+        if self.n == 0:
+            raise ValueError("❌ Cannot fit a model without any training rows.")
+        # lstsq gives the minimum-norm solution when X'X is singular, as LinearRegression does
+        coef = np.linalg.lstsq(self.sxx, self.sxy, rcond=None)[0]
+        return CompiledLinearModel(coef, self.mean_y - self.mean_x @ coef)
+
+
+class IncrementalTrainer:
+    """
+    Train the per-eye prescription models by folding in batches of rows.
+
+    Each batch costs O(rows) and the persisted statistics never grow, so new
+    survey batches or saved eye tests can be added continuously instead of
+    refitting on the full history. The resulting coefficients equal a full
+    LinearRegression refit on all rows seen, up to floating-point rounding.
+    """
+
+    def __init__(self, model_dir, feature='decimal'):
+        """
+        Parameters:
+        - model_dir: Directory the models are published to and the statistics stored in
+        - feature: Model input, either 'decimal' visual acuity or 'logmar'
+        """
+        check_feature(feature)
+        self.model_dir = model_dir
+        self.feature = feature
+        self.stats = {eye: SufficientStats.empty() for eye in EYES}
+        # How far each streamed source has been folded in (e.g. {'eye_tests': last id}),
+        # saved with the statistics so a row is never counted twice
+        self.positions = {}
+
+    @property
+    def stats_path(self):
+        return os.path.join(self.model_dir, STATS_FILENAME)
+
+    def load(self):
+        """Load persisted statistics, if any. Returns True if they were found."""
+        if not os.path.exists(self.stats_path):
+            return False
+
+        with np.load(self.stats_path, allow_pickle=False) as data:
+            if int(data['format_version']) != STATS_FORMAT_VERSION:
+                raise ValueError(f"❌ Unsupported training statistics format: {int(data['format_version'])}")
+            if str(data['feature']) != self.feature:
+                raise ValueError(
+                    f"❌ Stored statistics are for feature '{data['feature']}', not '{self.feature}'."
+                )
+            self.stats = {
+                eye: SufficientStats(*(data[f'{eye}.{field}'] for field in SufficientStats.__slots__))
+                for eye in EYES
+            }
+            self.positions = json.loads(data['positions'].item()) if 'positions' in data else {}
+        return True
+
+    def save(self):
+        """Persist the statistics atomically."""
+        arrays = {
+            'format_version': np.array(STATS_FORMAT_VERSION),
+            'feature': np.array(self.feature),
+            'positions': np.array(json.dumps(self.positions))
+        }
+        for eye, stats in self.stats.items():
+            for field in SufficientStats.__slots__:
+                arrays[f'{eye}.{field}'] = np.asarray(getattr(stats, field))
+
+        os.makedirs(self.model_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.training_stats-', suffix='.npz', dir=self.model_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self.stats_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def partial_fit(self, eye, X, y):
+        """Fold a batch of rows for one eye into the statistics."""
+        self.stats[eye] = self.stats[eye].merge(SufficientStats.from_arrays(X, y))
+
+    def partial_fit_frame(self, vision_data):
+        """Fold in a cleaned vision_data frame (see DataProcessor.clean_data)."""
+        for eye in EYES:
+            self.partial_fit(eye, vision_data[[f'{self.feature}_{eye}']].values,
+                             vision_data[f'prescription_{eye}'].values)
+
+    @property
+    def rows(self):
+        return {eye: stats.n for eye, stats in self.stats.items()}
+
+    def models(self):
+        """Return the current per-eye models as CompiledLinearModel."""
+        return {eye: stats.solve() for eye, stats in self.stats.items()}
+
+    def publish(self, training_data=None, replace_other_models=False):
+        """
+        Save the statistics and publish the models solved from them.
+
+        Only the global RE/LE models can be solved from the statistics. If the
+        published artifact also holds other models (e.g. the group models of
+        TrainingEngine), publishing would drop them, so it raises instead.
+
+        Parameters:
+        - training_data: Optional dict describing the training data
+        - replace_other_models: Publish anyway, dropping those models (for a full retrain)
+
+        Returns:
+        - The published artifact version
+        """
+        manifest = current_manifest(self.model_dir)
+        others = sorted(set(manifest['models']) - set(EYES)) if manifest else []
+        if others and not replace_other_models:
+            raise ValueError(
+                f"❌ Published version {manifest['version']} holds models {others} that the training "
+                "statistics cannot reproduce. Retrain them with TrainingEngine instead."
+            )
+
+        models = self.models()
+        feature_schema = {
+            eye: {'features': [f'{self.feature}_{eye}'], 'target': f'prescription_{eye}', 'transform': self.feature}
+            for eye in EYES
+        }
+        self.save()
+        version = save_linear_artifact(
+            self.model_dir, models, feature_schema, {'rows': self.rows, **(training_data or {})}
+        )
+        logging.info(f"✅ Incrementally trained models published as version {version} ({self.rows} rows)")
+        return version
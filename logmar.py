@@ -0,0 +1,85 @@
+import math
+import numpy as np
+
+# Standard chart lines as (numerator, denominator): 6 m metric and 20 ft imperial charts
+METRIC_LINES = tuple((6, d) for d in (3, 3.8, 4.8, 5, 6, 7.5, 9, 12, 15, 18, 24, 30, 36, 48, 60))
+IMPERIAL_LINES = tuple((20, d) for d in (10, 12.5, 16, 20, 25, 32, 40, 50, 63, 70, 80, 100, 125, 160, 200, 400))
+STANDARD_LINES = METRIC_LINES + IMPERIAL_LINES
+
+# Letters per line that can earn partial-line credit (ETDRS layout)
+MAX_LETTERS = 5
+LETTER_CREDIT = 0.02
+
+# LogMAR used for zero or negative decimal acuity (no perception of light)
+MAX_LOGMAR = 3.0
+
+# --- Precomputed tables -------------------------------------------------------
+# Line table: LogMAR with partial-line credit, exactly as
+# DuochromePredictor.calculate_logmar has always computed it.
+_LINE_RATIOS = np.array(sorted({d / n for n, d in STANDARD_LINES}))
+_LINE_TABLE = np.array([
+    [round(math.log10(ratio) - letters * LETTER_CREDIT, 2) for letters in range(MAX_LETTERS + 1)]
+    for ratio in _LINE_RATIOS
+])
+_LINE_LOOKUP = {
+    (ratio, letters): _LINE_TABLE[i, letters]
+    for i, ratio in enumerate(_LINE_RATIOS.tolist()) for letters in range(MAX_LETTERS + 1)
+}
+
+# Decimal table: unrounded LogMAR feature for the decimal acuity of every line
+_DECIMAL_GRID = np.array(sorted({n / d for n, d in STANDARD_LINES}))
+_DECIMAL_TABLE = -np.log10(_DECIMAL_GRID)
+_DECIMAL_LOOKUP = dict(zip(_DECIMAL_GRID.tolist(), _DECIMAL_TABLE.tolist()))
+
+
+def line_logmar(snellen_numerator, snellen_denominator, letters_correct=0):
+    """LogMAR of a Snellen line with partial-line credit, rounded to 2 decimals."""
+    value = _LINE_LOOKUP.get((snellen_denominator / snellen_numerator, letters_correct))
+    if value is not None:
+        return float(value)
+    return round(math.log10(snellen_denominator / snellen_numerator) - letters_correct * LETTER_CREDIT, 2)
+
+
+def line_logmar_batch(snellen_numerator, snellen_denominator, letters_correct=0):
+    """Vectorized line_logmar over arrays of Snellen numerators, denominators and letters."""
+    numerator, denominator, letters = np.broadcast_arrays(
+        np.asarray(snellen_numerator, dtype=np.float64),
+        np.asarray(snellen_denominator, dtype=np.float64),
+        np.asarray(letters_correct)
+    )
+    ratio = denominator / numerator
+    index = np.minimum(np.searchsorted(_LINE_RATIOS, ratio), len(_LINE_RATIOS) - 1)
+    hit = (_LINE_RATIOS[index] == ratio) & (letters >= 0) & (letters <= MAX_LETTERS) & (letters == np.round(letters))
+
+    result = np.empty(ratio.shape, dtype=np.float64)
+    result[hit] = _LINE_TABLE[index[hit], letters[hit].astype(np.int64)]
+    miss = ~hit
+    if miss.any():
+        result[miss] = np.round(np.log10(ratio[miss]) - letters[miss] * LETTER_CREDIT, 2)
+    return result
+
+
+def decimal_to_logmar(visual_acuity):
+    """Convert one decimal visual acuity to LogMAR (the model feature), using the chart table when possible."""
+    value = _DECIMAL_LOOKUP.get(visual_acuity)
+    if value is not None:
+        return value
+    if visual_acuity <= 0:
+        return MAX_LOGMAR
+    return -math.log10(visual_acuity)
+
+
+def decimal_to_logmar_batch(visual_acuity):
+    """Vectorized decimal_to_logmar; NaN stays NaN."""
+    visual_acuity = np.asarray(visual_acuity, dtype=np.float64)
+    index = np.minimum(np.searchsorted(_DECIMAL_GRID, visual_acuity), len(_DECIMAL_GRID) - 1)
+    hit = _DECIMAL_GRID[index] == visual_acuity
+
+    result = np.empty(visual_acuity.shape, dtype=np.float64)
+    result[hit] = _DECIMAL_TABLE[index[hit]]
+    miss = ~hit
+    if miss.any():
+        values = visual_acuity[miss]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result[miss] = np.where(values <= 0, MAX_LOGMAR, -np.log10(values))
+    return result
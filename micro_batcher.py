@@ -0,0 +1,123 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent prediction calls into one vectorized call.
+
+    Callers submit single items and get a Future back. A background thread
+    collects items until max_batch_size is reached or max_wait seconds have
+    passed since the first item of the batch arrived, then calls
+    batch_fn(items) once and resolves every Future with its element of the
+    returned sequence. If batch_fn raises, or returns a different number of
+    results than items, every Future in the batch gets the exception.
+
+    The thread is started lazily on first submit, so a batcher created before
+    a fork starts its own thread in each worker.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=64, max_wait=0.002, wait_samples=1024):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+        # Metrics
+        self._batches = 0
+        self._items = 0
+        self._batch_sizes = [0] * (max_batch_size + 1)
+        self._waits = deque(maxlen=wait_samples)
+
+    def submit(self, item):
+        """Queue one item for prediction and return a Future for its result."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def _ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    self._queue.put(None)  # finish this batch, then stop
+                    break
+                batch.append(entry)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        start = time.perf_counter()
+        items = [item for item, _, _ in batch]
+        futures = [future for _, future, _ in batch]
+
+        self._batches += 1
+        self._items += len(batch)
+        self._batch_sizes[len(batch)] += 1
+        self._waits.extend(start - submitted for _, _, submitted in batch)
+
+        try:
+            results = list(self.batch_fn(items))
+            if len(results) != len(batch):
+                # Results can no longer be matched to items by position, so none of them is trusted
+                raise RuntimeError(f"❌ batch_fn returned {len(results)} results for {len(batch)} items.")
+        except Exception as e:
+            logging.error(f"🚨 Batched prediction failed for {len(batch)} items: {e}")
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+    def metrics(self):
+        """Return batch-size and queue-wait statistics (waits in milliseconds)."""
+        waits = sorted(self._waits)
+
+        def percentile(p):
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(p / 100 * len(waits)))] * 1000, 3)
+
+        return {
+            'batches': self._batches,
+            'items': self._items,
+            'mean_batch_size': round(self._items / self._batches, 2) if self._batches else None,
+            'batch_size_histogram': {size: count for size, count in enumerate(self._batch_sizes) if count},
+            'queue_wait_ms': {'p50': percentile(50), 'p99': percentile(99), 'max': percentile(100)}
+        }
+
+    def close(self):
+        """Stop the background thread after the queued items are processed."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from model.compiled_predictor import CompiledLinearModel
+
+ARTIFACT_FORMAT_VERSION = 1
+# Where models are published and served from. Anchored to this package, not the
+# working directory, so training and serving always agree on it
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model', 'saved_models')
+ARTIFACTS_DIRNAME = 'artifacts'
+MANIFEST_FILENAME = 'manifest.json'
+# Small pointer file naming the artifact version currently published in a model directory
+CURRENT_FILENAME = 'CURRENT'
+# Published versions kept on disk for rollback; older ones are pruned on publish
+KEEP_VERSIONS = 5
+# Staging directories older than this were left behind by a failed publish
+STALE_STAGING_SECONDS = 3600
+
+
+def fingerprint_arrays(*arrays):
+    """Return a SHA-256 fingerprint of the dtype, shape and bytes of the given arrays."""
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f'{array.dtype.str}{array.shape}'.encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_linear_artifact(model_dir, models, feature_schema, training_data=None, keep=KEEP_VERSIONS):
+    """
+    Publish a set of linear models as a versioned artifact.
+
+    Coefficients are written as flat .npy files next to a manifest.json holding
+    their SHA-256 hashes, the feature schema and the training-data fingerprint.
+    The artifact directory is named after its content hash and is published by
+    atomically replacing the CURRENT pointer file.
+
+    Parameters:
+    - model_dir: Directory holding the artifacts/ folder and CURRENT pointer
+    - models: Dict mapping model name (e.g. 'RE') to a fitted LinearRegression
+      or CompiledLinearModel
+    - feature_schema: Dict mapping model name to {'features': [...], 'target': ...,
+      'transform': 'decimal' | 'logmar'}
+    - training_data: Optional dict describing the training data (fingerprint, rows, source)
+    - keep: Number of most recently published versions to keep (see prune_artifacts);
+      None keeps every version
+
+    Returns:
+    - The published artifact version
+    """
+    artifacts_dir = os.path.join(model_dir, ARTIFACTS_DIRNAME)
+    os.makedirs(artifacts_dir, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(prefix='.staging-', dir=artifacts_dir)
+
+    manifest_models = {}
+    for name, model in models.items():
+        if not isinstance(model, CompiledLinearModel):
+            model = CompiledLinearModel.from_estimator(model)
+        arrays = {
+            'coef': np.asarray(model.coef, dtype=np.float64),
+            'intercept': np.asarray([model.intercept], dtype=np.float64)
+        }
+        manifest_models[name] = {'type': 'linear', 'arrays': {}, **feature_schema[name]}
+        for array_name, array in arrays.items():
+            filename = f'{name}.{array_name}.npy'
+            path = os.path.join(staging_dir, filename)
+            np.save(path, array, allow_pickle=False)
+            manifest_models[name]['arrays'][array_name] = {
+                'file': filename,
+                'dtype': array.dtype.str,
+                'shape': list(array.shape),
+                'sha256': file_sha256(path)
+            }
+
+    content = json.dumps(manifest_models, sort_keys=True).encode()
+    version = hashlib.sha256(content).hexdigest()[:12]
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'version': version,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'training_data': training_data or {},
+        'models': manifest_models
+    }
+    with open(os.path.join(staging_dir, MANIFEST_FILENAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    final_dir = os.path.join(artifacts_dir, version)
+    if os.path.exists(final_dir):
+        # Identical content is already on disk; just point CURRENT at it
+        for filename in os.listdir(staging_dir):
+            os.remove(os.path.join(staging_dir, filename))
+        os.rmdir(staging_dir)
+        os.utime(final_dir)  # published again, so it counts as recent when pruning
+    else:
+        os.rename(staging_dir, final_dir)
+
+    pointer_tmp = os.path.join(model_dir, f'.{CURRENT_FILENAME}.tmp')
+    with open(pointer_tmp, 'w') as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(model_dir, CURRENT_FILENAME))
+
+    if keep is not None:
+        prune_artifacts(model_dir, keep)
+    return version
+
+
+def prune_artifacts(model_dir, keep=KEEP_VERSIONS):
+    """
+    Delete all but the `keep` most recently published artifact versions.
+
+    The version named by CURRENT is never deleted, even if it is older (after
+    a rollback). Staging directories left behind by failed publishes are
+    removed once they are STALE_STAGING_SECONDS old; newer ones may belong to
+    a publish in progress and are left alone.
+
+    Returns:
+    - List of the deleted version names
+    """
+    artifacts_dir = os.path.join(model_dir, ARTIFACTS_DIRNAME)
+    if not os.path.isdir(artifacts_dir):
+        return []
+
+    current = current_version(model_dir)
+    versions, now = [], time.time()
+    for entry in os.scandir(artifacts_dir):
+        if not entry.is_dir():
+            continue
+        if entry.name.startswith('.staging-'):
+            if now - entry.stat().st_mtime > STALE_STAGING_SECONDS:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        elif entry.name != current:
+            versions.append((entry.stat().st_mtime, entry.name))
+
+    # CURRENT takes one of the kept slots
+    versions.sort(reverse=True)
+    removed = [name for _, name in versions[max(keep - (current is not None), 0):]]
+    for name in removed:
+        shutil.rmtree(os.path.join(artifacts_dir, name), ignore_errors=True)
+    return removed
+
+
+def current_version(model_dir):
+    """Return the published artifact version in model_dir, or None if there is none."""
+    try:
+        with open(os.path.join(model_dir, CURRENT_FILENAME)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def current_manifest(model_dir):
+    """Return the manifest of the published artifact in model_dir, or None if there is none."""
+    version = current_version(model_dir)
+    if version is None:
+        return None
+    with open(os.path.join(model_dir, ARTIFACTS_DIRNAME, version, MANIFEST_FILENAME)) as f:
+        return json.load(f)
+
+
+def load_linear_artifact(model_dir, version=None, verify=True):
+    """
+    Load a published artifact without unpickling anything.
+
+    The coefficient arrays are a few floats each, so they are read into
+    CompiledLinearModel's plain float tuples rather than kept as arrays.
+
+    Returns:
+    - (models, manifest) where models maps name -> CompiledLinearModel
+    """
+    version = version or current_version(model_dir)
+    if version is None:
+        raise FileNotFoundError(f"❌ No model artifact published in {model_dir}! Train the models first.")
+
+    artifact_dir = os.path.join(model_dir, ARTIFACTS_DIRNAME, version)
+    with open(os.path.join(artifact_dir, MANIFEST_FILENAME)) as f:
+        manifest = json.load(f)
+
+    if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise RuntimeError(f"❌ Unsupported model artifact format: {manifest.get('format_version')}")
+
+    models = {}
+    for name, spec in manifest['models'].items():
+        arrays = {}
+        for array_name, array_spec in spec['arrays'].items():
+            path = os.path.join(artifact_dir, array_spec['file'])
+            if verify and file_sha256(path) != array_spec['sha256']:
+                raise RuntimeError(f"❌ Checksum mismatch for {path}! The artifact might be corrupted.")
+            arrays[array_name] = np.load(path, allow_pickle=False)
+        models[name] = CompiledLinearModel(arrays['coef'], arrays['intercept'][0])
+
+    return models, manifest
+
+
+# Migrate legacy pickled models to the artifact format
+if __name__ == "__main__":
+    import pickle
+
+    model_dir = MODEL_DIR
+    models = {}
+    for name in ('RE', 'LE'):
+        with open(f'{model_dir}/model_{name}.pkl', 'rb') as f:
+            models[name] = pickle.load(f)
+
+    schema = {
+        name: {'features': [f'decimal_{name}'], 'target': f'prescription_{name}', 'transform': 'decimal'}
+        for name in models
+    }
+    print(f"Published model artifact {save_linear_artifact(model_dir, models, schema)}")
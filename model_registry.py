@@ -0,0 +1,225 @@
+import gc
+import logging
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ModelRegistry:
+    """
+    Process-wide store of loaded model artifacts.
+
+    Each artifact is loaded exactly once per process and the same object is
+    handed to every caller, so predictors must treat what they get back as
+    read-only. NumPy arrays on loaded objects are flagged non-writeable to
+    catch accidental mutation.
+
+    Artifacts can be reloaded while serving: the new version is loaded and
+    validated in a background thread and then swapped in with a single dict
+    assignment, so callers that already hold the old object keep using it and
+    nobody waits on the reload.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._loaders = {}
+        self._timings = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+        # Created up front so reload() never has to take _lock (it may be called
+        # while a get() on the same thread holds it); no thread starts until first use
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model-reload')
+
+    def get(self, key, loader, validate=None):
+        """
+        Return the artifact registered under key, loading it on first use.
+
+        Parameters:
+        - key: Hashable identifier of the artifact (e.g. its absolute path)
+        - loader: Zero-argument callable that reads the artifact from disk
+        - validate: Optional callable that raises if a loaded artifact is unusable;
+          also used for every later reload
+        """
+        try:
+            return self._models[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if key not in self._models:
+                self._loaders[key] = (loader, validate)
+                self._load(key, loader, validate)
+            return self._models[key]
+
+    def _load(self, key, loader, validate):
+        start = time.perf_counter()
+        model = loader()
+        if validate is not None:
+            validate(model)
+        elapsed = time.perf_counter() - start
+        _make_read_only(model)
+
+        # Single dict assignment: readers see either the old or the new model
+        self._models[key] = model
+        self._timings[key] = elapsed
+        self._generations[key] = self._generations.get(key, 0) + 1
+        logging.info(f"Loaded model {key} (version {self.version(key)}) in {elapsed * 1000:.1f} ms")
+        return model
+
+    def reload(self, key, background=True):
+        """
+        Load key again with its registered loader and swap it in if it validates.
+
+        Returns a Future when background is True, otherwise the new model. If
+        loading or validation fails the current model stays in place.
+        """
+        loader, validate = self._loaders[key]
+
+        def _reload():
+            try:
+                return self._load(key, loader, validate)
+            except Exception as e:
+                logging.error(f"🚨 Reload of model {key} failed, keeping version {self.version(key)}: {e}")
+                raise
+
+        if not background:
+            return _reload()
+        return self._executor.submit(_reload)
+
+    def reload_all(self, background=True):
+        """Reload every registered artifact; returns a dict of key -> Future (or model)."""
+        return {key: self.reload(key, background) for key in list(self._loaders)}
+
+    def version(self, key):
+        """Return the artifact's own version attribute, or how many times it has been loaded."""
+        model = self._models.get(key)
+        return getattr(model, 'version', self._generations.get(key))
+
+    def preload(self, loaders, freeze=True):
+        """
+        Load artifacts up front, typically in a parent process before forking workers.
+
+        Parameters:
+        - loaders: Dict mapping key -> loader, as passed to get()
+        - freeze: Move everything allocated so far into the garbage collector's
+          permanent generation (gc.freeze), so collections in forked workers do
+          not touch these objects and their pages stay shared copy-on-write
+        """
+        for key, loader in loaders.items():
+            self.get(key, loader)
+        if freeze:
+            gc.freeze()
+
+    def timings(self):
+        """Return a dict of key -> load time in seconds of the current version."""
+        return dict(self._timings)
+
+    def __contains__(self, key):
+        return key in self._models
+
+    def clear(self):
+        """Forget all loaded artifacts (mainly for tests)."""
+        with self._lock:
+            self._models.clear()
+            self._loaders.clear()
+            self._timings.clear()
+            self._generations.clear()
+
+
+class ModelWatcher:
+    """
+    Poll a model directory and call a function once its files have changed.
+
+    A change only fires after the directory has looked the same for one more
+    poll, so half-copied files are not picked up.
+    """
+
+    def __init__(self, model_dir, on_change, interval=2.0):
+        self.model_dir = model_dir
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _signature(self):
+        try:
+            entries = list(os.scandir(self.model_dir))
+        except FileNotFoundError:
+            return ()
+        return tuple(sorted(
+            (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+            for entry in entries if entry.is_file()
+        ))
+
+    def _run(self):
+        current = self._signature()
+        pending = None
+        while not self._stop.wait(self.interval):
+            signature = self._signature()
+            if signature == current:
+                pending = None
+            elif signature != pending:
+                pending = signature
+            else:
+                current, pending = signature, None
+                try:
+                    self.on_change()
+                except Exception as e:
+                    logging.error(f"🚨 Model reload trigger failed: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def reload_on_signal(signum=signal.SIGHUP, target=None):
+    """
+    Reload every model in target (default: the shared registry) when signum is received.
+
+    Python runs signal handlers on the main thread between bytecodes, possibly
+    while that thread holds a lock, so the handler must not take any. It only
+    writes a byte to a non-blocking pipe; a daemon thread waiting on the pipe
+    does the reload.
+    """
+    target = target or registry
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(write_fd, False)
+
+    def _notify(*_):
+        try:
+            os.write(write_fd, b'\0')
+        except BlockingIOError:
+            pass  # Pipe full: a reload is already pending
+
+    def _serve():
+        while os.read(read_fd, 512):
+            try:
+                target.reload_all()
+            except Exception as e:
+                logging.error(f"🚨 Model reload on signal {signum} failed: {e}")
+
+    threading.Thread(target=_serve, name='model-reload-signal', daemon=True).start()
+    signal.signal(signum, _notify)
+
+
+def _make_read_only(model):
+    """Mark NumPy arrays held by a model (or a tuple of models) as non-writeable."""
+    items = model if isinstance(model, (tuple, list)) else (model,)
+    for item in items:
+        for value in getattr(item, '__dict__', {}).values():
+            if hasattr(value, 'setflags'):
+                value.setflags(write=False)
+
+
+# Shared registry used by all predictors in this process
+registry = ModelRegistry()
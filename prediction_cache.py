@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def canonical_key(eye_data):
+    """Canonical, hashable form of the prepared input to CombinedEyePowerPredictor.predict."""
+    return (
+        eye_data['visual_acuity_re'],
+        eye_data['visual_acuity_le'],
+        eye_data['snellen_re']['numerator'], eye_data['snellen_re']['denominator'],
+        eye_data['snellen_le']['numerator'], eye_data['snellen_le']['denominator'],
+        _duochrome_key(eye_data['duochrome_re']),
+        _duochrome_key(eye_data['duochrome_le'])
+    )
+
+
+def _duochrome_key(duochrome_data):
+    return (
+        bool(duochrome_data['red_clearer']),
+        bool(duochrome_data['green_clearer']),
+        bool(duochrome_data['equal_clarity']),
+        duochrome_data['intensity_level'],
+        duochrome_data.get('letters_correct', 0)
+    )
+
+
+class PredictionCache:
+    """
+    Thread-safe bounded LRU cache of prediction results, with optional TTL.
+
+    Entries belong to one model version: as soon as a lookup or insert arrives
+    for a different version, the whole cache is dropped, so results from a
+    replaced model are never served.
+    """
+
+    def __init__(self, maxsize=4096, ttl=None):
+        """
+        Parameters:
+        - maxsize: Maximum number of cached results
+        - ttl: Optional lifetime of an entry in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._version = version
+
+    def get(self, key, version):
+        """Return the cached result for key under model version, or None."""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, version, value):
+        """Cache value for key under model version, evicting the least recently used entry if full."""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current size."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'model_version': self._version
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,137 @@
+import json
+import math
+import numpy as np
+
+CONFIDENCE_LABELS = ('High', 'Medium', 'Low')
+CONFIDENCE_INVALID = -1
+
+# Columnar layout for batch predictions; confidence is an int8 code into CONFIDENCE_LABELS
+RESULT_DTYPE = np.dtype([
+    ('prescription_re', np.float32),
+    ('snellen_prediction_re', np.float32),
+    ('duochrome_adjustment_re', np.float32),
+    ('confidence_re', np.int8),
+    ('prescription_le', np.float32),
+    ('snellen_prediction_le', np.float32),
+    ('duochrome_adjustment_le', np.float32),
+    ('confidence_le', np.int8),
+    ('valid', np.bool_),
+])
+
+CSV_HEADER = ','.join(RESULT_DTYPE.names[:-1] + ('model_version',))
+
+
+def _json_number(value):
+    """Format a number (Python or NumPy scalar) as a JSON value; NaN and infinity become null."""
+    value = float(value)
+    return repr(value) if math.isfinite(value) else 'null'
+
+
+class EyeResult:
+    """Prediction for one eye."""
+    __slots__ = ('prescription', 'snellen_prediction', 'duochrome_adjustment', 'confidence')
+
+    def __init__(self, prescription, snellen_prediction, duochrome_adjustment, confidence):
+        self.prescription = prescription
+        self.snellen_prediction = snellen_prediction
+        self.duochrome_adjustment = duochrome_adjustment
+        self.confidence = confidence
+
+    def to_dict(self):
+        return {
+            'prescription': self.prescription,
+            'snellen_prediction': self.snellen_prediction,
+            'duochrome_adjustment': self.duochrome_adjustment,
+            'confidence': self.confidence
+        }
+
+    def _json(self):
+        return (f'{{"prescription": {_json_number(self.prescription)}, '
+                f'"snellen_prediction": {_json_number(self.snellen_prediction)}, '
+                f'"duochrome_adjustment": {_json_number(self.duochrome_adjustment)}, '
+                f'"confidence": {json.dumps(self.confidence)}}}')
+
+    def __eq__(self, other):
+        return isinstance(other, EyeResult) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self):
+        return f'EyeResult({self.prescription}, {self.snellen_prediction}, {self.duochrome_adjustment}, {self.confidence!r})'
+
+
+class PredictionResult:
+    """Prediction for both eyes plus the model version that produced it."""
+    __slots__ = ('right_eye', 'left_eye', 'model_version')
+
+    def __init__(self, right_eye, left_eye, model_version):
+        self.right_eye = right_eye
+        self.left_eye = left_eye
+        self.model_version = model_version
+
+    def to_dict(self):
+        """Same nested dict CombinedEyePowerPredictor.predict has always returned."""
+        return {
+            'right_eye': self.right_eye.to_dict(),
+            'left_eye': self.left_eye.to_dict(),
+            'model_version': self.model_version
+        }
+
+    def to_json(self):
+        """Serialize to JSON directly, without building intermediate dicts."""
+        return (f'{{"right_eye": {self.right_eye._json()}, "left_eye": {self.left_eye._json()}, '
+                f'"model_version": {json.dumps(self.model_version)}}}')
+
+    def to_csv_row(self):
+        """Serialize as one CSV row matching CSV_HEADER."""
+        r, l = self.right_eye, self.left_eye
+        return (f'{r.prescription},{r.snellen_prediction},{r.duochrome_adjustment},{r.confidence},'
+                f'{l.prescription},{l.snellen_prediction},{l.duochrome_adjustment},{l.confidence},'
+                f'{self.model_version}')
+
+    def __eq__(self, other):
+        return isinstance(other, PredictionResult) and (
+            self.right_eye == other.right_eye and self.left_eye == other.left_eye
+            and self.model_version == other.model_version
+        )
+
+    def __repr__(self):
+        return f'PredictionResult({self.right_eye!r}, {self.left_eye!r}, {self.model_version!r})'
+
+
+def batch_to_json(results, model_version):
+    """
+    Serialize a RESULT_DTYPE array to columnar JSON.
+
+    Confidence codes are written as labels; values of invalid rows, and NaN or
+    infinite values, as null.
+    """
+    labels = np.array(CONFIDENCE_LABELS + (None,), dtype=object)  # code -1 -> null
+    valid = results['valid']
+
+    columns = []
+    for name in RESULT_DTYPE.names:
+        column = results[name]
+        if name.startswith('confidence'):
+            values = labels[column].tolist()
+        else:
+            values = column.tolist()
+            if column.dtype.kind == 'f':
+                keep = valid & np.isfinite(column)
+                if not keep.all():
+                    values = [v if ok else None for v, ok in zip(values, keep.tolist())]
+        columns.append(f'{json.dumps(name)}: {json.dumps(values)}')
+    columns.append(f'"model_version": {json.dumps(model_version)}')
+    return '{' + ', '.join(columns) + '}'
+
+
+def batch_to_csv(results, model_version, file):
+    """Write the valid rows of a RESULT_DTYPE array to an open text file as CSV."""
+    labels = np.array(CONFIDENCE_LABELS)
+    valid = results[results['valid']]
+    confidence_re = labels[valid['confidence_re']].tolist()
+    confidence_le = labels[valid['confidence_le']].tolist()
+
+    file.write(CSV_HEADER + '\n')
+    for row, conf_re, conf_le in zip(valid.tolist(), confidence_re, confidence_le):
+        file.write(f'{row[0]},{row[1]},{row[2]},{conf_re},{row[4]},{row[5]},{row[6]},{conf_le},{model_version}\n')
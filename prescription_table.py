@@ -0,0 +1,144 @@
+import itertools
+import numpy as np
+from model.prediction_result import CONFIDENCE_LABELS, EyeResult
+
+# Chart lines offered by the web form (index.html)
+SNELLEN_LINES = ((6, 6), (6, 9), (6, 12), (6, 18), (6, 24), (6, 36), (6, 60))
+# Duochrome directions as returned by DuochromePredictor.interpret_duochrome_result
+DUOCHROME_DIRECTIONS = (-1, 0, 1)
+INTENSITY_LEVELS = (1, 2, 3, 4, 5)
+EYES = ('right_eye', 'left_eye')
+
+_LINE_INDEX = {line: i for i, line in enumerate(SNELLEN_LINES)}
+_DUOCHROME_FLAGS = {
+    -1: {'red_clearer': True, 'green_clearer': False, 'equal_clarity': False},
+    0: {'red_clearer': False, 'green_clearer': False, 'equal_clarity': True},
+    1: {'red_clearer': False, 'green_clearer': True, 'equal_clarity': False},
+}
+_CELLS_PER_EYE = len(SNELLEN_LINES) * len(DUOCHROME_DIRECTIONS) * len(INTENSITY_LEVELS)
+
+
+class PrescriptionTable:
+    """
+    Precomputed CombinedEyePowerPredictor outputs for every form input.
+
+    Rows are indexed by encode(); each row holds the combined prescription,
+    the Snellen prediction and the duochrome adjustment, with the confidence
+    label stored separately as an int8 code into CONFIDENCE_LABELS.
+    """
+
+    def __init__(self, values, confidence, snellen_weight, duochrome_weight, model_version):
+        self.values = np.asarray(values, dtype=np.float32)
+        self.confidence = np.asarray(confidence, dtype=np.int8)
+        self.snellen_weight = float(snellen_weight)
+        self.duochrome_weight = float(duochrome_weight)
+        self.model_version = model_version
+
+    @classmethod
+    def build(cls, predictor):
+        """Materialize the table by running the live predictor over the whole input space."""
+        values = np.zeros((len(EYES) * _CELLS_PER_EYE, 3), dtype=np.float32)
+        confidence = np.zeros(len(EYES) * _CELLS_PER_EYE, dtype=np.int8)
+        versions = set()
+
+        for line, direction, intensity in itertools.product(SNELLEN_LINES, DUOCHROME_DIRECTIONS, INTENSITY_LEVELS):
+            snellen = {'numerator': line[0], 'denominator': line[1]}
+            duochrome = dict(_DUOCHROME_FLAGS[direction], intensity_level=intensity, letters_correct=0)
+            result = predictor.predict({
+                'visual_acuity_re': line[0] / line[1],
+                'visual_acuity_le': line[0] / line[1],
+                'snellen_re': snellen,
+                'snellen_le': snellen,
+                'duochrome_re': duochrome,
+                'duochrome_le': duochrome
+            })
+            versions.add(result['model_version'])
+
+            for eye_index, eye in enumerate(EYES):
+                index = cls._index(eye_index, _LINE_INDEX[line], direction, intensity)
+                values[index] = (
+                    result[eye]['prescription'],
+                    result[eye]['snellen_prediction'],
+                    result[eye]['duochrome_adjustment']
+                )
+                confidence[index] = CONFIDENCE_LABELS.index(result[eye]['confidence'])
+
+        if len(versions) != 1:
+            raise RuntimeError("❌ Models were reloaded while building the prescription table. Build it again.")
+
+        return cls(values, confidence, predictor.snellen_weight, predictor.duochrome_weight, versions.pop())
+
+    @staticmethod
+    def _index(eye_index, line_index, direction, intensity):
+        return ((eye_index * len(SNELLEN_LINES) + line_index) * len(DUOCHROME_DIRECTIONS)
+                + direction + 1) * len(INTENSITY_LEVELS) + intensity - 1
+
+    @classmethod
+    def encode(cls, eye, visual_acuity, snellen_data, duochrome_data):
+        """
+        Encode one eye's input as a table row index.
+
+        Returns None for off-grid inputs (custom Snellen lines, letters_correct,
+        intensity levels, or visual acuity not matching the Snellen fraction).
+        """
+        line = (snellen_data['numerator'], snellen_data['denominator'])
+        line_index = _LINE_INDEX.get(line)
+        if line_index is None or visual_acuity != line[0] / line[1]:
+            return None
+
+        if duochrome_data.get('letters_correct', 0) != 0:
+            return None
+
+        intensity = duochrome_data.get('intensity_level')
+        if intensity not in INTENSITY_LEVELS or isinstance(intensity, bool):
+            return None
+
+        # Same precedence as DuochromePredictor.interpret_duochrome_result
+        if duochrome_data['equal_clarity']:
+            direction = 0
+        elif duochrome_data['red_clearer']:
+            direction = -1
+        elif duochrome_data['green_clearer']:
+            direction = 1
+        else:
+            return None
+
+        return cls._index(EYES.index(eye), line_index, direction, intensity)
+
+    def lookup(self, eye, visual_acuity, snellen_data, duochrome_data):
+        """Return the precomputed EyeResult for one eye, or None if the input is off-grid."""
+        index = self.encode(eye, visual_acuity, snellen_data, duochrome_data)
+        if index is None:
+            return None
+
+        prescription, snellen_prediction, adjustment = self.values[index].tolist()
+        return EyeResult(prescription, snellen_prediction, adjustment, CONFIDENCE_LABELS[self.confidence[index]])
+
+    def save(self, path):
+        """Save the table as a compressed .npz file."""
+        np.savez_compressed(
+            path,
+            values=self.values,
+            confidence=self.confidence,
+            weights=np.array([self.snellen_weight, self.duochrome_weight]),
+            model_version=np.array(self.model_version)
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load a table written by save()."""
+        with np.load(path) as data:
+            snellen_weight, duochrome_weight = data['weights'].tolist()
+            return cls(data['values'], data['confidence'], snellen_weight, duochrome_weight,
+                       str(data['model_version']))
+
+
+# Build the table from the current models
+if __name__ == "__main__":
+    import os
+    from model.combined_eye_power_predictor import CombinedEyePowerPredictor
+    from model.model_artifact import MODEL_DIR
+
+    table = PrescriptionTable.build(CombinedEyePowerPredictor())
+    table.save(os.path.join(MODEL_DIR, 'prescription_table.npz'))
+    print(f"Prescription table saved with {len(table.values)} entries")
@@ -0,0 +1,45 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+# This process's view of the matrix published by the parent, set by attach()
+_attached = None
+
+
+class SharedMatrix:
+    """
+    A float64 matrix copied once into shared memory for a process pool.
+
+    Use as a context manager in the parent and pass attach/initargs to the
+    pool; workers then read rows with shared() instead of receiving copies.
+    The block is unlinked when the context exits.
+    """
+
+    def __init__(self, matrix):
+        matrix = np.asarray(matrix, dtype=np.float64)
+        self.shape = matrix.shape
+        self.block = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+        np.ndarray(self.shape, dtype=np.float64, buffer=self.block.buf)[:] = matrix
+
+    @property
+    def initargs(self):
+        return (self.block.name, self.shape)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.block.close()
+        self.block.unlink()
+
+
+def attach(name, shape):
+    """Pool initializer: map the shared matrix into this worker."""
+    global _attached
+    # Workers share the parent's resource tracker, so the parent's unlink covers this attach too
+    block = shared_memory.SharedMemory(name=name)
+    _attached = (block, np.ndarray(shape, dtype=np.float64, buffer=block.buf))
+
+
+def shared():
+    """Return the matrix attached in this worker."""
+    return _attached[1]
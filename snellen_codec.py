@@ -0,0 +1,146 @@
+import math
+import numpy as np
+from model.logmar import STANDARD_LINES, decimal_to_logmar
+
+# Clinical codes recorded instead of a chart line, as decimal VA
+CLINICAL_CODES = {
+    'NPL': 0.0,   # No Perception of Light
+    'PL': 0.05,   # Perception of Light
+    'CF': 0.1,    # Counting Fingers
+    'HM': 0.2,    # Hand Movement
+    'Pass': 1.0,
+    'Fail': 0.5
+}
+
+# Notations the codec understands:
+# - 'clinical': the codes above (exact match)
+# - 'fraction': Snellen fractions, 6/x metric or 20/x imperial (e.g. "6/12", "20/40")
+# - 'decimal':  decimal VA (e.g. "0.5" or 0.5)
+# - 'logmar':   LogMAR tagged as such (e.g. "logMAR 0.3", "0.3 LogMAR")
+ALL_NOTATIONS = ('clinical', 'fraction', 'decimal', 'logmar')
+# What DataProcessor.snellen_to_decimal has always accepted
+SURVEY_NOTATIONS = ('clinical', 'fraction')
+
+_INVALID = (math.nan, math.nan)
+_MAX_CACHED = 1 << 16
+
+# Interned decode results keyed by (value, notations), seeded with every chart line and code
+_DECODED = {}
+
+
+def _decode_uncached(value, notations):
+    if isinstance(value, str):
+        if 'clinical' in notations and value in CLINICAL_CODES:
+            decimal = CLINICAL_CODES[value]
+            return decimal, decimal_to_logmar(decimal)
+
+        if 'fraction' in notations and '/' in value:
+            try:
+                numerator, denominator = map(float, value.split('/'))
+                decimal = numerator / denominator
+            except (ValueError, ZeroDivisionError):
+                return _INVALID
+            return decimal, decimal_to_logmar(decimal)
+
+        if 'logmar' in notations and 'logmar' in value.lower():
+            text = value.lower().replace('logmar', '').strip(' :=')
+            try:
+                logmar = float(text)
+            except ValueError:
+                return _INVALID
+            return 10 ** -logmar, logmar
+
+        if 'decimal' in notations:
+            try:
+                decimal = float(value)
+            except ValueError:
+                return _INVALID
+            return decimal, decimal_to_logmar(decimal)
+
+        return _INVALID
+
+    if 'decimal' in notations and isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+        decimal = float(value)
+        return decimal, decimal_to_logmar(decimal)
+
+    return _INVALID
+
+
+def decode(value, notations=ALL_NOTATIONS):
+    """
+    Decode one visual acuity value.
+
+    Returns:
+    - (decimal_va, logmar), both NaN if the value is missing or not understood
+    """
+    notations = tuple(notations)
+    if isinstance(value, float) and math.isnan(value):
+        return _INVALID
+    try:
+        return _DECODED[value, notations]
+    except KeyError:
+        pass
+    except TypeError:  # unhashable
+        return _INVALID
+
+    result = _decode_uncached(value, notations)
+    if len(_DECODED) >= _MAX_CACHED:
+        _DECODED.clear()
+    _DECODED[value, notations] = result
+    return result
+
+
+def decode_array(values, notations=ALL_NOTATIONS):
+    """
+    Decode a list, NumPy array or pandas Series of visual acuity values in one pass.
+
+    Each distinct value is decoded once (pandas factorize for Series, np.unique
+    on the string form otherwise) and the results are broadcast back with a
+    single take, so per-row cost is a hash or sort step rather than a string split.
+
+    Returns:
+    - (decimal_va, logmar) float64 NumPy arrays
+    """
+    notations = tuple(notations)
+    if hasattr(values, 'factorize'):
+        codes, uniques = values.factorize()
+        uniques = list(uniques)
+    else:
+        # Numbers become their decimal string form, None/NaN become unparseable text
+        array = np.asarray(values, dtype=object).ravel().astype(str)
+        uniques, codes = np.unique(array, return_inverse=True)
+        uniques = uniques.tolist()
+
+    decoded = np.array([decode(v, notations) for v in uniques] + [_INVALID], dtype=np.float64)
+    taken = decoded[np.asarray(codes).ravel()]  # code -1 (missing) picks the trailing NaN row
+    return taken[:, 0], taken[:, 1]
+
+
+def split_fraction(value, integers=False):
+    """
+    Split a Snellen fraction string into (numerator, denominator).
+
+    Raises ValueError if value is not a fraction with a non-zero denominator
+    (or, with integers=True, not made of whole numbers).
+    """
+    if not isinstance(value, str) or value.count('/') != 1:
+        raise ValueError(f"Invalid Snellen fraction: {value!r}")
+
+    cast = int if integers else float
+    numerator, denominator = map(cast, value.split('/'))
+    if denominator == 0:
+        raise ValueError(f"Invalid Snellen fraction: {value!r}")
+    return numerator, denominator
+
+
+def _seed():
+    for numerator, denominator in STANDARD_LINES:
+        text = f'{numerator}/{denominator:g}'
+        for notations in (ALL_NOTATIONS, SURVEY_NOTATIONS):
+            decode(text, notations)
+    for code in CLINICAL_CODES:
+        for notations in (ALL_NOTATIONS, SURVEY_NOTATIONS):
+            decode(code, notations)
+
+
+_seed()
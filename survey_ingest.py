@@ -0,0 +1,130 @@
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from model.survey_schema import SURVEY_SCHEMA, apply_schema, read_survey_csv
+
+STUDY_ID = 'study_id'
+
+
+def find_survey_files(source):
+    """Return the survey files named by a directory (all *.csv in it), a glob pattern or a single path, sorted."""
+    if os.path.isdir(source):
+        files = glob.glob(os.path.join(source, '*.csv'))
+    elif glob.has_magic(source):
+        files = glob.glob(source)
+    else:
+        files = [source]
+    if not files:
+        raise FileNotFoundError(f"🚨 No survey files found for {source}")
+    return sorted(files)
+
+
+def ingest_file(path, strict=True, schema=SURVEY_SCHEMA):
+    """
+    Parse and validate one survey export. Runs in a worker process.
+
+    Rows without a study number are rejected. With strict=True, rows holding
+    a value that does not fit its schema column are rejected too; otherwise
+    such values are kept as missing.
+
+    Returns:
+    - (typed DataFrame of accepted rows or None if the file was unusable, report dict)
+    """
+    start = time.perf_counter()
+    report = {'file': path, 'rows': 0, 'accepted': 0, 'rejected': 0, 'rejected_rows': [], 'invalid_values': {}}
+    try:
+        raw = read_survey_csv(path)
+        typed, invalid = apply_schema(raw, schema=schema)
+    except (OSError, ValueError, KeyError) as e:
+        report['error'] = str(e.args[0]) if isinstance(e, KeyError) else str(e)
+        report['seconds'] = time.perf_counter() - start
+        return None, report
+
+    rejected = typed[STUDY_ID].isna().to_numpy().copy()
+    report['missing_study_id'] = int(rejected.sum())
+    for name, mask in invalid.items():
+        report['invalid_values'][name] = int(mask.sum())
+        if strict:
+            rejected |= mask
+
+    # Row numbers as they appear in the file (header is line 1)
+    report['rejected_rows'] = [int(i) + 2 for i in typed.index[rejected]]
+    typed = typed[~rejected]
+    report.update(rows=len(raw), accepted=len(typed), rejected=int(rejected.sum()),
+                  seconds=time.perf_counter() - start)
+    return typed, report
+
+
+def ingest(source, workers=None, strict=True, schema=SURVEY_SCHEMA):
+    """
+    Ingest every survey export under source into one de-duplicated dataset.
+
+    Files are parsed and validated in parallel worker processes, then merged
+    in file-name order. When a study number appears more than once, the row
+    from the last file wins, so a later weekly export supersedes an earlier one.
+
+    Parameters:
+    - source: Directory, glob pattern or single file
+    - workers: Number of worker processes (default: CPU count)
+    - strict: Reject rows with values that do not fit the schema (see ingest_file)
+    - schema: Column definitions (default: SURVEY_SCHEMA)
+
+    Returns:
+    - (typed DataFrame, report dict with per-file timings and rejected rows)
+    """
+    import pandas as pd
+
+    start = time.perf_counter()
+    files = find_survey_files(source)
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(files))) as pool:
+        results = list(pool.map(ingest_file, files, [strict] * len(files), [schema] * len(files)))
+
+    frames = []
+    for frame, file_report in results:
+        if frame is None:
+            logging.error(f"🚨 Skipped {file_report['file']}: {file_report['error']}")
+        else:
+            logging.info(f"✅ {file_report['file']}: {file_report['accepted']}/{file_report['rows']} rows "
+                         f"accepted in {file_report['seconds'] * 1000:.1f} ms")
+            frames.append(frame.assign(source_file=os.path.basename(file_report['file'])))
+
+    if not frames:
+        raise ValueError(f"❌ None of the {len(files)} survey files could be ingested.")
+
+    # Categories differ between files, so concat falls back to object columns; re-encode those
+    dataset = pd.concat(frames, ignore_index=True)
+    for name, dtype in frames[0].dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype) and not isinstance(dataset[name].dtype, pd.CategoricalDtype):
+            dataset[name] = dataset[name].astype('category')
+    dataset['source_file'] = dataset['source_file'].astype('category')
+
+    duplicated = dataset.duplicated(STUDY_ID, keep='last')
+    dataset = dataset[~duplicated].reset_index(drop=True)
+
+    report = {
+        'files': [file_report for _, file_report in results],
+        'rows': int(sum(file_report['rows'] for _, file_report in results)),
+        'rejected': int(sum(file_report['rejected'] for _, file_report in results)),
+        'duplicates': int(duplicated.sum()),
+        'accepted': len(dataset),
+        'seconds': time.perf_counter() - start
+    }
+    return dataset, report
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description='Ingest survey exports into one dataset.')
+    parser.add_argument('source', help='Directory, glob pattern or file of survey CSV exports')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--lenient', action='store_true', help='Keep rows with unparseable values (as missing)')
+    args = parser.parse_args()
+
+    dataset, report = ingest(args.source, args.workers, strict=not args.lenient)
+    print(json.dumps(report, indent=2))
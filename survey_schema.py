@@ -0,0 +1,294 @@
+import logging
+import re
+from collections import namedtuple
+import numpy as np
+
+SURVEY_ENCODING = 'ISO-8859-1'
+
+# Likert answers (Qn 6.x) are stored as int8 codes 1-5 in this order; missing is LIKERT_MISSING
+LIKERT_LEVELS = ('Strongly disagree', 'Disagree', 'Neutral', 'Agree', 'Strongly agree')
+LIKERT_MISSING = -1
+# Answers recorded in the interview language instead of English
+LIKERT_ALIASES = {'Nakibaliana sana kabisa (Strongly agree)': 'Strongly agree'}
+
+EDUCATION_LEVELS = (
+    'No formal education', 'Did not complete primary school',
+    'Completed Primary Education', 'Completed Secondary Education'
+)
+
+# How each column kind is stored:
+# - 'id':        pandas string
+# - 'pass_fail': nullable boolean, Pass -> True
+# - 'yes_no':    nullable boolean, Yes -> True
+# - 'likert':    int8 code into LIKERT_LEVELS (1-based), LIKERT_MISSING when blank
+# - 'small_int': nullable Int8 (ages, counts, ladder steps)
+# - 'diopters':  float32 spherical lens power ("+1.00" -> 1.0, "PL/-0.50x90" -> 0.0)
+# - 'number':    float64 plain number, as pd.to_numeric reads it ("+1.00" -> 1.0; "PL/-0.50x90" does not fit)
+# - 'category':  categorical; ordered when categories are given
+# - 'empty':     always blank in the survey export; dropped
+Column = namedtuple('Column', ['source', 'name', 'kind', 'categories'], defaults=[None])
+
+SURVEY_SCHEMA = (
+    Column('Unique study number', 'study_id', 'id'),
+    Column('Unnamed: 1', 'blank_1', 'empty'),
+    Column('Qn 1.3.1: Presenting distance vision at 6/12, RE', 'presenting_distance_RE', 'pass_fail'),
+    Column('Qn 1.3.2:  Presenting distance vision at 6/12, LE', 'presenting_distance_LE', 'pass_fail'),
+    Column(' Worse than 6/12 in either eye ', 'worse_than_6_12_either_eye', 'yes_no'),
+    Column('Better than 6/12 in better eyes', 'better_than_6_12_better_eye', 'yes_no'),
+    Column('Cause VA worse than 6/12 in either eye', 'cause_worse_either_eye', 'category'),
+    Column('Cause VA worse than 6/12 in better eye', 'cause_worse_better_eye', 'category'),
+    Column('Qn 1.9.1: Eye health examination, RE', 'eye_health_RE', 'pass_fail'),
+    Column('Qn 1.9.2: Eye health examination, LE', 'eye_health_LE', 'pass_fail'),
+    Column('Qn 1.10: If fail, what is the reason', 'eye_health_fail_reason', 'category'),
+    Column('Qn 1.4.1: Prescription distance, RE', 'prescription_RE', 'diopters'),
+    Column('Qn 1.4.2: Prescription distance, LE', 'prescription_LE', 'diopters'),
+    Column('Qn 1.5.1:  Corrected vision (Right eye)', 'corrected_RE', 'category'),
+    Column('Qn 1.5.2: Corrected vision (Left eye)', 'corrected_LE', 'category'),
+    Column('Qn 1.6: Presenting near vision at N8 at 40cm', 'near_vision_40cm', 'pass_fail'),
+    Column('Qn 1.7: Presenting near vision at N8 at working distance', 'near_vision_working_distance', 'pass_fail'),
+    Column('Qn 2.2: Do you currently own a pair of glasses?', 'owns_glasses', 'category'),
+    # The export repeats this header; pandas reads the second copy as "Othesr, specify.1"
+    Column('Othesr, specify', 'owns_glasses_other', 'category'),
+    Column('Qn 1.8: Final near presentation', 'near_prescription', 'diopters'),
+    Column('Near vision', 'near_vision', 'category'),
+    Column('Qn 1.12: How old are you this year ?', 'age', 'small_int'),
+    Column('Qn 1.12.1: What is the highest level of education you have attained?', 'education', 'category',
+           EDUCATION_LEVELS),
+    Column('Qn 1.13: Which type of craft are you engaged?', 'craft', 'category'),
+    Column('Qn 1.13.1: How long have you been dealing with the type of craft you have mentioned?',
+           'craft_duration', 'category'),
+    Column('Qn 1.14: Are you interested in taking up this survey ?', 'consented', 'yes_no'),
+    Column('Qn 2.1: Was the respondent diagnosed with presbyopia?', 'presbyopia', 'yes_no'),
+    Column('Othesr, specify.1', 'presbyopia_other', 'category'),
+    Column('Qn 3.1: Are you married or unmarried?', 'marital_status', 'category'),
+    Column('Others, specify', 'marital_status_other', 'category'),
+    Column('Qn 3.2: Do you have children?', 'has_children', 'yes_no'),
+    Column('Qn 3.3: How many children do you have?', 'children', 'small_int'),
+    Column('Qn 3.4: How many people live in your household and rely on your income?', 'dependants', 'small_int'),
+    Column('Qn 3.5: Do you have access to a mobile phone?', 'mobile_phone', 'yes_no'),
+    Column('Qn 4.1: Have you ever had your eyes examined before this?', 'examined_before', 'category'),
+    Column('Qn 4.2: How long ago?', 'examined_how_long_ago', 'category'),
+    Column('Qn 4.3: Where did you have your most recent eye examination?', 'last_exam_place', 'category'),
+    Column('4.3.1: Others, specify', 'last_exam_place_other', 'category'),
+    Column('Unnamed: 38', 'blank_38', 'empty'),
+    Column('Unnamed: 39', 'blank_39', 'empty'),
+    Column('Qn 4.4: Is this your first pair of glassses?', 'first_glasses', 'yes_no'),
+    Column('Qn 4.5: Why have you not gotten glasses before now?', 'no_glasses_reason', 'category'),
+    Column('Qn 4.5.1: Other health priorities, specify', 'no_glasses_health_priorities', 'category'),
+    Column('Qn 4.5.2: Other family obstacles, specify', 'no_glasses_family_obstacles', 'category'),
+    Column('Qn 4.5.3: Other, specify', 'no_glasses_other', 'category'),
+    Column('Qn 4.6: When was the last time you got a new pair of glasses?', 'last_new_glasses', 'category'),
+    Column('Qn 4.8: Where is the nearest place where you can buy eyeglasses?', 'nearest_glasses_seller', 'category'),
+    Column('Qn 8.4.a:  On which step  of the ladder would you say you stood this past month? Work performance',
+           'ladder_work_performance', 'small_int'),
+    Column('Qn 7.1: On which step were you before your eyesight is corrected [lreference based',
+           'ladder_before_correction', 'small_int'),
+    Column('Qn 7.2: On which step of the ladder would you say personally feel yo stand at this time after your '
+           'eyesight is corrected', 'ladder_after_correction', 'small_int'),
+    Column('Qn 6.1: Wearing glasses helps correct vision', 'attitude_corrects_vision', 'likert'),
+    Column('Qn 6.2: Eye problems can be cured by wearing glasses for some time', 'attitude_cures_eyes', 'likert'),
+    Column('Qn 6.3: Wearing eye glasses will make eye problems worse', 'attitude_makes_worse', 'likert'),
+    Column('Qn 6.4: Wearing eye glasses will cause more headaches or tearing', 'attitude_headaches', 'likert'),
+    Column('Qn 6.5: People wearing glasses look more educated', 'attitude_educated', 'likert'),
+    Column('Qn 6.6: People wearing glasses look fashionable', 'attitude_fashionable', 'likert'),
+    Column('Qn 6.7: People wearing glasses have more money or are from higher social status',
+           'attitude_wealthy', 'likert'),
+    Column('Qn 6.8: People wearing glasses look older', 'attitude_older', 'likert'),
+    Column('Qn 6.9: People wearing glasses look disabled', 'attitude_disabled', 'likert'),
+    Column('Qn 6.10: People wearing glasses are bringing attention to themselves to show off',
+           'attitude_show_off', 'likert'),
+    Column("Qn 6.11: Wearing glasses harms a woman's prospects of marriage", 'attitude_marriage_prospects', 'likert'),
+    Column('Qn 6.12: Wearing glasses would make me less likely to choose someone as a marriage partner',
+           'attitude_marriage_partner', 'likert'),
+    Column('Qn 6.13: If I wear glasses,people will think  better of me as a craftswomen',
+           'attitude_craftswoman', 'likert'),
+    Column('Qn 6.14: If I wear glasses, people will be less likely to order products from me',
+           'attitude_fewer_orders', 'likert'),
+    Column('Qn 6.15: If I wear glasses, people will assign me to less technical or complicated work',
+           'attitude_less_technical_work', 'likert'),
+    Column('Qn 6.16: If I wear glasses, people will bully me or tease me', 'attitude_bullying', 'likert'),
+)
+
+# The schema DataProcessor.load_ingested trains from. Prescriptions are read as plain
+# numbers, the way DataProcessor.clean_frame reads the survey CSV, so sphero-cylindrical
+# values ("PL/-0.50x90") are missing there instead of being reduced to their sphere
+TRAINING_SCHEMA = tuple(
+    column._replace(kind='number') if column.name in ('prescription_RE', 'prescription_LE') else column
+    for column in SURVEY_SCHEMA
+)
+
+_BOOLEAN_VALUES = {
+    'pass_fail': {'Pass': True, 'Fail': False},
+    'yes_no': {'Yes': True, 'No': False}
+}
+_LIKERT_CODES = {
+    **{level: code for code, level in enumerate(LIKERT_LEVELS, 1)},
+    **{alias: LIKERT_LEVELS.index(level) + 1 for alias, level in LIKERT_ALIASES.items()}
+}
+# Storage dtype and missing value per column kind
+_DTYPES = {
+    'id': 'string', 'pass_fail': 'boolean', 'yes_no': 'boolean',
+    'likert': np.int8, 'small_int': 'Int8', 'diopters': np.float32, 'number': np.float64
+}
+_MISSING = {
+    'id': None, 'pass_fail': None, 'yes_no': None, 'likert': LIKERT_MISSING,
+    'small_int': None, 'diopters': np.nan, 'number': np.nan, 'category': None
+}
+_BLANK_HEADER = re.compile(r'^Unnamed: \d+$')
+
+
+def normalize_header(header):
+    """Collapse whitespace so headers match across exports ("Qn 1.3.2:  Presenting" == "Qn 1.3.2: Presenting")."""
+    return ' '.join(str(header).split())
+
+
+_BY_HEADER = {normalize_header(column.source): column for column in SURVEY_SCHEMA}
+
+
+def _parse_small_int(text):
+    value = float(text)
+    if value != int(value) or not -128 <= value <= 127:
+        raise ValueError(text)
+    return int(value)
+
+
+def _parse_sphere(text):
+    """Spherical power of a lens prescription: "+1.00" -> 1.0, "PL/-0.50x90" -> 0.0 (plano sphere)."""
+    sphere = text.split('/')[0].strip()
+    if sphere.upper() in ('PL', 'PLANO'):
+        return 0.0
+    return float(sphere)
+
+
+def _convert(value, column):
+    """Convert one stripped, non-blank raw value; raises ValueError if it does not fit the column."""
+    kind = column.kind
+    if kind in _BOOLEAN_VALUES:
+        return _BOOLEAN_VALUES[kind][value]
+    if kind == 'likert':
+        return _LIKERT_CODES[value]
+    if kind == 'small_int':
+        return _parse_small_int(value)
+    if kind == 'diopters':
+        return _parse_sphere(value)
+    if kind == 'number':
+        return float(value)
+    if kind == 'category' and column.categories is not None and value not in column.categories:
+        raise ValueError(value)
+    return value
+
+
+def coerce_column(values, column):
+    """
+    Convert one raw string column to its schema dtype.
+
+    Each distinct raw value is converted once and the results are broadcast
+    back to the rows, as in snellen_codec.decode_array.
+
+    Returns:
+    - (typed Series, boolean mask of rows whose non-blank value could not be understood)
+    """
+    import pandas as pd
+
+    if column.kind not in _MISSING:
+        raise ValueError(f"❌ Unknown column kind '{column.kind}' for {column.source!r}")
+
+    missing = _MISSING[column.kind]
+    codes, uniques = values.factorize()
+    converted, invalid = [], []
+    for value in uniques:
+        value = str(value).strip()
+        try:
+            converted.append(_convert(value, column) if value else missing)
+            invalid.append(False)
+        except (KeyError, ValueError):
+            converted.append(missing)
+            invalid.append(True)
+    invalid = np.array(invalid + [False])[codes]
+
+    if column.kind == 'category':
+        # Stripping can merge raw values, so rebuild the codes against the cleaned categories
+        categories = list(column.categories) if column.categories is not None else list(
+            dict.fromkeys(value for value in converted if value is not missing)
+        )
+        positions = {category: i for i, category in enumerate(categories)}
+        lookup = np.array([positions.get(value, -1) for value in converted] + [-1], dtype=np.int32)
+        typed = pd.Categorical.from_codes(lookup[codes], categories, ordered=column.categories is not None)
+        return pd.Series(typed, index=values.index), invalid
+
+    lookup = np.array(converted + [missing], dtype=object)[codes]
+    return pd.Series(lookup, index=values.index).astype(_DTYPES[column.kind]), invalid
+
+
+def apply_schema(raw, rename=True, schema=SURVEY_SCHEMA):
+    """
+    Convert a raw survey frame (all columns read as strings) to compact dtypes.
+
+    Blank "Unnamed: N" spacer columns and 'empty' schema columns are dropped.
+    Columns not in the schema are kept as categoricals with a warning.
+
+    Parameters:
+    - raw: DataFrame as read by read_survey_csv
+    - rename: Use the schema's short column names instead of the survey headers
+    - schema: Column definitions (default: SURVEY_SCHEMA)
+
+    Returns:
+    - (typed DataFrame, dict of column name -> boolean mask of rows with values
+      that could not be understood; only columns with such rows are listed)
+    """
+    import pandas as pd
+
+    by_header = _BY_HEADER if schema is SURVEY_SCHEMA else {
+        normalize_header(column.source): column for column in schema
+    }
+    missing_cols = sorted(set(by_header) - {normalize_header(header) for header in raw.columns})
+    if missing_cols:
+        raise KeyError(f"Dataset is missing survey columns: {missing_cols}")
+
+    typed, invalid = {}, {}
+    for header in raw.columns:
+        column = by_header.get(normalize_header(header))
+        if column is None:
+            if _BLANK_HEADER.match(header) and raw[header].isna().all():
+                continue
+            logging.warning(f"🚨 Column {header!r} is not in the survey schema; keeping it as a category")
+            column = Column(header, header, 'category')
+        if column.kind == 'empty':
+            continue
+
+        name = column.name if rename else header
+        typed[name], bad = coerce_column(raw[header], column)
+        if bad.any():
+            invalid[name] = bad
+    return pd.DataFrame(typed, index=raw.index), invalid
+
+
+def read_survey_csv(path_or_buffer, **kwargs):
+    """Read a survey export with every column as text, the way apply_schema expects it."""
+    import pandas as pd
+
+    return pd.read_csv(path_or_buffer, dtype=str, encoding=SURVEY_ENCODING, encoding_errors='replace', **kwargs)
+
+
+def load_survey(path_or_buffer, rename=True):
+    """
+    Load a survey export with the compact schema dtypes.
+
+    Values that do not fit their column are logged and stored as missing.
+    """
+    typed, invalid = apply_schema(read_survey_csv(path_or_buffer), rename)
+    for name, mask in invalid.items():
+        logging.warning(f"🚨 {int(mask.sum())} values in {name!r} could not be understood")
+    return typed
+
+
+if __name__ == "__main__":
+    from model.data_processor import DEFAULT_DATA_PATH
+
+    raw = read_survey_csv(DEFAULT_DATA_PATH)
+    typed, invalid = apply_schema(raw)
+    print(f"Raw:   {raw.memory_usage(deep=True).sum() / 1024:8.1f} KiB")
+    print(f"Typed: {typed.memory_usage(deep=True).sum() / 1024:8.1f} KiB")
+    print(typed.dtypes.astype(str).value_counts().to_string())
+    for name, mask in invalid.items():
+        print(f"🚨 {name}: {int(mask.sum())} values not understood")
@@ -0,0 +1,41 @@
+import importlib.util
+import os
+import sys
+import numpy as np
+import pytest
+
+# The repository root is the `model` package; make it importable under that
+# name whatever directory it was checked out to
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if 'model' not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        'model', os.path.join(ROOT, '__init__.py'), submodule_search_locations=[ROOT]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules['model'] = package
+    spec.loader.exec_module(package)
+
+from model.compiled_predictor import CompiledLinearModel  # noqa: E402
+from model.model_artifact import save_linear_artifact  # noqa: E402
+
+
+def publish_linear_models(model_dir, coef_re, intercept_re, coef_le, intercept_le, feature='decimal'):
+    """Publish a right/left pair of one-feature linear models and return the version."""
+    models = {'RE': CompiledLinearModel([coef_re], intercept_re), 'LE': CompiledLinearModel([coef_le], intercept_le)}
+    schema = {
+        eye: {'features': [f'{feature}_{eye}'], 'target': f'prescription_{eye}', 'transform': feature}
+        for eye in models
+    }
+    return save_linear_artifact(str(model_dir), models, schema, {'source': 'test'})
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    """A model directory with small synthetic decimal-VA models published."""
+    publish_linear_models(tmp_path, -3.5, 1.25, -3.25, 1.0)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
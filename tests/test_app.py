@@ -0,0 +1,45 @@
+import hashlib
+import numpy as np
+import pytest
+
+pytest.importorskip('flask')
+joblib = pytest.importorskip('joblib')
+
+from model import app  # noqa: E402
+from model.model_registry import registry  # noqa: E402
+
+
+class ScaledSum:
+    """Stand-in for the trained joblib model."""
+
+    def __init__(self, scale):
+        self.scale = scale
+
+    def predict(self, rows):
+        return np.asarray(rows).sum(axis=1) * self.scale
+
+
+@pytest.fixture
+def model_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'eye_power_model.pkl')
+    monkeypatch.setattr(app, 'MODEL_PATH', path)
+    yield path
+    registry.clear()
+
+
+def file_version(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def test_predict_rows_reports_the_version_it_used(model_path):
+    joblib.dump(ScaledSum(1.0), model_path)
+    first = file_version(model_path)
+    assert app.predict_rows([[1, 2], [3, 4]]) == [(3.0, first), (7.0, first)]
+
+    joblib.dump(ScaledSum(2.0), model_path)
+    second = file_version(model_path)
+    registry.reload(model_path, background=False)
+    assert second != first
+    assert app.calculate_eye_power_async(1, 2).result(timeout=5) == (6.0, second)
+    assert app.calculate_eye_power(1, 2) == 6.0
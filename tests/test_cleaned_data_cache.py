@@ -0,0 +1,82 @@
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from model import cleaned_data_cache
+from model.cleaned_data_cache import cache_path, load_frame, load_or_build, save_frame
+from model.data_processor import DEFAULT_DATA_PATH, DataProcessor
+
+
+@pytest.fixture
+def survey(tmp_path):
+    path = str(tmp_path / 'survey.csv')
+    shutil.copy(DEFAULT_DATA_PATH, path)
+    return path
+
+
+class Builder:
+    """Counts calls to a build function returning frame."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.frame
+
+
+def test_cleaned_frame_round_trips(tmp_path):
+    frame = DataProcessor(cache_dir=None, group_columns=('age', 'craft')).clean_data()
+    path = str(tmp_path / 'cleaned.npz')
+    save_frame(path, frame)
+    pd.testing.assert_frame_equal(load_frame(path), frame)
+
+
+def test_missing_text_and_numeric_values_round_trip(tmp_path):
+    frame = pd.DataFrame({'text': ['a', None, 'b'], 'number': [1.5, np.nan, 2.0]}, index=[3, 5, 9])
+    path = str(tmp_path / 'frame.npz')
+    save_frame(path, frame)
+    pd.testing.assert_frame_equal(load_frame(path), frame)
+
+
+def test_second_load_is_served_from_the_cache(tmp_path, survey):
+    cache_dir = str(tmp_path / 'cache')
+    first = DataProcessor(survey, cache_dir=cache_dir).load_cleaned_data()
+    build = Builder(None)
+    second = load_or_build(cache_dir, survey, build)
+    assert build.calls == 0
+    pd.testing.assert_frame_equal(second, first)
+
+
+def test_editing_the_source_invalidates_the_cache(tmp_path, survey):
+    cache_dir = str(tmp_path / 'cache')
+    frame = pd.DataFrame({'x': [1.0]})
+    build = Builder(frame)
+    load_or_build(cache_dir, survey, build)
+    load_or_build(cache_dir, survey, build)
+    assert build.calls == 1
+
+    with open(survey, 'a', encoding='ISO-8859-1') as f:
+        f.write('\n')
+    load_or_build(cache_dir, survey, build)
+    assert build.calls == 2
+
+
+def test_editing_the_cleaning_code_invalidates_the_cache(tmp_path, survey, monkeypatch):
+    before = cache_path(str(tmp_path), survey)
+    monkeypatch.setattr(cleaned_data_cache, 'cleaning_code_hash', lambda: 'edited')
+    assert cache_path(str(tmp_path), survey) != before
+    assert cache_path(str(tmp_path), survey, variant='age') != cache_path(str(tmp_path), survey)
+
+
+def test_corrupt_cache_file_is_rebuilt(tmp_path, survey):
+    cache_dir = str(tmp_path / 'cache')
+    build = Builder(pd.DataFrame({'x': [1.0, 2.0]}))
+    load_or_build(cache_dir, survey, build)
+    with open(cache_path(cache_dir, survey), 'wb') as f:
+        f.write(b'not an npz file')
+
+    pd.testing.assert_frame_equal(load_or_build(cache_dir, survey, build), build.frame)
+    assert build.calls == 2
+    pd.testing.assert_frame_equal(load_frame(cache_path(cache_dir, survey)), build.frame)
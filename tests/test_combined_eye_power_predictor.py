@@ -0,0 +1,44 @@
+import itertools
+import numpy as np
+import pytest
+from model.combined_eye_power_predictor import CombinedEyePowerPredictor
+from model.duochrome_predictor import encode_duochrome_direction
+from model.eye_power_predictor import EyePowerPredictor
+from model.prediction_result import CONFIDENCE_LABELS
+
+SNELLEN = [(6, 6), (6, 9), (6, 12), (6, 18), (6, 24), (6, 36), (6, 60)]
+FLAGS = [flags for flags in itertools.product((False, True), repeat=3) if any(flags)]
+
+
+def test_combined_batch_matches_predict(model_dir):
+    combined = CombinedEyePowerPredictor()
+    combined.snellen_predictor = EyePowerPredictor(model_dir=model_dir)
+    cases = list(itertools.product(SNELLEN, FLAGS, (1, 3, 5)))
+
+    va = np.array([n / d for (n, d), _, _ in cases])
+    direction = encode_duochrome_direction(*(np.array([flags[i] for _, flags, _ in cases]) for i in range(3)))
+    intensity = np.array([level for _, _, level in cases])
+    results, version = combined.predict_batch(va, va, direction, direction, intensity, intensity)
+
+    assert results['valid'].all()
+    for row, ((n, d), (r, g, e), level) in zip(results, cases):
+        duochrome = {'red_clearer': r, 'green_clearer': g, 'equal_clarity': e, 'intensity_level': level}
+        expected = combined.predict(
+            CombinedEyePowerPredictor.prepare_input_data(f'{n}/{d}', f'{n}/{d}', duochrome, duochrome)
+        )
+        for suffix, eye in (('re', 'right_eye'), ('le', 'left_eye')):
+            assert row[f'prescription_{suffix}'] == pytest.approx(expected[eye]['prescription'])
+            assert row[f'snellen_prediction_{suffix}'] == pytest.approx(expected[eye]['snellen_prediction'])
+            assert row[f'duochrome_adjustment_{suffix}'] == pytest.approx(expected[eye]['duochrome_adjustment'])
+            assert CONFIDENCE_LABELS[row[f'confidence_{suffix}']] == expected[eye]['confidence']
+        assert expected['model_version'] == version
+
+
+def test_combined_batch_marks_missing_visual_acuity_invalid(model_dir):
+    combined = CombinedEyePowerPredictor()
+    combined.snellen_predictor = EyePowerPredictor(model_dir=model_dir)
+    direction = encode_duochrome_direction([True, True, True], [False, False, False], [False, False, False])
+    results, _ = combined.predict_batch([0.5, np.nan, 0.5], [0.5, 0.5, np.inf], direction, direction)
+
+    assert results['valid'].tolist() == [True, False, False]
+    assert results['confidence_re'].tolist()[1] == results['confidence_le'].tolist()[2] == -1
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from model.cross_validation import cross_validate, kfold_test_rows
+from model.logmar import decimal_to_logmar_batch
+
+
+def test_kfold_test_rows_partition_every_row():
+    folds = kfold_test_rows(23, folds=5, seed=1)
+    assert len(folds) == 5
+    assert sorted(np.concatenate(folds).tolist()) == list(range(23))
+    with pytest.raises(ValueError):
+        kfold_test_rows(3, folds=4)
+
+
+def test_parallel_cross_validation_matches_a_sequential_kfold(rng):
+    rows = 40
+    decimal = rng.choice([1.0, 0.67, 0.5, 0.33, 0.25, 0.17, 0.1], rows)
+    vision_data = pd.DataFrame({
+        'decimal_RE': decimal, 'decimal_LE': decimal[::-1].copy(),
+        'prescription_RE': -4 * decimal + 1 + rng.normal(scale=0.3, size=rows),
+        'prescription_LE': -3 * decimal[::-1] + 0.5 + rng.normal(scale=0.3, size=rows),
+    })
+    vision_data['logmar_RE'] = decimal_to_logmar_batch(vision_data['decimal_RE'].to_numpy())
+    vision_data['logmar_LE'] = decimal_to_logmar_batch(vision_data['decimal_LE'].to_numpy())
+
+    report = cross_validate(vision_data, folds=4, seed=3, workers=2)
+
+    for candidate in ('decimal', 'logmar'):
+        errors = []
+        for test in kfold_test_rows(rows, 4, 3):
+            train = np.setdiff1d(np.arange(rows), test)
+            for eye in ('RE', 'LE'):
+                slope, intercept = np.polyfit(vision_data[f'{candidate}_{eye}'].to_numpy()[train],
+                                              vision_data[f'prescription_{eye}'].to_numpy()[train], 1)
+                predicted = slope * vision_data[f'{candidate}_{eye}'].to_numpy()[test] + intercept
+                # No duochrome columns: equal clarity, so the combined prediction is the Snellen one
+                predicted = np.round(predicted * 4) / 4
+                errors.append(np.abs(predicted.astype(np.float32) - vision_data[f'prescription_{eye}'].to_numpy()[test]))
+        errors = np.concatenate(errors)
+
+        result = report[candidate]
+        assert result['count'] == 2 * rows
+        assert result['mae'] == pytest.approx(errors.mean(), rel=1e-6)
+        assert result['within_0.5'] == pytest.approx((errors <= 0.5 + 1e-9).mean())
+        assert result['duochrome_inputs'] is False
+        assert len(result['fold_seconds']) == 4
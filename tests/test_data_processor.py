@@ -0,0 +1,84 @@
+import importlib.util
+import io
+import json
+import os
+import pandas as pd
+import pytest
+from model.benchmarks.clean_data import legacy_clean_data, synthetic_vision_data
+from model.data_processor import COLUMN_DTYPES, DEFAULT_DATA_PATH, REQUIRED_COLUMNS, DataProcessor
+from model.model_artifact import ARTIFACTS_DIRNAME, MANIFEST_FILENAME, current_version
+
+
+requires_sklearn = pytest.mark.skipif(
+    importlib.util.find_spec('sklearn') is None, reason='train_model needs scikit-learn'
+)
+
+
+def read_manifest(model_dir):
+    with open(os.path.join(model_dir, ARTIFACTS_DIRNAME, current_version(model_dir), MANIFEST_FILENAME)) as f:
+        return json.load(f)
+
+
+def test_chunked_loading_matches_a_full_read():
+    full = pd.read_csv(DEFAULT_DATA_PATH, usecols=list(REQUIRED_COLUMNS), dtype=COLUMN_DTYPES,
+                       encoding='ISO-8859-1')[list(REQUIRED_COLUMNS)]
+    full.columns = list(REQUIRED_COLUMNS.values())
+
+    loaded = DataProcessor(chunksize=7, cache_dir=None).load_data()
+    pd.testing.assert_frame_equal(loaded, full)
+
+
+def test_group_columns_are_loaded_after_the_vision_columns():
+    loaded = DataProcessor(chunksize=50, cache_dir=None, group_columns=('craft', 'age')).load_data()
+    assert list(loaded.columns) == list(REQUIRED_COLUMNS.values()) + ['age', 'craft']
+
+
+def test_missing_dataset_is_reported(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        DataProcessor(str(tmp_path / 'missing.csv')).load_data()
+
+
+@requires_sklearn
+def test_train_model_from_a_file_like_source(tmp_path):
+    with open(DEFAULT_DATA_PATH, 'rb') as f:
+        source = io.BytesIO(f.read())
+    model_dir = str(tmp_path)
+    DataProcessor(source).train_model(model_dir=model_dir)
+
+    training_data = read_manifest(model_dir)['training_data']
+    assert training_data['source'] is None
+    assert training_data['rows'] > 0
+
+
+@requires_sklearn
+def test_train_model_records_the_source_path(tmp_path):
+    DataProcessor(cache_dir=None).train_model(model_dir=str(tmp_path))
+    assert read_manifest(str(tmp_path))['training_data']['source'] == DEFAULT_DATA_PATH
+
+
+@requires_sklearn
+def test_train_model_raises_when_publishing_fails(tmp_path):
+    (tmp_path / ARTIFACTS_DIRNAME).write_text('not a directory')
+    with pytest.raises(OSError):
+        DataProcessor(cache_dir=None).train_model(model_dir=str(tmp_path))
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_clean_data_matches_the_legacy_apply_pipeline(seed):
+    vision_data = synthetic_vision_data(5000, seed)
+    processor = DataProcessor()
+    processor.vision_data = vision_data.copy()
+    pd.testing.assert_frame_equal(processor.clean_data(), legacy_clean_data(vision_data.copy()))
+
+
+def test_clean_data_matches_the_legacy_pipeline_on_the_survey():
+    processor = DataProcessor(cache_dir=None)
+    raw = processor.load_data().copy()
+    pd.testing.assert_frame_equal(processor.clean_data(), legacy_clean_data(raw))
+
+
+def test_clean_frame_of_chunks_matches_whole_frame():
+    processor = DataProcessor(chunksize=25, cache_dir=None)
+    chunked = pd.concat([DataProcessor.clean_frame(chunk) for chunk in processor.iter_chunks()])
+    whole = processor.clean_data()
+    pd.testing.assert_frame_equal(chunked.reset_index(drop=True), whole.reset_index(drop=True))
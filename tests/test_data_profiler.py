@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+from model.benchmarks.clean_data import synthetic_vision_data
+from model.data_processor import DataProcessor
+from model.data_profiler import DataProfiler, DistinctSketch, HeavyHitters, QuantileSketch, profile_frames
+
+
+def chunks(frame, size):
+    return [frame.iloc[start:start + size] for start in range(0, len(frame), size)]
+
+
+def test_chunked_profile_equals_single_pass_when_exact():
+    data = synthetic_vision_data(3000)
+    whole = DataProfiler().update(data).report()
+    chunked = profile_frames(chunks(data, 128))
+    assert chunked == whole
+
+
+def test_coercion_failures_are_the_rows_clean_data_drops():
+    data = synthetic_vision_data(5000, seed=3)
+    report = DataProfiler().update(data).report()['columns']
+    for name in ('corrected_RE', 'prescription_LE'):
+        column = report[name]
+        parsed = (data[name].apply(DataProcessor.snellen_to_decimal) if name.startswith('corrected')
+                  else pd.to_numeric(data[name], errors='coerce'))
+        assert column['present'] == data[name].notna().sum()
+        assert column['coercion_failures'] == (data[name].notna() & parsed.isna()).sum()
+        assert column['parsed'] == parsed.notna().sum()
+    assert dict(report['prescription_LE']['failed_values'])['Plano'] > 0
+    assert report['corrected_RE']['clinical_codes']['HM'] == (data['corrected_RE'] == 'HM').sum()
+
+
+def test_histogram_and_quantiles_of_a_numeric_column():
+    values = pd.Series(np.arange(-30, 31).astype(str), dtype=object)
+    column = DataProfiler({'x': 'diopters'}).update(pd.DataFrame({'x': values})).report()['columns']['x']
+    assert column['histogram']['below'] == 10 and column['histogram']['above'] == 10
+    assert sum(column['histogram']['counts']) + 20 == 61
+    assert column['quantiles']['min'] == -30 and column['quantiles']['max'] == 30
+    assert column['quantiles']['p50'] == 0 and column['quantiles_exact']
+
+
+def test_heavy_hitters_bound():
+    hitters = HeavyHitters(max_tracked=10)
+    rng = np.random.default_rng(0)
+    values = np.concatenate([np.full(3000, 'frequent'), rng.integers(0, 1000, 7000).astype(str)])
+    rng.shuffle(values)
+    for batch in np.array_split(values, 50):
+        uniques, counts = np.unique(batch, return_counts=True)
+        hitters.update(uniques.tolist(), counts)
+    (top, count), = hitters.top(1)
+    assert top == 'frequent' and not hitters.exact
+    assert 3000 - len(values) / 11 <= count <= 3000
+
+
+def test_distinct_sketch_estimate():
+    sketch = DistinctSketch(k=256)
+    sketch.update(np.arange(100))
+    sketch.update(np.arange(50))
+    assert sketch.exact and sketch.estimate() == 100
+
+    sketch.update(np.arange(20_000))
+    assert not sketch.exact
+    assert sketch.estimate() == pytest.approx(20_000, rel=0.2)
+
+
+def test_quantile_sketch_is_bounded_and_close():
+    sketch = QuantileSketch(sample_size=2000, seed=1)
+    values = np.random.default_rng(2).normal(size=100_000)
+    for batch in np.array_split(values, 100):
+        sketch.update(batch)
+    assert len(sketch.sample) == 2000 and not sketch.exact
+    quantiles = sketch.quantiles()
+    assert quantiles['min'] == values.min() and quantiles['max'] == values.max()
+    assert quantiles['p50'] == pytest.approx(np.median(values), abs=0.1)
+
+
+def test_processor_profile_streams_the_survey():
+    processor = DataProcessor(chunksize=40, cache_dir=None)
+    report = processor.profile()
+    assert report['rows'] == len(processor.load_data())
+    assert report['columns']['prescription_RE']['coercion_failures'] > 0  # sphero-cylindrical values
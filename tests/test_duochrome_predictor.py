@@ -0,0 +1,26 @@
+import itertools
+import numpy as np
+from model.duochrome_predictor import DuochromePredictor, encode_duochrome_direction
+
+FLAGS = [flags for flags in itertools.product((False, True), repeat=3) if any(flags)]
+
+
+def test_duochrome_batch_matches_scalar_for_every_answer():
+    predictor = DuochromePredictor()
+    rows = list(itertools.product(FLAGS, range(0, 7)))  # intensity 0 and 6 fall back to the default
+    red, green, equal = (np.array([flags[i] for flags, _ in rows]) for i in range(3))
+    intensity = np.array([level for _, level in rows])
+
+    adjustment, valid = predictor.predict_adjustment_batch(6, 12, 0, encode_duochrome_direction(red, green, equal),
+                                                           intensity)
+    assert valid.all()
+    for i, ((r, g, e), level) in enumerate(rows):
+        assert adjustment[i] == predictor.predict_adjustment(6, 12, 0, r, g, e, level)
+
+
+def test_duochrome_batch_flags_missing_answers():
+    adjustment, valid = DuochromePredictor().predict_adjustment_batch(
+        6, 12, 0, encode_duochrome_direction([False, True], [False, False], [False, False]), 3
+    )
+    assert valid.tolist() == [False, True]
+    assert np.isnan(adjustment[0])
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from conftest import publish_linear_models
+from model.eye_power_predictor import EyePowerPredictor
+
+SNELLEN = [(6, 6), (6, 9), (6, 12), (6, 18), (6, 24), (6, 36), (6, 60)]
+
+
+@pytest.mark.parametrize('feature', ['decimal', 'logmar'])
+def test_eye_predict_batch_matches_predict(tmp_path, feature):
+    publish_linear_models(tmp_path, -3.5, 1.25, 2.0, -0.5, feature=feature)
+    predictor = EyePowerPredictor(model_dir=str(tmp_path))
+    va_re = np.array([n / d for n, d in SNELLEN])
+    va_le = va_re[::-1].copy()
+
+    batch = predictor.predict_batch(va_re, va_le)
+    for i, (re, le) in enumerate(zip(va_re, va_le)):
+        scalar = predictor.predict(re, le)
+        assert batch['right_eye'][i] == scalar['right_eye']
+        assert batch['left_eye'][i] == scalar['left_eye']
+    assert batch['model_version'] == predictor.version
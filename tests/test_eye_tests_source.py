@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+from model.duochrome_predictor import DIRECTION_GREEN, DIRECTION_INVALID, DIRECTION_RED
+from model.eye_tests_source import SOURCE_NAME, iter_eye_test_batches, train_from_eye_tests
+from model.incremental_trainer import IncrementalTrainer
+from model.model_artifact import current_version, load_linear_artifact
+
+TARGETS = ('measured_right', 'measured_left')
+
+
+class FakeCursor:
+    """Named-cursor stand-in: applies the id filter and serves rows through fetchmany."""
+
+    def __init__(self, connection, name):
+        self.connection = connection
+        self.name = name
+        self.itersize = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params):
+        self.connection.queries.append((query, params))
+        self._rows = iter([row for row in self.connection.rows if row[0] > params[0]])
+
+    def fetchmany(self, size):
+        self.connection.fetch_sizes.append(size)
+        batch = []
+        for row in self._rows:
+            batch.append(row)
+            if len(batch) == size:
+                break
+        return batch
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+        self.fetch_sizes = []
+        self.cursor_names = []
+        self.rollbacks = 0
+
+    def cursor(self, name=None):
+        self.cursor_names.append(name)
+        return FakeCursor(self, name)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def eye_test_rows(start_id=1):
+    """(id, snellen RE/LE, duochrome RE/LE, measured RE/LE) rows; target = -4 * VA + 1."""
+    lines = [6, 9, 12, 18, 24, 36, 60]
+    return [
+        (start_id + i, f'6/{d}', f'6/{d}', 'red', 'Green clearer', -4 * 6 / d + 1, str(-4 * 6 / d + 1))
+        for i, d in enumerate(lines)
+    ]
+
+
+def test_batches_are_fetched_with_a_named_cursor_after_since_id():
+    rows = eye_test_rows()
+    connection = FakeConnection(rows)
+
+    batches = list(iter_eye_test_batches(connection, TARGETS, since_id=2, batch_size=2))
+
+    assert connection.cursor_names == ['eye_tests_training']
+    query, params = connection.queries[0]
+    assert params == (2,) and 'measured_right, measured_left' in query
+    assert [len(frame) for frame, _ in batches] == [2, 2, 1]
+    assert [last_id for _, last_id in batches] == [4, 6, 7]
+    frame = batches[0][0]
+    assert frame['id'].tolist() == [3, 4]
+    assert frame['decimal_RE'].tolist() == pytest.approx([0.5, 6 / 18])
+    assert frame['prescription_LE'].tolist() == pytest.approx([-1.0, -4 / 3 + 1])
+    assert frame['direction_RE'].tolist() == [DIRECTION_RED] * 2
+    assert frame['direction_LE'].tolist() == [DIRECTION_GREEN] * 2
+
+
+def test_rows_without_acuity_or_measurement_are_dropped():
+    rows = [
+        (1, '6/6', '6/6', 'red', 'red', -3.0, -3.0),
+        (2, 'blurry', '6/6', 'red', 'red', -3.0, -3.0),
+        (3, '6/6', '6/6', None, 'red', None, -3.0),
+        (4, '6/12', '6/12', None, None, -1.0, 'n/a'),
+    ]
+    (frame, last_id), = iter_eye_test_batches(FakeConnection(rows), TARGETS, batch_size=10)
+    assert frame['id'].tolist() == [1]
+    assert last_id == 4  # dropped rows still advance the position
+
+
+def test_unknown_duochrome_answers_are_invalid():
+    rows = [(1, '6/6', '6/6', 'maybe', '', -3.0, -3.0)]
+    (frame, _), = iter_eye_test_batches(FakeConnection(rows), TARGETS)
+    assert frame['direction_RE'].tolist() == [DIRECTION_INVALID]
+    assert frame['direction_LE'].tolist() == [DIRECTION_INVALID]
+
+
+@pytest.mark.parametrize('target_columns', [None, ('result', 'measured_left'), ('measured_right',),
+                                            ('measured; DROP TABLE eye_tests', 'measured_left')])
+def test_training_refuses_missing_or_predicted_targets(tmp_path, target_columns):
+    connection = FakeConnection(eye_test_rows())
+    with pytest.raises(ValueError):
+        train_from_eye_tests(IncrementalTrainer(str(tmp_path)), connection, target_columns)
+    assert connection.queries == []
+
+
+def test_training_resumes_after_the_last_folded_id(tmp_path):
+    trainer = IncrementalTrainer(str(tmp_path))
+    connection = FakeConnection(eye_test_rows())
+    version = train_from_eye_tests(trainer, connection, TARGETS, batch_size=3, allow_fresh=True)
+
+    assert trainer.rows == {'RE': 7, 'LE': 7}
+    assert trainer.positions == {SOURCE_NAME: 7}
+    assert connection.rollbacks == 1
+    models, manifest = load_linear_artifact(str(tmp_path), version)
+    assert models['RE'].coef[0] == pytest.approx(-4.0)
+    assert models['RE'].intercept == pytest.approx(1.0)
+    assert manifest['training_data']['target_columns'] == list(TARGETS)
+
+    # Nothing new: no publish
+    assert train_from_eye_tests(IncrementalTrainer(str(tmp_path)), FakeConnection(eye_test_rows()), TARGETS) is None
+
+    # Only rows after id 7 are read, and the statistics keep the earlier rows
+    resumed = IncrementalTrainer(str(tmp_path))
+    connection = FakeConnection(eye_test_rows() + eye_test_rows(start_id=8))
+    train_from_eye_tests(resumed, connection, TARGETS)
+    assert connection.queries[0][1] == (7,)
+    assert resumed.rows == {'RE': 14, 'LE': 14}
+    assert resumed.positions == {SOURCE_NAME: 14}
+    assert np.isclose(resumed.models()['LE'].coef[0], -4.0)
+
+
+def test_training_refuses_to_start_without_statistics(tmp_path):
+    connection = FakeConnection(eye_test_rows())
+    with pytest.raises(FileNotFoundError, match='allow_fresh'):
+        train_from_eye_tests(IncrementalTrainer(str(tmp_path)), connection, TARGETS)
+    assert connection.queries == []
+    assert current_version(str(tmp_path)) is None
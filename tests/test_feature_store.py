@@ -0,0 +1,79 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from model.data_processor import REQUIRED_COLUMNS, DataProcessor
+from model.feature_store import FeatureStore
+from model.model_artifact import load_linear_artifact
+
+LINES = ['6/6', '6/9', '6/12', '6/18', '6/24', '6/36']
+
+
+def write_survey(path, slope, rows=60):
+    """A survey CSV whose prescriptions are slope * decimal VA, plus a few rows clean_data drops."""
+    corrected = [LINES[i % len(LINES)] for i in range(rows)] + ['CF 1m', '6/9']
+    prescription = [f'{slope * int(line[2:]) ** -1 * 6:+.2f}' for line in corrected[:rows]] + ['-1.00', 'PL/-0.50x90']
+    frame = pd.DataFrame({
+        'uncorrected_RE': 'Fail', 'uncorrected_LE': 'Pass',
+        'prescription_RE': prescription, 'prescription_LE': prescription,
+        'corrected_RE': corrected, 'corrected_LE': corrected
+    })
+    frame.columns = list(REQUIRED_COLUMNS)
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_out_of_core_training_matches_in_memory_fit(tmp_path):
+    source = write_survey(tmp_path / 'survey.csv', slope=-4.0)
+    processor = DataProcessor(source, chunksize=7, cache_dir=None)
+    version = processor.train_out_of_core(str(tmp_path / 'store'), chunk_rows=5, model_dir=str(tmp_path / 'models'))
+
+    models, manifest = load_linear_artifact(str(tmp_path / 'models'), version)
+    expected = DataProcessor(source, cache_dir=None).clean_data()
+    assert manifest['training_data']['rows'] == {'RE': len(expected), 'LE': len(expected)} == {'RE': 60, 'LE': 60}
+    coef = np.polyfit(expected['decimal_RE'], expected['prescription_RE'], 1)
+    assert models['RE'].coef[0] == pytest.approx(coef[0], rel=1e-5)
+    assert models['RE'].intercept == pytest.approx(coef[1], abs=1e-5)
+
+
+def test_store_is_rebuilt_for_a_different_source(tmp_path):
+    store_dir = str(tmp_path / 'store')
+    first = write_survey(tmp_path / 'first.csv', slope=-4.0)
+    second = write_survey(tmp_path / 'second.csv', slope=2.0, rows=30)
+
+    DataProcessor(first, cache_dir=None).train_out_of_core(store_dir, model_dir=str(tmp_path / 'a'))
+    version = DataProcessor(second, cache_dir=None).train_out_of_core(store_dir, model_dir=str(tmp_path / 'b'))
+
+    models, manifest = load_linear_artifact(str(tmp_path / 'b'), version)
+    assert models['RE'].coef[0] == pytest.approx(2.0, abs=0.01)  # targets are rounded to 0.01 D
+    assert manifest['training_data']['source'] == second
+    assert FeatureStore(store_dir).rows == 30
+
+
+def test_matching_store_is_reused(tmp_path):
+    store_dir = str(tmp_path / 'store')
+    source = write_survey(tmp_path / 'survey.csv', slope=-4.0)
+    processor = DataProcessor(source, cache_dir=None)
+    processor.train_out_of_core(store_dir, model_dir=str(tmp_path / 'models'))
+    assert FeatureStore(store_dir).matches(processor.source_fingerprint())
+
+    # A reused store is read as is, so marking its metadata shows whether it was rewritten
+    meta_path = FeatureStore(store_dir).meta_path
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta['marker'] = True
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    processor.train_out_of_core(store_dir, model_dir=str(tmp_path / 'models'))
+    with open(meta_path) as f:
+        assert json.load(f).get('marker') is True
+
+
+def test_store_without_fingerprint_never_matches(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    frame = pd.DataFrame({name: [1.0] for name in
+                          ('decimal_RE', 'decimal_LE', 'logmar_RE', 'logmar_LE', 'prescription_RE', 'prescription_LE')})
+    assert store.write([frame]) == 1
+    assert not store.matches(None)
+    assert not store.matches({'source_sha256': 'x', 'cleaning_code': 'y'})
+    assert store.open().shape == (1, 6)
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from model.data_processor import DataProcessor
+from model.incremental_trainer import IncrementalTrainer, SufficientStats, check_feature
+from model.model_artifact import current_version
+
+
+def least_squares(X, y):
+    """Reference OLS fit with intercept."""
+    design = np.column_stack([X, np.ones(len(X))])
+    solution = np.linalg.lstsq(design, y, rcond=None)[0]
+    return solution[:-1], solution[-1]
+
+
+def test_merged_batches_equal_full_fit(rng):
+    X = rng.normal(size=(1000, 3)) * [1.0, 10.0, 0.1] + [0.5, -3.0, 100.0]
+    y = X @ [2.0, -0.5, 4.0] + 1.5 + rng.normal(scale=0.1, size=len(X))
+
+    stats = SufficientStats.empty(3)
+    for start, stop in ((0, 1), (1, 1), (1, 250), (250, 251), (251, 1000)):  # includes an empty batch
+        stats = stats.merge(SufficientStats.from_arrays(X[start:stop], y[start:stop]))
+
+    full = SufficientStats.from_arrays(X, y)
+    assert stats.n == full.n == len(X)
+    np.testing.assert_allclose(stats.mean_x, full.mean_x, rtol=1e-12)
+    np.testing.assert_allclose(stats.sxx, full.sxx, rtol=1e-10)
+    np.testing.assert_allclose(stats.sxy, full.sxy, rtol=1e-10)
+
+    coef, intercept = least_squares(X, y)
+    model = stats.solve()
+    np.testing.assert_allclose(model.coef, coef, rtol=1e-9)
+    assert model.intercept == pytest.approx(intercept, rel=1e-9)
+
+
+def test_merge_is_order_independent(rng):
+    X, y = rng.normal(size=(300, 1)), rng.normal(size=300)
+    a = SufficientStats.from_arrays(X[:100], y[:100])
+    b = SufficientStats.from_arrays(X[100:], y[100:])
+    left, right = a.merge(b).solve(), b.merge(a).solve()
+    assert left.coef == pytest.approx(right.coef, rel=1e-12)
+    assert left.intercept == pytest.approx(right.intercept, rel=1e-12)
+
+
+def test_solve_without_rows_raises():
+    with pytest.raises(ValueError):
+        SufficientStats.empty().solve()
+
+
+def test_persisted_statistics_continue_where_they_left_off(tmp_path, rng):
+    x = rng.uniform(0.1, 1.0, 500)
+    y = -3.5 * x + 1.25 + rng.normal(scale=0.25, size=500)
+
+    first = IncrementalTrainer(str(tmp_path))
+    for eye in ('RE', 'LE'):
+        first.partial_fit(eye, x[:200], y[:200])
+    first.positions['eye_tests'] = 42
+    first.save()
+
+    second = IncrementalTrainer(str(tmp_path))
+    assert second.load()
+    assert second.positions == {'eye_tests': 42}
+    for eye in ('RE', 'LE'):
+        second.partial_fit(eye, x[200:], y[200:])
+
+    coef, intercept = least_squares(x[:, None], y)
+    model = second.models()['RE']
+    assert model.coef[0] == pytest.approx(coef[0], rel=1e-10)
+    assert model.intercept == pytest.approx(intercept, rel=1e-10)
+    assert second.rows == {'RE': 500, 'LE': 500}
+
+
+def test_load_rejects_statistics_for_another_feature(tmp_path):
+    trainer = IncrementalTrainer(str(tmp_path), 'decimal')
+    trainer.partial_fit('RE', [0.5, 1.0], [-1.0, 0.0])
+    trainer.save()
+    with pytest.raises(ValueError):
+        IncrementalTrainer(str(tmp_path), 'logmar').load()
+
+
+def test_check_feature():
+    check_feature('logmar')
+    with pytest.raises(ValueError, match='Unknown feature'):
+        check_feature('snellen')
+
+
+def test_update_model_refuses_to_publish_without_statistics(tmp_path):
+    new_data = DataProcessor(cache_dir=None).clean_data().head(20)
+    model_dir = str(tmp_path)
+    with pytest.raises(FileNotFoundError, match='allow_fresh'):
+        DataProcessor().update_model(new_data, model_dir=model_dir)
+    assert current_version(model_dir) is None
+
+    DataProcessor().update_model(new_data, model_dir=model_dir, allow_fresh=True)
+    assert current_version(model_dir) is not None
+    assert IncrementalTrainer(model_dir).load()
@@ -0,0 +1,36 @@
+import pytest
+from model.micro_batcher import MicroBatcher
+
+
+def test_results_are_matched_to_their_items():
+    batcher = MicroBatcher(lambda items: [item * 2 for item in items], max_wait=0.01)
+    try:
+        futures = [batcher.submit(i) for i in range(10)]
+        assert [future.result(timeout=5) for future in futures] == [i * 2 for i in range(10)]
+        assert batcher.metrics()['items'] == 10
+    finally:
+        batcher.close()
+
+
+@pytest.mark.parametrize('batch_fn', [lambda items: items[:-1], lambda items: items + [0]])
+def test_wrong_number_of_results_fails_every_future(batch_fn):
+    batcher = MicroBatcher(batch_fn, max_batch_size=3, max_wait=1.0)
+    try:
+        futures = [batcher.submit(i) for i in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match='results for 3 items'):
+                future.result(timeout=5)
+    finally:
+        batcher.close()
+
+
+def test_batch_fn_exception_is_propagated():
+    def fail(items):
+        raise KeyError('boom')
+
+    batcher = MicroBatcher(fail, max_wait=0.01)
+    try:
+        with pytest.raises(KeyError):
+            batcher.submit(1).result(timeout=5)
+    finally:
+        batcher.close()
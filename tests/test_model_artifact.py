@@ -0,0 +1,70 @@
+import os
+import pytest
+from conftest import publish_linear_models
+from model.model_artifact import (
+    ARTIFACTS_DIRNAME, CURRENT_FILENAME, current_version, load_linear_artifact, prune_artifacts
+)
+
+
+def publish_versions(model_dir, count):
+    """Publish count distinct versions, oldest first, with increasing modification times."""
+    versions = []
+    for i in range(count):
+        version = publish_linear_models(model_dir, -3.0 - i, 1.0, -3.0, 1.0)
+        os.utime(os.path.join(model_dir, ARTIFACTS_DIRNAME, version), (1000 + i, 1000 + i))
+        versions.append(version)
+    return versions
+
+
+def on_disk(model_dir):
+    return {name for name in os.listdir(os.path.join(model_dir, ARTIFACTS_DIRNAME)) if not name.startswith('.')}
+
+
+def test_published_artifact_round_trips(tmp_path):
+    version = publish_linear_models(tmp_path, -3.5, 1.25, -3.25, 1.0)
+    models, manifest = load_linear_artifact(str(tmp_path))
+    assert current_version(str(tmp_path)) == manifest['version'] == version
+    assert models['RE'].coef == (-3.5,) and models['RE'].intercept == 1.25
+    assert manifest['training_data'] == {'source': 'test'}
+
+
+def test_checksum_mismatch_is_detected(tmp_path):
+    version = publish_linear_models(tmp_path, -3.5, 1.25, -3.25, 1.0)
+    with open(os.path.join(tmp_path, ARTIFACTS_DIRNAME, version, 'RE.coef.npy'), 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b'\x01')
+    with pytest.raises(RuntimeError, match='Checksum mismatch'):
+        load_linear_artifact(str(tmp_path))
+
+
+def test_prune_keeps_the_most_recent_versions(tmp_path):
+    model_dir = str(tmp_path)
+    versions = publish_versions(model_dir, 5)
+    assert prune_artifacts(model_dir, keep=2) == versions[2::-1]
+    assert on_disk(model_dir) == set(versions[3:])
+    assert current_version(model_dir) == versions[-1]
+
+
+def test_prune_never_removes_current(tmp_path):
+    model_dir = str(tmp_path)
+    versions = publish_versions(model_dir, 4)
+    # Roll back to the oldest version
+    with open(os.path.join(model_dir, CURRENT_FILENAME), 'w') as f:
+        f.write(versions[0])
+    prune_artifacts(model_dir, keep=2)
+    assert on_disk(model_dir) == {versions[0], versions[-1]}
+    load_linear_artifact(model_dir)
+
+
+def test_publish_prunes_old_versions_and_stale_staging(tmp_path):
+    model_dir = str(tmp_path)
+    publish_versions(model_dir, 6)
+    stale = os.path.join(model_dir, ARTIFACTS_DIRNAME, '.staging-stale')
+    fresh = os.path.join(model_dir, ARTIFACTS_DIRNAME, '.staging-fresh')
+    os.makedirs(stale)
+    os.makedirs(fresh)
+    os.utime(stale, (0, 0))
+
+    latest = publish_linear_models(model_dir, 0.5, 0.5, 0.5, 0.5)
+    assert len(on_disk(model_dir)) == 5 and latest in on_disk(model_dir)
+    assert not os.path.exists(stale) and os.path.exists(fresh)
@@ -0,0 +1,71 @@
+import os
+import signal
+import threading
+import time
+import numpy as np
+import pytest
+from model.model_registry import ModelRegistry, reload_on_signal
+
+
+def test_models_are_loaded_once_and_read_only():
+    registry = ModelRegistry()
+    calls = []
+
+    class Model:
+        def __init__(self):
+            self.coef = np.zeros(2)
+
+    def loader():
+        calls.append(1)
+        return Model()
+
+    model = registry.get('m', loader)
+    assert registry.get('m', loader) is model
+    assert len(calls) == 1
+    with pytest.raises(ValueError):
+        model.coef[0] = 1.0
+
+
+def test_failed_reload_keeps_the_current_model():
+    registry = ModelRegistry()
+    values = iter([1, -1])
+
+    def validate(value):
+        if value < 0:
+            raise RuntimeError('invalid model')
+
+    registry.get('m', lambda: next(values), validate)
+    with pytest.raises(RuntimeError):
+        registry.reload('m').result(timeout=5)
+    assert registry.get('m', None) == 1
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGHUP'), reason='SIGHUP is POSIX only')
+def test_reload_signal_during_a_locked_load_does_not_deadlock():
+    registry = ModelRegistry()
+    reloaded = threading.Event()
+    registry.get('existing', lambda: reloaded.set() or 'v')
+    reloaded.clear()
+
+    previous = signal.getsignal(signal.SIGHUP)
+    try:
+        reload_on_signal(target=registry)
+
+        signalled = []
+
+        def signalling_loader():
+            # Delivered while get() holds the registry lock (only on the first load,
+            # not again when the signal reloads this model too)
+            if not signalled:
+                signalled.append(True)
+                os.kill(os.getpid(), signal.SIGHUP)
+            return 'new'
+
+        assert registry.get('new', signalling_loader) == 'new'
+        assert reloaded.wait(timeout=5)
+        deadline = time.monotonic() + 5
+        while registry.version('new') != 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert registry.version('new') == 2
+    finally:
+        signal.signal(signal.SIGHUP, previous)
@@ -0,0 +1,67 @@
+from conftest import publish_linear_models
+from model.combined_eye_power_predictor import CombinedEyePowerPredictor
+from model.eye_power_predictor import EyePowerPredictor
+from model.prediction_cache import PredictionCache
+
+DUOCHROME = {'red_clearer': True, 'green_clearer': False, 'equal_clarity': False, 'intensity_level': 3}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(maxsize=2)
+    cache.put('a', 'v1', 1)
+    cache.put('b', 'v1', 2)
+    assert cache.get('a', 'v1') == 1  # 'b' is now least recently used
+    cache.put('c', 'v1', 3)
+    assert cache.get('b', 'v1') is None
+    assert cache.get('a', 'v1') == 1 and cache.get('c', 'v1') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_new_model_version_drops_every_entry():
+    cache = PredictionCache()
+    cache.put('a', 'v1', 1)
+    assert cache.get('a', 'v2') is None
+    cache.put('a', 'v2', 2)
+    assert cache.get('a', 'v1') is None  # switching back does not resurrect v1 entries
+    assert cache.stats()['invalidations'] == 2
+
+
+def test_expired_entries_are_not_served(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('model.prediction_cache.time.monotonic', lambda: now[0])
+    cache = PredictionCache(ttl=5)
+    cache.put('a', 'v1', 1)
+    now[0] += 6
+    assert cache.get('a', 'v1') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_cached_predictions_are_invalidated_by_a_model_reload(model_dir):
+    cache = PredictionCache()
+    combined = CombinedEyePowerPredictor(cache=cache)
+    combined.snellen_predictor = EyePowerPredictor(model_dir=model_dir)
+    eye_data = CombinedEyePowerPredictor.prepare_input_data('6/12', '6/9', DUOCHROME, DUOCHROME)
+
+    before = combined.predict_result(eye_data)
+    assert combined.predict_result(eye_data) is before  # served from the cache
+    assert cache.stats()['hits'] == 1
+
+    new_version = publish_linear_models(model_dir, -1.0, 4.0, -1.0, 4.0)
+    combined.snellen_predictor.reload_models(background=False)
+
+    after = combined.predict_result(eye_data)
+    assert after.model_version == new_version != before.model_version
+    assert after.right_eye.snellen_prediction == round((-1.0 * 0.5 + 4.0) * 4) / 4
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_predictors_with_different_weights_can_share_a_cache(model_dir):
+    cache = PredictionCache()
+    eye_data = CombinedEyePowerPredictor.prepare_input_data('6/12', '6/9', DUOCHROME, DUOCHROME)
+    for weights in ((0.7, 0.3), (0.0, 1.0), (1.0, 0.0)):
+        combined = CombinedEyePowerPredictor(*weights, cache=cache)
+        combined.snellen_predictor = EyePowerPredictor(model_dir=model_dir)
+        uncached = CombinedEyePowerPredictor(*weights)
+        uncached.snellen_predictor = combined.snellen_predictor
+        assert combined.predict(eye_data) == uncached.predict(eye_data)
+    assert cache.stats()['size'] == 3
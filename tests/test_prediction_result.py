@@ -0,0 +1,36 @@
+import json
+import numpy as np
+from model.prediction_result import CONFIDENCE_INVALID, RESULT_DTYPE, EyeResult, PredictionResult, batch_to_json
+
+
+def test_to_json_matches_to_dict():
+    result = PredictionResult(EyeResult(-1.25, -1.5, 0.25, 'High'), EyeResult(0.5, 0.5, 0.0, 'Medium'), 'abc123')
+    assert json.loads(result.to_json()) == result.to_dict()
+
+
+def test_to_json_handles_numpy_scalars_and_non_finite_values():
+    result = PredictionResult(
+        EyeResult(np.float64(-1.25), np.float32(0.5), np.nan, 'High'),
+        EyeResult(np.float64(np.inf), 1, 0.25, None),
+        'v"1'
+    )
+    data = json.loads(result.to_json())
+    assert data['right_eye'] == {'prescription': -1.25, 'snellen_prediction': 0.5,
+                                 'duochrome_adjustment': None, 'confidence': 'High'}
+    assert data['left_eye']['prescription'] is None
+    assert data['left_eye']['snellen_prediction'] == 1.0
+    assert data['model_version'] == 'v"1'
+
+
+def test_batch_to_json_writes_invalid_rows_and_non_finite_values_as_null():
+    results = np.zeros(3, dtype=RESULT_DTYPE)
+    results['valid'] = [True, False, True]
+    results['prescription_re'] = [-1.25, -0.5, np.nan]
+    results['snellen_prediction_le'] = [0.5, 0.5, np.inf]
+    results['confidence_le'] = [0, CONFIDENCE_INVALID, 2]
+
+    data = json.loads(batch_to_json(results, 'abc123'))  # json.loads accepts bare NaN, so check for it too
+    assert data['prescription_re'] == [-1.25, None, None]
+    assert data['snellen_prediction_le'] == [0.5, None, None]
+    assert data['confidence_le'] == ['High', None, 'Low']
+    assert 'NaN' not in batch_to_json(results, 'abc123') and 'Infinity' not in batch_to_json(results, 'abc123')
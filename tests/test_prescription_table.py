@@ -0,0 +1,72 @@
+import itertools
+import pytest
+from conftest import publish_linear_models
+from model.combined_eye_power_predictor import CombinedEyePowerPredictor
+from model.eye_power_predictor import EyePowerPredictor
+from model.prescription_table import (
+    DUOCHROME_DIRECTIONS, INTENSITY_LEVELS, SNELLEN_LINES, PrescriptionTable, _DUOCHROME_FLAGS
+)
+
+
+def combined_predictor(model_dir, table_path=None):
+    combined = CombinedEyePowerPredictor(table_path=table_path)
+    combined.snellen_predictor = EyePowerPredictor(model_dir=model_dir)
+    return combined
+
+
+@pytest.fixture
+def table_path(model_dir, tmp_path):
+    path = str(tmp_path / 'prescription_table.npz')
+    PrescriptionTable.build(combined_predictor(model_dir)).save(path)
+    return path
+
+
+def eye_data(line_re, line_le, duochrome_re, duochrome_le):
+    return CombinedEyePowerPredictor.prepare_input_data(
+        f'{line_re[0]}/{line_re[1]}', f'{line_le[0]}/{line_le[1]}', duochrome_re, duochrome_le
+    )
+
+
+def test_table_matches_live_predictor_over_the_whole_grid(model_dir, table_path):
+    live = combined_predictor(model_dir)
+    tabled = combined_predictor(model_dir, table_path)
+
+    for line, direction, intensity in itertools.product(SNELLEN_LINES, DUOCHROME_DIRECTIONS, INTENSITY_LEVELS):
+        duochrome = dict(_DUOCHROME_FLAGS[direction], intensity_level=intensity, letters_correct=0)
+        # A different left eye line checks that the two eyes are looked up independently
+        data = eye_data(line, SNELLEN_LINES[-1], duochrome, duochrome)
+        assert tabled.table.lookup('right_eye', data['visual_acuity_re'], data['snellen_re'], duochrome) is not None
+
+        expected, actual = live.predict(data), tabled.predict(data)
+        assert actual['model_version'] == expected['model_version']
+        for eye in ('right_eye', 'left_eye'):
+            assert actual[eye]['prescription'] == pytest.approx(expected[eye]['prescription'], abs=1e-6)
+            assert actual[eye]['snellen_prediction'] == pytest.approx(expected[eye]['snellen_prediction'], abs=1e-6)
+            assert actual[eye]['duochrome_adjustment'] == pytest.approx(expected[eye]['duochrome_adjustment'],
+                                                                        abs=1e-6)
+            assert actual[eye]['confidence'] == expected[eye]['confidence']
+
+
+def test_off_grid_inputs_fall_back_to_the_live_predictor(model_dir, table_path):
+    duochrome = {'red_clearer': True, 'green_clearer': False, 'equal_clarity': False,
+                 'intensity_level': 3, 'letters_correct': 2}
+    data = eye_data((6, 12), (6, 15), duochrome, duochrome)
+    table = PrescriptionTable.load(table_path)
+    assert table.lookup('right_eye', data['visual_acuity_re'], data['snellen_re'], duochrome) is None
+    assert combined_predictor(model_dir, table_path).predict(data) == combined_predictor(model_dir).predict(data)
+
+
+def test_stale_table_is_ignored_after_a_model_update(model_dir, table_path):
+    tabled = combined_predictor(model_dir, table_path)
+    publish_linear_models(model_dir, -2.0, 0.5, -2.0, 0.5)
+    tabled.snellen_predictor.reload_models(background=False)
+    duochrome = {'red_clearer': False, 'green_clearer': True, 'equal_clarity': False, 'intensity_level': 3}
+    data = eye_data((6, 12), (6, 12), duochrome, duochrome)
+    result = tabled.predict(data)
+    assert result == combined_predictor(model_dir).predict(data)
+    assert result['model_version'] != PrescriptionTable.load(table_path).model_version
+
+
+def test_table_built_with_other_weights_is_rejected(model_dir, table_path):
+    with pytest.raises(ValueError, match='different model weights'):
+        CombinedEyePowerPredictor(0.5, 0.5, table_path=table_path)
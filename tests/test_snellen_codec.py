@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from model.benchmarks.snellen_codec import legacy_snellen_to_decimal, synthetic_column
+from model.data_processor import DataProcessor
+from model.logmar import decimal_to_logmar
+from model.snellen_codec import ALL_NOTATIONS, SURVEY_NOTATIONS, decode, decode_array, split_fraction
+
+EDGE_VALUES = ['6/12', '20/40', '6/0', '6/x', '6/12/3', 'CF 1m', 'Pass', 'Fail', 'NPL', '', '0.5', 'logMAR 0.3',
+               None, np.nan]
+
+
+def test_survey_decoding_matches_legacy_parser():
+    column = pd.concat([synthetic_column(2000), pd.Series(EDGE_VALUES, dtype=object)], ignore_index=True)
+    expected = column.apply(legacy_snellen_to_decimal).to_numpy(dtype=np.float64)
+
+    np.testing.assert_array_equal(decode_array(column, SURVEY_NOTATIONS)[0], expected)
+    np.testing.assert_array_equal(decode_array(column.tolist(), SURVEY_NOTATIONS)[0], expected)
+    np.testing.assert_array_equal(column.apply(DataProcessor.snellen_to_decimal).to_numpy(dtype=np.float64), expected)
+
+
+@pytest.mark.parametrize('value, decimal', [
+    ('6/12', 0.5), ('20/40', 0.5), ('0.5', 0.5), (0.5, 0.5), ('logMAR 0.3', 10 ** -0.3), ('0.3 LogMAR', 10 ** -0.3),
+    ('HM', 0.2), ('PL', 0.05)
+])
+def test_decode_all_notations(value, decimal):
+    decoded, logmar = decode(value, ALL_NOTATIONS)
+    assert decoded == pytest.approx(decimal)
+    assert logmar == pytest.approx(0.3 if 'logmar' in str(value).lower() else decimal_to_logmar(decimal))
+
+
+@pytest.mark.parametrize('value', ['6/0', 'six/12', 'logMAR x', '', None, np.nan, True, ['6/12']])
+def test_decode_invalid_values_are_nan(value):
+    assert np.isnan(decode(value, ALL_NOTATIONS)).all()
+
+
+def test_survey_notations_reject_decimal_and_logmar():
+    decimal, logmar = decode_array(['0.5', 'logMAR 0.3', 0.5], SURVEY_NOTATIONS)
+    assert np.isnan(decimal).all() and np.isnan(logmar).all()
+
+
+def test_split_fraction():
+    assert split_fraction('6/12') == (6.0, 12.0)
+    assert split_fraction('6/12', integers=True) == (6, 12)
+    for value in ('6/0', '6', '6/1/2', 6, '6.5/12x'):
+        with pytest.raises(ValueError):
+            split_fraction(value)
+    with pytest.raises(ValueError):
+        split_fraction('6.5/12', integers=True)
@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+from model.data_processor import DEFAULT_DATA_PATH, DataProcessor
+from model.survey_ingest import STUDY_ID, find_survey_files, ingest, ingest_file
+from model.survey_schema import read_survey_csv
+
+STUDY_HEADER = 'Unique study number'
+PRESCRIPTION_HEADER = 'Qn 1.4.1: Prescription distance, RE'
+LIKERT_HEADER = 'Qn 6.1: Wearing glasses helps correct vision'
+TRAINING_COLUMNS = ['prescription_RE', 'prescription_LE', 'decimal_RE', 'decimal_LE', 'logmar_RE', 'logmar_LE']
+
+
+@pytest.fixture
+def survey():
+    return read_survey_csv(DEFAULT_DATA_PATH)
+
+
+def write_export(directory, name, frame):
+    path = str(directory / name)
+    frame.to_csv(path, index=False, encoding='ISO-8859-1')
+    return path
+
+
+def test_later_exports_supersede_earlier_rows(tmp_path, survey):
+    first, second = survey.iloc[:200].copy(), survey.iloc[150:].copy()
+    second.loc[second.index[0], PRESCRIPTION_HEADER] = '-6.00'
+    write_export(tmp_path, 'week1.csv', first)
+    write_export(tmp_path, 'week2.csv', second)
+
+    dataset, report = ingest(str(tmp_path), workers=2, strict=False)
+    assert len(dataset) == dataset[STUDY_ID].nunique() == len(survey)
+    assert report['duplicates'] == 50 and report['accepted'] == len(survey)
+    updated = dataset[dataset[STUDY_ID] == second[STUDY_HEADER].iloc[0]]
+    assert updated['prescription_RE'].tolist() == [-6.0]
+    assert updated['source_file'].tolist() == ['week2.csv']
+
+
+def test_strict_mode_rejects_rows_with_invalid_values(tmp_path, survey):
+    survey.loc[3, LIKERT_HEADER] = 'Sometimes'
+    survey.loc[5, STUDY_HEADER] = None
+    path = write_export(tmp_path, 'export.csv', survey)
+
+    typed, report = ingest_file(path, strict=True)
+    # Lines 143 and 147 hold 'NI' (no improvement) near prescriptions, which are not lens powers
+    assert report['rejected_rows'] == [5, 7, 143, 147]
+    assert report['invalid_values'] == {'near_prescription': 2, 'attitude_corrects_vision': 1}
+    assert report['missing_study_id'] == 1 and len(typed) == len(survey) - 4
+
+    typed, report = ingest_file(path, strict=False)
+    assert report['rejected_rows'] == [7] and len(typed) == len(survey) - 1
+
+
+def test_unusable_files_are_skipped(tmp_path, survey):
+    write_export(tmp_path, 'good.csv', survey)
+    write_export(tmp_path, 'bad.csv', survey.drop(columns=[PRESCRIPTION_HEADER]))
+    dataset, report = ingest(str(tmp_path / '*.csv'), workers=1, strict=False)
+    assert len(dataset) == len(survey)
+    assert 'Prescription distance' in next(f['error'] for f in report['files'] if f['file'].endswith('bad.csv'))
+
+
+def test_no_files_is_an_error(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        find_survey_files(str(tmp_path))
+
+
+def test_ingested_training_data_matches_the_csv_path(tmp_path, survey):
+    write_export(tmp_path, 'week1.csv', survey.iloc[:120])
+    write_export(tmp_path, 'week2.csv', survey.iloc[120:])
+
+    processor = DataProcessor(cache_dir=None)
+    ingested = processor.load_ingested(str(tmp_path), workers=2)
+    expected = DataProcessor(cache_dir=None).clean_data()
+    # Sphero-cylindrical prescriptions ("PL/-0.50x90") are dropped on both paths
+    pd.testing.assert_frame_equal(ingested[TRAINING_COLUMNS].reset_index(drop=True),
+                                  expected[TRAINING_COLUMNS].reset_index(drop=True))
+    assert processor.data_path == str(tmp_path)
+    assert processor.ingest_report['accepted'] == len(survey)
+
+
+def test_ingested_group_columns_can_be_used_for_grouping(tmp_path, survey):
+    write_export(tmp_path, 'export.csv', survey)
+    ingested = DataProcessor(group_columns=('age', 'craft')).load_ingested(str(tmp_path), workers=1)
+    expected = DataProcessor(cache_dir=None, group_columns=('age', 'craft')).clean_data()
+    assert ingested['age'].tolist() == pd.to_numeric(expected['age']).tolist()
+    assert ingested['craft'].astype(object).tolist() == expected['craft'].tolist()
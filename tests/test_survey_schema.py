@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+from model.data_processor import DEFAULT_DATA_PATH
+from model.survey_schema import (
+    LIKERT_MISSING, SURVEY_SCHEMA, Column, apply_schema, coerce_column, load_survey, normalize_header,
+    read_survey_csv
+)
+
+
+def coerce(values, kind, categories=None):
+    return coerce_column(pd.Series(values, dtype=object), Column('header', 'name', kind, categories))
+
+
+def test_bundled_survey_loads_with_every_schema_column():
+    raw = read_survey_csv(DEFAULT_DATA_PATH)
+    typed, invalid = apply_schema(raw)
+    expected = [column.name for column in SURVEY_SCHEMA if column.kind != 'empty']
+    assert sorted(typed.columns) == sorted(expected)
+    assert len(typed) == len(raw)
+    assert typed.memory_usage(deep=True).sum() < raw.memory_usage(deep=True).sum() / 2
+    # Two near prescriptions are recorded as 'NI' (no improvement), which is not a lens power
+    assert {name: int(mask.sum()) for name, mask in invalid.items()} == {'near_prescription': 2}
+
+
+def test_rename_false_keeps_the_survey_headers():
+    typed = load_survey(DEFAULT_DATA_PATH, rename=False)
+    assert 'Qn 1.4.1: Prescription distance, RE' in typed.columns
+
+
+def test_boolean_kinds():
+    typed, invalid = coerce(['Pass', 'Fail', None, ' Pass ', 'Maybe'], 'pass_fail')
+    assert typed.dtype == 'boolean'
+    assert typed.tolist()[:4] == [True, False, pd.NA, True] and typed.isna().tolist()[4]
+    assert invalid.tolist() == [False, False, False, False, True]
+
+
+def test_likert_codes_and_aliases():
+    typed, invalid = coerce(['Strongly disagree', 'Agree', 'Nakibaliana sana kabisa (Strongly agree)', None, 'x'],
+                            'likert')
+    assert typed.dtype == np.int8
+    assert typed.tolist() == [1, 4, 5, LIKERT_MISSING, LIKERT_MISSING]
+    assert invalid.tolist() == [False, False, False, False, True]
+
+
+def test_small_int_rejects_fractions_and_overflow():
+    typed, invalid = coerce(['42', '7.0', '2.5', '300', ''], 'small_int')
+    assert typed.dtype == 'Int8'
+    assert typed.tolist()[:2] == [42, 7] and typed.isna().tolist()[2:] == [True, True, True]
+    assert invalid.tolist() == [False, False, True, True, False]
+
+
+def test_diopters_keep_the_sphere_and_number_needs_a_plain_value():
+    values = ['+1.00', '-1.50', 'PL/-0.50×90', '+0.50/-1.00x180', 'Plano', None, 'abc']
+    sphere, invalid = coerce(values, 'diopters')
+    assert sphere.dtype == np.float32
+    np.testing.assert_array_equal(sphere, [1.0, -1.5, 0.0, 0.5, 0.0, np.nan, np.nan])
+    assert invalid.tolist() == [False] * 6 + [True]
+
+    number, invalid = coerce(values, 'number')
+    expected = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+    np.testing.assert_array_equal(number, expected)
+    assert invalid.tolist() == [False, False, True, True, True, False, True]
+
+
+def test_categories():
+    typed, invalid = coerce(['No formal education', ' No formal education', 'PhD', None], 'category',
+                            ('No formal education', 'Completed Primary Education'))
+    assert typed.cat.ordered
+    assert typed.tolist()[:2] == ['No formal education'] * 2 and typed.isna().tolist()[2:] == [True, True]
+    assert invalid.tolist() == [False, False, True, False]
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError, match='Unknown column kind'):
+        coerce(['x'], 'text')
+
+
+def test_headers_match_across_exports():
+    assert normalize_header('Qn 1.3.2:  Presenting  distance') == 'Qn 1.3.2: Presenting distance'
+    raw = read_survey_csv(DEFAULT_DATA_PATH)
+    raw.columns = [header.replace(':', ':  ') for header in raw.columns]
+    typed, _ = apply_schema(raw)
+    assert 'prescription_RE' in typed.columns
+
+
+def test_missing_schema_columns_are_reported():
+    raw = read_survey_csv(DEFAULT_DATA_PATH).drop(columns=['Qn 1.4.1: Prescription distance, RE'])
+    with pytest.raises(KeyError, match='Prescription distance, RE'):
+        apply_schema(raw)
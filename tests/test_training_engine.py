@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from model.data_processor import DataProcessor
+from model.incremental_trainer import IncrementalTrainer
+from model.model_artifact import current_version, load_linear_artifact
+from model.training_engine import TrainingEngine, age_bands, model_name
+
+
+def vision_data(craft):
+    rows = len(craft)
+    x = np.linspace(0.1, 1.0, rows)
+    return pd.DataFrame({'decimal_RE': x, 'decimal_LE': x, 'prescription_RE': -3 * x, 'prescription_LE': -2 * x,
+                         'craft': craft})
+
+
+def test_age_bands():
+    assert age_bands([39, 40, '55', 70, None, 'old']).tolist() == ['<40', '40-49', '50-59', '70+', None, None]
+
+
+def test_plan_groups_rows_and_skips_small_groups():
+    data = vision_data(['Weaving'] * 12 + ['Pottery'] * 12 + ['Carving'] * 3)
+    names = [name for name, *_ in TrainingEngine('unused', min_rows=10).plan(data, ('craft',))]
+    assert names == ['RE', 'LE', 'RE__craft_weaving', 'LE__craft_weaving', 'RE__craft_pottery', 'LE__craft_pottery']
+    assert model_name('RE', 'craft', 'Basket / Mat') == 'RE__craft_basket_mat'
+
+
+@pytest.mark.parametrize('values', [('Weaving', 'weaving '), ('A/B', 'A B')])
+def test_plan_rejects_values_with_the_same_model_name(values):
+    data = vision_data([values[0]] * 10 + [values[1]] * 10)
+    with pytest.raises(ValueError, match='would both be saved'):
+        TrainingEngine('unused', min_rows=5).plan(data, ('craft',))
+
+
+def test_train_resets_the_statistics_to_the_published_global_models(tmp_path):
+    model_dir = str(tmp_path)
+    stale = IncrementalTrainer(model_dir)
+    stale.partial_fit('RE', [0.5, 1.0], [5.0, 9.0])
+    stale.positions['eye_tests'] = 7
+    stale.save()
+
+    data = vision_data(['Weaving'] * 12 + ['Pottery'] * 12)
+    TrainingEngine(model_dir, workers=2, progress=None).train(data)
+
+    trainer = IncrementalTrainer(model_dir)
+    assert trainer.load()
+    assert trainer.rows == {'RE': len(data), 'LE': len(data)} and trainer.positions == {}
+    models, _ = load_linear_artifact(model_dir)
+    for eye, model in trainer.models().items():
+        assert model.coef[0] == pytest.approx(models[eye].coef[0])
+        assert model.intercept == pytest.approx(models[eye].intercept, abs=1e-12)
+
+
+def test_incremental_update_refuses_to_drop_group_models(tmp_path):
+    model_dir = str(tmp_path)
+    data = vision_data(['Weaving'] * 12 + ['Pottery'] * 12)
+    version = TrainingEngine(model_dir, workers=2, progress=None).train(data, group_by=('craft',))
+
+    with pytest.raises(ValueError, match='cannot reproduce'):
+        DataProcessor().update_model(data, model_dir=model_dir)
+    assert current_version(model_dir) == version
+
+    trainer = IncrementalTrainer(model_dir)
+    trainer.load()
+    trainer.partial_fit_frame(data)
+    models, _ = load_linear_artifact(model_dir, trainer.publish(replace_other_models=True))
+    assert sorted(models) == ['LE', 'RE']
@@ -0,0 +1,191 @@
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from model import shared_matrix
+from model.incremental_trainer import EYES, IncrementalTrainer, SufficientStats, check_feature
+from model.model_artifact import MODEL_DIR, fingerprint_arrays, save_linear_artifact
+
+# Upper-exclusive age band edges; Qn 1.12 ages below the first edge fall in '<40'
+AGE_BAND_EDGES = (40, 50, 60, 70)
+# Groups with fewer usable rows than this are not given their own model
+MIN_GROUP_ROWS = 10
+
+# Column layout of the shared training matrix: one feature and one target per eye
+_COLUMNS = tuple(f'{kind}_{eye}' for kind in ('x', 'y') for eye in EYES)
+
+
+def age_band_labels(edges=AGE_BAND_EDGES):
+    labels = [f'<{edges[0]}']
+    labels += [f'{low}-{high - 1}' for low, high in zip(edges, edges[1:])]
+    labels.append(f'{edges[-1]}+')
+    return labels
+
+
+def age_bands(ages, edges=AGE_BAND_EDGES):
+    """Map ages (numbers or numeric strings) to band labels; missing or unparseable ages map to None."""
+    import pandas as pd
+
+    ages = pd.to_numeric(pd.Series(ages), errors='coerce').to_numpy(dtype=np.float64)
+    labels = np.array(age_band_labels(edges) + [None], dtype=object)
+    codes = np.digitize(ages, edges)
+    codes[np.isnan(ages)] = len(labels) - 1
+    return labels[codes]
+
+
+def _slug(value):
+    return re.sub(r'[^a-z0-9]+', '_', str(value).lower()).strip('_')
+
+
+def model_name(eye, group=None, value=None):
+    """Artifact model name, e.g. 'RE' or 'RE__craft_weaving' (safe as a file name)."""
+    return eye if group is None else f'{eye}__{group}_{_slug(value)}'
+
+
+def _fit(name, eye, rows):
+    """Fit one model on the given rows of the shared matrix. Runs in a worker."""
+    matrix = shared_matrix.shared()
+    x = matrix[rows, _COLUMNS.index(f'x_{eye}')]
+    y = matrix[rows, _COLUMNS.index(f'y_{eye}')]
+    model = SufficientStats.from_arrays(x, y).solve()
+    return name, model, len(rows)
+
+
+def log_progress(done, total, name, rows):
+    logging.info(f"✅ [{done}/{total}] Trained {name} on {rows} rows")
+
+
+class TrainingEngine:
+    """
+    Fit many per-eye linear models in parallel and publish them together.
+
+    Besides the global RE/LE models, one model per eye is fitted for every
+    value of each grouping column (age band, craft, or any other column of
+    vision_data, e.g. a clinic id). The training matrix is placed in shared
+    memory once and every worker reads its rows from there, so only row
+    indices are sent per task. All models land in a single artifact, so
+    CURRENT switches to the whole set at once.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, feature='decimal', workers=None, min_rows=MIN_GROUP_ROWS, progress=log_progress):
+        """
+        Parameters:
+        - model_dir: Directory the artifact is published to (default: the served MODEL_DIR)
+        - feature: Model input, either 'decimal' visual acuity or 'logmar'
+        - workers: Number of worker processes (default: CPU count)
+        - min_rows: Minimum usable rows for a group model
+        - progress: Callable(done, total, model_name, rows) called as each fit finishes, or None
+        """
+        check_feature(feature)
+        self.model_dir = model_dir
+        self.feature = feature
+        self.workers = workers or os.cpu_count()
+        self.min_rows = min_rows
+        self.progress = progress
+
+    def plan(self, vision_data, group_by=()):
+        """
+        List the models to fit.
+
+        Parameters:
+        - vision_data: Cleaned frame (see DataProcessor.clean_data), plus the grouping columns
+        - group_by: Column names to group by; 'age_band' is derived from an 'age' column
+
+        Returns:
+        - List of (model_name, eye, group, value, row positions)
+
+        Raises ValueError if two group values map to the same model name.
+        """
+        import pandas as pd
+
+        tasks = [(model_name(eye), eye, None, None, np.arange(len(vision_data))) for eye in EYES]
+        for group in group_by:
+            if group == 'age_band' and 'age_band' not in vision_data.columns:
+                values = age_bands(vision_data['age'])
+            else:
+                values = vision_data[group].to_numpy(dtype=object)
+
+            codes, uniques = pd.factorize(values)
+            for code, value in enumerate(uniques):
+                rows = np.flatnonzero(codes == code)
+                if len(rows) < self.min_rows:
+                    logging.info(f"🚨 Skipping {group}={value!r}: {len(rows)} rows < {self.min_rows}")
+                    continue
+                tasks += [(model_name(eye, group, value), eye, group, value, rows) for eye in EYES]
+
+        # Model names are also file names; distinct values must not share one (e.g. 'A/B' and 'a b')
+        owners = {}
+        for name, _, group, value, _ in tasks:
+            if owners.setdefault(name, (group, value)) != (group, value):
+                raise ValueError(f"❌ {owners[name][0]}={owners[name][1]!r} and {group}={value!r} would both "
+                                 f"be saved as model '{name}'. Normalize the group values first.")
+        return tasks
+
+    def train(self, vision_data, group_by=(), training_data=None):
+        """
+        Fit every planned model over a process pool and publish them atomically.
+
+        The training statistics in model_dir (see IncrementalTrainer) are reset
+        to this training set. If group models were published, incremental
+        updates refuse to replace them; retrain with the engine instead.
+
+        Returns:
+        - The published artifact version
+        """
+        start = time.perf_counter()
+        tasks = self.plan(vision_data, group_by)
+        matrix = np.column_stack(
+            [vision_data[f'{self.feature}_{eye}'].to_numpy(dtype=np.float64) for eye in EYES]
+            + [vision_data[f'prescription_{eye}'].to_numpy(dtype=np.float64) for eye in EYES]
+        )
+
+        models, schema = {}, {}
+        with shared_matrix.SharedMatrix(matrix) as shared:
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(tasks)), initializer=shared_matrix.attach, initargs=shared.initargs
+            ) as pool:
+                futures = {pool.submit(_fit, name, eye, rows): (eye, group, value)
+                           for name, eye, group, value, rows in tasks}
+                for done, future in enumerate(as_completed(futures), 1):
+                    name, model, rows = future.result()
+                    eye, group, value = futures[future]
+                    models[name] = model
+                    schema[name] = {
+                        'features': [f'{self.feature}_{eye}'],
+                        'target': f'prescription_{eye}',
+                        'transform': self.feature,
+                        'group': None if group is None else {'column': group, 'value': str(value), 'rows': rows}
+                    }
+                    if self.progress:
+                        self.progress(done, len(tasks), name, rows)
+
+        # Manifest order should not depend on completion order
+        models = {name: models[name] for name, *_ in tasks}
+        version = save_linear_artifact(self.model_dir, models, schema, {
+            'rows': int(len(vision_data)),
+            'fingerprint': fingerprint_arrays(matrix),
+            'group_by': list(group_by),
+            **(training_data or {})
+        })
+        logging.info(f"✅ Published {len(models)} models as version {version} in {time.perf_counter() - start:.2f}s")
+
+        # Reset the sufficient statistics to this training set, so they describe
+        # the global models just published rather than an older training run
+        trainer = IncrementalTrainer(self.model_dir, self.feature)
+        for eye in EYES:
+            trainer.partial_fit(eye, matrix[:, _COLUMNS.index(f'x_{eye}')], matrix[:, _COLUMNS.index(f'y_{eye}')])
+        trainer.save()
+        return version
+
+
+if __name__ == "__main__":
+    from model.data_processor import DataProcessor
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    processor = DataProcessor(group_columns=('age', 'craft'))
+    vision_data = processor.load_cleaned_data()
+    TrainingEngine().train(vision_data, group_by=('age_band', 'craft'),
+                           training_data={'source': str(processor.data_path)})